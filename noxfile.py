@@ -2,6 +2,7 @@
 # Copyright © 2025 by Nick Jenkins. All rights reserved
 
 """Nox for python task automation."""
+import hashlib
 import io
 import os
 import shutil
@@ -208,34 +209,82 @@ def vibed(session):  # noqa: D401  # type: ignore[no-redef]
 
 
 # --- PERSONALVIBE CHUNK D PATCH START
-@session(python=["3.12"], reuse_venv=False)
-def smoke_dist(session: Session) -> None:  # noqa: D401
-    """Build wheel, install into **fresh** temp venv, run `pv --help`."""
-    _print_step("🏗️  Building wheel …")
-    session.run("poetry", "build", "-f", "wheel", external=True)
+_SMOKE_ROOT = Path(".nox") / "pv_smoke"
+_WHEEL_STAMP = Path("dist") / ".pv_wheel_hash"
+
+
+def _file_digest(paths) -> str:
+    """SHA-256 over (relative path, content) of *paths* in sorted order."""
+    h = hashlib.sha256()
+    for p in sorted(Path(p) for p in paths):
+        h.update(p.as_posix().encode())
+        h.update(b"\0")
+        h.update(p.read_bytes())
+    return h.hexdigest()
+
+
+def _wheel_sources() -> List[Path]:
+    """Everything that ends up in the wheel (precompiled templates are derived, so skipped)."""
+    skip = {"__pycache__", "_compiled"}
+    files = [p for p in Path("src/personalvibe").rglob("*") if p.is_file() and not skip.intersection(p.parts)]
+    return files + [p for p in (Path("pyproject.toml"), Path("README.md"), Path("LICENSE")) if p.exists()]
+
 
+def _smoke_venv_key(python_version: str, lockfile: Path = Path("poetry.lock")) -> str:
+    """Cache key for the smoke venv: lockfile hash + interpreter version."""
+    h = hashlib.sha256(lockfile.read_bytes() if lockfile.exists() else b"")
+    h.update(python_version.encode())
+    return h.hexdigest()[:12]
+
+
+def _gc_smoke_venvs(root: Path, keep: str) -> List[Path]:
+    """Remove cached venvs other than *keep*, plus legacy ``pv_smoke_*`` temp dirs."""
+    stale = [d for d in root.glob("*") if d.is_dir() and d.name != keep]
+    stale += list(Path(tempfile.gettempdir()).glob("pv_smoke_*"))
+    for d in stale:
+        shutil.rmtree(d, ignore_errors=True)
+    return stale
+
+
+@session(python=["3.12"], reuse_venv=True)
+def smoke_dist(session: Session) -> None:  # noqa: D401
+    """Build wheel (only if sources changed), install into a **cached** venv, run `pv --help`."""
     dist_dir = Path("dist")
+    src_hash = _file_digest(_wheel_sources())
     wheels = sorted(dist_dir.glob("personalvibe-*.whl"))
-    if not wheels:
-        session.error("Wheel not found in ./dist – build failed?")
+    if wheels and _WHEEL_STAMP.exists() and _WHEEL_STAMP.read_text() == src_hash:
+        _print_step("♻️  Sources unchanged – reusing wheel")
+    else:
+        _print_step("🏗️  Precompiling templates + building wheel …")
+        session.run("poetry", "run", "python", "-m", "personalvibe.templates", "--precompile", external=True)
+        session.run("poetry", "build", "-f", "wheel", external=True)
+        wheels = sorted(dist_dir.glob("personalvibe-*.whl"))
+        if not wheels:
+            session.error("Wheel not found in ./dist – build failed?")
+        _WHEEL_STAMP.write_text(src_hash)
     wheel = max(wheels, key=lambda p: p.stat().st_mtime)
-    _print_step(f"Wheel built: {wheel.name}")
-
-    import os
-    import subprocess
-    import sys
-    import tempfile
+    _print_step(f"Wheel: {wheel.name}")
 
-    venv_dir = Path(tempfile.mkdtemp(prefix="pv_smoke_"))
-    _print_step(f"🧪  Creating temp venv at {venv_dir}")
-    session.run("python", "-m", "venv", str(venv_dir), external=True)
+    key = _smoke_venv_key(str(session.python))
+    venv_dir = _SMOKE_ROOT / key
+    for stale in _gc_smoke_venvs(_SMOKE_ROOT, keep=key):
+        print(f"🧹  Removed stale smoke venv {stale}")
 
     bin_dir = venv_dir / ("Scripts" if os.name == "nt" else "bin")
     pip = bin_dir / ("pip.exe" if os.name == "nt" else "pip")
     pv_exe = bin_dir / ("pv.exe" if os.name == "nt" else "pv")
 
-    _print_step("📦  Installing wheel into temp venv …")
-    session.run(str(pip), "install", str(wheel), external=True)
+    if pip.exists():
+        _print_step(f"📦  Re-installing wheel (--no-deps) into warm venv {venv_dir} …")
+        session.run(str(pip), "install", "--no-deps", "--force-reinstall", str(wheel), external=True)
+    else:
+        _print_step(f"🧪  Creating cached venv at {venv_dir}")
+        try:
+            session.run("python", "-m", "venv", str(venv_dir), external=True)
+            session.run(str(pip), "install", str(wheel), external=True)
+        except BaseException:
+            shutil.rmtree(venv_dir, ignore_errors=True)  # never cache a half-built env
+            raise
 
     _print_step("🚀  Running `pv --help` smoke test …")
     session.run(str(pv_exe), "--help", external=True)
@@ -345,69 +394,25 @@ print('hello world')
 
 
 # --- FIXED _log_to IMPLEMENTATION ---
+try:
+    from personalvibe.log_tee import tee_output as _tee_output
+except ImportError:  # nox's own interpreter need not have the package installed
+    sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+    from personalvibe.log_tee import tee_output as _tee_output
+
+
 @contextmanager
 def _log_to(path: Path):  # type: ignore[override]  # type: ignore[no-redef]
     """
     Duplicate *all* stdout / stderr – including child-process output – to
-    ``path`` **in append mode** without dead-locking.
+    ``path`` **in append mode**.
 
-    Key fix:
-        Close the per-context TextIOWrapper duplicates **before** waiting
-        on the underlying ``tee`` process so that the pipe write-end is
-        fully closed (otherwise tee never terminates and pytest hangs).
+    Thin wrapper around :func:`personalvibe.log_tee.tee_output`, an
+    in-process tee (reader thread + bounded queue) that replaced the
+    ``tee -a`` helper process and its hand-managed fd wrappers.
     """
-    path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.touch(exist_ok=True)
-
-    # Spawn persistent tee (-a so we append)
-    tee_proc = subprocess.Popen(
-        ["tee", "-a", str(path)],
-        stdin=subprocess.PIPE,
-        text=False,  # binary FD handing
-    )
-    if tee_proc.stdin is None:  # pragma: no cover
-        raise RuntimeError("tee failed to provide stdin")
-
-    tee_fd = tee_proc.stdin.fileno()
-
-    # Save original low-level fds
-    saved_out_fd = os.dup(1)
-    saved_err_fd = os.dup(2)
-
-    # Route fd1/fd2 to tee
-    os.dup2(tee_fd, 1)
-    os.dup2(tee_fd, 2)
-
-    # High-level Python objects (wrappers around *new* duped fds)
-    saved_stdout_obj, saved_stderr_obj = sys.stdout, sys.stderr
-    wrapper_stdout = io.TextIOWrapper(os.fdopen(os.dup(1), "wb"), encoding="utf-8", line_buffering=True)
-    wrapper_stderr = io.TextIOWrapper(os.fdopen(os.dup(2), "wb"), encoding="utf-8", line_buffering=True)
-    sys.stdout, sys.stderr = wrapper_stdout, wrapper_stderr
-
-    try:
+    with _tee_output(path):
         yield
-    finally:
-        # Flush & CLOSE wrappers so no fd points to the pipe afterwards
-        try:
-            wrapper_stdout.flush()
-            wrapper_stderr.flush()
-        finally:
-            wrapper_stdout.close()
-            wrapper_stderr.close()
-
-        # Restore original low-level fds
-        os.dup2(saved_out_fd, 1)
-        os.dup2(saved_err_fd, 2)
-        os.close(saved_out_fd)
-        os.close(saved_err_fd)
-
-        # Close tee stdin and wait for it to finish writing
-        tee_proc.stdin.close()
-        tee_proc.wait()
-
-        # Restore original Python objects
-        sys.stdout, sys.stderr = saved_stdout_obj, saved_stderr_obj
 
 
 # --- END FIXED _log_to IMPLEMENTATION ---
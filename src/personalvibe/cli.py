@@ -8,20 +8,33 @@ Console-script “pv” now exposes **explicit** sub-commands:
     pv milestone   --config cfg.yaml [...]
     pv sprint      --config cfg.yaml [...]
     pv validate    --config cfg.yaml [...]
+    pv validate    [--changed [--base REF]]        # local quality-gate
+    pv validate    --jobs N                        # gate checks in parallel
+    pv logs        [PATH] --last-session           # newest session of a run log
     pv parse-stage --project_name X [--run]
+    pv warm-cache  [--cache-dir DIR] [--model M ...]
+    pv speculate   --branch vibed/X.Y.Z cand1.py cand2.py [--jobs K]
+    pv context     ctx.txt [...]                   # print the assembled context
+    pv tasks list                                  # built-in + project/$PV_TASK_DIRS tasks
+    pv check-configs [FILE ...] [--jobs N]         # validate prompts/*/configs/*.yaml
+    pv serve       [--socket PATH]                 # warm daemon on a Unix socket
+    pv --via-daemon run --config cfg.yaml          # forward to `pv serve`
 
 Common flags:
     --verbosity  {verbose,none,errors}
     --prompt_only
-    --max_retries N
+    --max_retries N        (deprecated, no effect)
+    --trace out.json       → Chrome / Perfetto trace of every pipeline phase
+    --profile [--profile-top N] [--profile-memory]   (any sub-command)
 Hidden flag:
-    --raw-argv "..."       → passes literal args to run_pipeline
+    --raw-argv "..."       → passes literal args to run_pipeline.main()
 
 Design notes
 ------------
-• Thin wrapper around personalvibe.run_pipeline.main().
-• `pv run` inspects YAML to discover `mode`, then *delegates* to the
-  specialised handler (so behaviour equals pv <mode>).
+• Loads the YAML once (run_pipeline.load_config) and calls
+  run_pipeline.execute(config, PipelineOptions(...)) in-process.
+• `pv run` behaves exactly like the specialised `pv <mode>` – the task is
+  taken from the YAML.
 • A dedicated `parse-stage` bridges to personalvibe.parse_stage.
 • Keeps **backward-compat alias**  pv prd  (no longer documented).
 """
@@ -29,82 +42,101 @@ Design notes
 from __future__ import annotations
 
 import argparse
+import importlib
 import os
 import platform
 import re
 import shlex
 import subprocess
 import sys
+import time
 from pathlib import Path
-from typing import List, Sequence, Union
+from typing import Any, Sequence, Union
 
-from personalvibe import run_pipeline, vibe_utils
-from personalvibe.parse_stage import extract_and_save_code_block
+# run_pipeline / vibe_utils pull in litellm, pydantic, jinja2 … – import them
+# only inside the commands that need them so `pv --help` starts instantly.
+_LAZY_MODULES = {
+    "run_pipeline": "personalvibe.run_pipeline",
+    "vibe_utils": "personalvibe.vibe_utils",
+}
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Keep ``cli.run_pipeline`` / ``cli.vibe_utils`` working as lazy attributes."""
+    if name in _LAZY_MODULES:
+        return importlib.import_module(_LAZY_MODULES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # --------------------------------------------------------------------- utils
-def _delegated_argv(extra: Sequence[str]) -> List[str]:
-    "Build argv list for re-invoking run_pipeline.main()."
-    return ["personalvibe.run_pipeline", *extra]
+def _pipeline_options(ns: argparse.Namespace) -> Any:  # noqa: ANN401
+    """PipelineOptions from the common flags (unset numbers keep the pipeline defaults)."""
+    from personalvibe import run_pipeline
 
+    if ns.max_retries is not None:
+        run_pipeline.warn_max_retries_deprecated()
+    overrides = {"max_tokens": ns.max_tokens} if ns.max_tokens is not None else {}
+    return run_pipeline.PipelineOptions(verbosity=ns.verbosity, prompt_only=ns.prompt_only, **overrides)
 
-def _call_run_pipeline(extra: Sequence[str]) -> None:
-    "Monkey-patch sys.argv then call run_pipeline.main()."
-    sys.argv = _delegated_argv(extra)
-    run_pipeline.main()  # never returns on sys.exit()
 
+def _execute_config(ns: argparse.Namespace) -> None:
+    """Load + validate the YAML once, then run the pipeline in-process."""
+    from personalvibe import run_pipeline, tracing
 
-# ----------------------------------------------------------------- commands
-def _cmd_run(ns: argparse.Namespace) -> None:
-    # Auto-detect mode just by *loading* the YAML (no validation error
-    # because run_pipeline will do it later anyway).
-    try:
-        import yaml  # local import to avoid mandatory dep here
+    with tracing.recording(ns.trace):
+        with tracing.span("load_config"):
+            config = run_pipeline.load_config(ns.config)
+        run_pipeline.execute(config, _pipeline_options(ns))
 
-        with open(ns.config, "r", encoding="utf-8") as f:
-            _unused_mode = yaml.safe_load(f).get("mode", "").strip()
-    except Exception:  # noqa: BLE001
-        mode = ""
 
-    # --raw-argv bypass (power users)
+# ----------------------------------------------------------------- commands
+def _cmd_run(ns: argparse.Namespace) -> None:
+    # --raw-argv bypass (power users): literal run_pipeline arguments
     if ns.raw_argv:
-        forwarded = shlex.split(ns.raw_argv)
-    else:
-        forwarded = [
-            "--config",
-            ns.config,
-            "--verbosity",
-            ns.verbosity,
-        ]
-        if ns.prompt_only:
-            forwarded.append("--prompt_only")
-        if ns.max_retries != 5:
-            forwarded += ["--max_retries", str(ns.max_retries)]
-        if ns.max_tokens != 16000:
-            forwarded += ["--max_tokens", str(ns.max_tokens)]
-
-    # Delegate straight away
-    _call_run_pipeline(forwarded)
+        from personalvibe import run_pipeline
 
+        run_pipeline.main(shlex.split(ns.raw_argv))
+        return
+    # The task lives in the YAML itself, so `pv run` == `pv <mode>`.
+    _execute_config(ns)
 
-def _cmd_mode(ns: argparse.Namespace, mode: str) -> None:
-    forwarded = [
-        "--config",
-        ns.config,
-        "--verbosity",
-        ns.verbosity,
-    ]
-    if ns.prompt_only:
-        forwarded.append("--prompt_only")
-    if ns.max_retries != 5:
-        forwarded += ["--max_retries", str(ns.max_retries)]
-    if ns.max_tokens != 16000:
-        forwarded += ["--max_tokens", str(ns.max_tokens)]
 
+def _cmd_mode(ns: argparse.Namespace, mode: str) -> None:
     # Inject the correct mode directly into YAML?  – not needed, YAML already
     # holds it; we *trust* user passed the right sub-command.
+    _execute_config(ns)
+
 
-    _call_run_pipeline(forwarded)
+def _cmd_validate(ns: argparse.Namespace) -> None:
+    if ns.config:
+        _cmd_mode(ns, "validate")
+        return
+
+    from personalvibe import logger, quality_gate
+
+    logger.configure_logging(ns.verbosity)
+    root = quality_gate.repo_root()
+    try:
+        if ns.changed:
+            plan = quality_gate.plan_changed(root, ns.base)
+        else:
+            plan = quality_gate.plan_full() if ns.jobs is None else quality_gate.plan_all(root)
+    except RuntimeError as e:  # a check's tool is not installed
+        print(str(e), file=sys.stderr)
+        raise SystemExit(1) from e
+    if ns.dry_run:
+        for check in plan.checks:
+            print(f"{check.name}: {shlex.join(check.cmd)}")
+        return
+    log_path = Path(ns.log) if ns.log else None
+    if ns.jobs is None:
+        rc = quality_gate.run_plan(plan, root, log_path=log_path)
+    else:
+        results = quality_gate.run_parallel(plan, root, jobs=ns.jobs or None, log_path=log_path)
+        print(quality_gate.format_report(results))
+        rc = next((r.returncode for r in results if not r.passed), 0)
+    if rc:
+        raise SystemExit(rc)
 
 
 def _cmd_parse_stage(ns: argparse.Namespace) -> None:
@@ -117,12 +149,95 @@ def _cmd_parse_stage(ns: argparse.Namespace) -> None:
         except ValueError as e:
             print(str(e))
             raise SystemExit(1) from e
+    from personalvibe.parse_stage import extract_and_save_code_block
+
     saved = extract_and_save_code_block(proj)
     if ns.run:
-        import runpy
+        from personalvibe.parse_stage import run_stage_script
+
+        run_stage_script(saved, snapshot=not ns.no_snapshot)
+
+
+def _cmd_logs(ns: argparse.Namespace) -> None:
+    from personalvibe import log_reader, vibe_utils
+
+    path = Path(ns.path) if ns.path else None
+    if path is None:
+        logs = sorted((vibe_utils.get_workspace_root() / "logs").glob("*_base.log"), key=lambda p: p.stat().st_mtime)
+        if not logs:
+            print("No *_base.log files found in logs/", file=sys.stderr)
+            raise SystemExit(1)
+        path = logs[-1]
+    text = log_reader.read_last_session(path) if ns.last_session else path.read_text(encoding="utf-8")
+    sys.stdout.write(text)
 
-        print(f"Running extracted code from: {saved}")
-        runpy.run_path(saved, run_name="__main__")
+
+def _cmd_context(ns: argparse.Namespace) -> None:
+    from personalvibe import vibe_utils
+
+    sys.stdout.write(vibe_utils.get_context(ns.paths))
+
+
+def _cmd_tasks_list(ns: argparse.Namespace) -> None:
+    from personalvibe.task_config import BUILTIN_TASK_DIR, TaskConfigError, task_manager
+
+    try:
+        configs = task_manager.preload()
+    except TaskConfigError as e:
+        print(str(e), file=sys.stderr)
+        raise SystemExit(1) from e
+    index = task_manager.index()
+    width = max((len(name) for name in configs), default=0)
+    for name, cfg in sorted(configs.items()):
+        origin = "builtin" if index[name].parent == BUILTIN_TASK_DIR else str(index[name])
+        print(f"{name:<{width}}  {cfg.semver:<5}  {cfg.task_summary}  [{origin}]")
+
+
+def _cmd_check_configs(ns: argparse.Namespace) -> None:
+    from personalvibe import config_check
+
+    started = time.perf_counter()
+    results = config_check.check_configs(ns.paths or None, root=ns.root, jobs=ns.jobs, use_cache=not ns.no_cache)
+    print(config_check.format_report(results, timings=ns.timings, elapsed_s=time.perf_counter() - started))
+    if any(not r.ok for r in results):
+        raise SystemExit(1)
+
+
+def _cmd_serve(ns: argparse.Namespace) -> None:
+    from personalvibe import daemon, logger
+
+    logger.configure_logging(ns.verbosity)
+    try:
+        daemon.serve(ns.socket, warm_up=not ns.no_warm)
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        raise SystemExit(1) from e
+
+
+def _cmd_warm_cache(ns: argparse.Namespace) -> None:
+    from personalvibe import tokenizer
+
+    target = tokenizer.warm_cache(ns.cache_dir, models=ns.model or ["o3"])
+    print(f"Tokenizer cache ready: {target}")
+    if tokenizer.get_cache_dir() != target:
+        print(f"Set PV_TOKENIZER_CACHE_DIR={target} so later runs use it offline.")
+
+
+def _cmd_speculate(ns: argparse.Namespace) -> None:
+    from personalvibe.retry_engine import RetryError
+    from personalvibe.speculative import run_speculative
+
+    try:
+        winner = run_speculative(
+            ns.scripts,
+            branch_name=ns.branch,
+            jobs=ns.jobs,
+            gate=shlex.split(ns.gate),
+        )
+    except RetryError as e:
+        print(str(e), file=sys.stderr)
+        raise SystemExit(1) from e
+    print(f"{ns.branch} → {winner.commit} (candidate {winner.script}, {winner.duration_s:.1f}s)")
 
 
 # ------------------------------------------------------------------- parser
@@ -132,15 +247,21 @@ def _build_parser() -> argparse.ArgumentParser:
         description="Personalvibe CLI – Command-Line Interface",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
+    p.add_argument(
+        "--via-daemon",
+        action="store_true",
+        help="Forward run/<mode>/context/parse-stage to a running `pv serve` (in-process if none).",
+    )
     sub = p.add_subparsers(dest="cmd", required=True, metavar="<command>")
 
     # Helper to DRY common args
-    def _common(sp):
-        sp.add_argument("--config", required=True, help="Path to YAML config file.")
+    def _common(sp, config_required=True):
+        sp.add_argument("--config", required=config_required, help="Path to YAML config file.")
         sp.add_argument("--verbosity", choices=["verbose", "none", "errors"], default="none")
         sp.add_argument("--prompt_only", action="store_true")
-        sp.add_argument("--max_retries", type=int, default=5)
-        sp.add_argument("--max_tokens", type=int, default=16000, help="Maximum completion tokens")
+        sp.add_argument("--max_retries", type=int, help="Deprecated: accepted for compatibility, has no effect.")
+        sp.add_argument("--max_tokens", type=int, help="Maximum completion tokens (pipeline default when omitted).")
+        sp.add_argument("--trace", metavar="FILE", help="Write per-phase timing spans (Chrome trace JSON) to FILE.")
 
     # run ----------
     run_sp = sub.add_parser("run", help="Determine mode from YAML then execute.")
@@ -149,11 +270,29 @@ def _build_parser() -> argparse.ArgumentParser:
     run_sp.set_defaults(func=_cmd_run)
 
     # explicit modes -
-    for _mode in ("milestone", "sprint", "validate", "prd", "bugfix"):
+    for _mode in ("milestone", "sprint", "prd", "bugfix"):
         m_sp = sub.add_parser(_mode, help=f"{_mode} workflow")
         _common(m_sp)
         m_sp.set_defaults(func=lambda ns, m=_mode: _cmd_mode(ns, m))
 
+    # validate: LLM workflow with --config, otherwise the quality-gate
+    v_sp = sub.add_parser("validate", help="validate workflow (--config) or local quality-gate")
+    _common(v_sp, config_required=False)
+    v_sp.add_argument("--changed", action="store_true", help="Only check what changed vs --base.")
+    v_sp.add_argument("--base", default="HEAD", help="Git ref to diff against with --changed.")
+    v_sp.add_argument("--dry-run", action="store_true", help="Print the planned checks without running them.")
+    v_sp.add_argument(
+        "--jobs",
+        type=int,
+        nargs="?",
+        const=0,
+        default=None,
+        metavar="N",
+        help="Run black/flake8/mypy/pytest concurrently (N workers, default one per CPU).",
+    )
+    v_sp.add_argument("--log", metavar="FILE", help="Also append all check output to FILE.")
+    v_sp.set_defaults(func=_cmd_validate)
+
     # new-milestone -------------------------------------------------
     nm = sub.add_parser("new-milestone", help="Scaffold next milestone YAML")
     nm.add_argument("--project_name", help="Override auto detection.")
@@ -175,16 +314,96 @@ def _build_parser() -> argparse.ArgumentParser:
     ps = sub.add_parser("parse-stage", help="Extract latest assistant code block.")
     ps.add_argument("--project_name", required=True)
     ps.add_argument("--run", action="store_true", help="Execute the extracted script after save.")
+    ps.add_argument(
+        "--no-snapshot", action="store_true", help="Skip the file snapshot that undoes writes if the script fails."
+    )
     ps.set_defaults(func=_cmd_parse_stage)
 
+    # logs ----
+    lg = sub.add_parser("logs", help="Print a run log (default: newest logs/*_base.log).")
+    lg.add_argument("path", nargs="?", help="Log file to read.")
+    lg.add_argument("--last-session", action="store_true", help="Only the part after the last BEGIN-STAMP.")
+    lg.set_defaults(func=_cmd_logs)
+
+    # context ----
+    cx = sub.add_parser("context", help="Print the project context built from context-path files.")
+    cx.add_argument("paths", nargs="+", help="Context files (as in project_context_paths).")
+    cx.set_defaults(func=_cmd_context)
+
+    # tasks ----
+    tk = sub.add_parser("tasks", help="Inspect the task registry.")
+    tk_sub = tk.add_subparsers(dest="tasks_cmd", required=True, metavar="<action>")
+    tk_sub.add_parser("list", help="Validate and list every task (built-in, .personalvibe/tasks, $PV_TASK_DIRS).")
+    tk.set_defaults(func=_cmd_tasks_list)
+
+    # check-configs ----
+    cc = sub.add_parser("check-configs", help="Validate run configs in bulk (pre-commit friendly).")
+    cc.add_argument("paths", nargs="*", help="Config files (default: prompts/*/configs/*.yaml under --root).")
+    cc.add_argument("--root", help="Workspace holding prompts/ and the result cache (default: workspace root).")
+    cc.add_argument("--jobs", type=int, help="Worker processes (default: one per CPU).")
+    cc.add_argument("--no-cache", action="store_true", help="Ignore and do not update the content-hash cache.")
+    cc.add_argument("--timings", action="store_true", help="Print one status/timing row per file.")
+    cc.set_defaults(func=_cmd_check_configs)
+
+    # serve ----
+    sv = sub.add_parser("serve", help="Keep a warm daemon answering `pv --via-daemon ...` on a Unix socket.")
+    sv.add_argument("--socket", help="Socket path (default: $PV_DAEMON_SOCKET or .personalvibe/pv.sock).")
+    sv.add_argument("--no-warm", action="store_true", help="Skip pre-loading litellm / tokenizer / templates.")
+    sv.add_argument("--verbosity", choices=["verbose", "none", "errors"], default="none")
+    sv.set_defaults(func=_cmd_serve)
+
+    # warm-cache ----
+    wc = sub.add_parser("warm-cache", help="Pre-download tokenizer files for offline runs.")
+    wc.add_argument("--cache-dir", help="Target dir (default: $PV_TOKENIZER_CACHE_DIR or tiktoken's).")
+    wc.add_argument("--model", action="append", help="Model whose tokenizer to fetch (repeatable).")
+    wc.set_defaults(func=_cmd_warm_cache)
+
+    # speculate ----
+    sp_ = sub.add_parser("speculate", help="Try candidate stage scripts in parallel git worktrees.")
+    sp_.add_argument("scripts", nargs="+", help="Candidate stage scripts.")
+    sp_.add_argument("--branch", required=True, help="Branch to point at the first passing candidate.")
+    sp_.add_argument("--jobs", type=int, default=3, help="Concurrent candidates.")
+    sp_.add_argument("--gate", default="bash tests/personalvibe.sh", help="Quality-gate command run in each worktree.")
+    sp_.set_defaults(func=_cmd_speculate)
+
+    # --profile on every sub-command ----
+    for sp_any in sub.choices.values():
+        sp_any.add_argument("--profile", action="store_true", help="Run under cProfile; write logs/<run>.*.prof.")
+        sp_any.add_argument("--profile-top", type=int, default=25, metavar="N", help="Hotspots to print.")
+        sp_any.add_argument("--profile-memory", action="store_true", help="Also report tracemalloc peak memory.")
+
     return p
 
 
+def _profile_run_id(ns: argparse.Namespace) -> str:
+    config = getattr(ns, "config", None)
+    return f"{Path(config).stem}_base" if config else ns.cmd
+
+
 def cli_main(argv: Union[Sequence[str], None] = None) -> None:
     parser = _build_parser()
+    argv = list(sys.argv[1:] if argv is None else argv)
     ns = parser.parse_args(argv)
+    if ns.via_daemon:
+        from personalvibe import daemon
+
+        forwarded = list(argv)
+        forwarded.remove("--via-daemon")
+        if ns.cmd in daemon.COMMANDS:
+            rc = daemon.forward(forwarded)
+            if rc is not None:
+                if rc:
+                    raise SystemExit(rc)
+                return
+            print(f"pv: no daemon at {daemon.socket_path()} – running in-process", file=sys.stderr)
     # dispatch
-    ns.func(ns)  # type: ignore[arg-type]
+    if ns.profile:
+        from personalvibe import profiling, vibe_utils
+
+        out = profiling.profile_path(vibe_utils.get_logs_dir(), _profile_run_id(ns))
+        profiling.run_profiled(ns.func, ns, out=out, top=ns.profile_top, memory=ns.profile_memory)
+    else:
+        ns.func(ns)  # type: ignore[arg-type]
 
 
 # ----------------------------------------------------------------- helpers
@@ -213,6 +432,8 @@ def _scan_versions(stages_dir: Path) -> list[tuple[int, int, int]]:
 
 # ----------------------------------------------------------------- NM
 def _cmd_new_milestone(ns: argparse.Namespace) -> None:
+    from personalvibe import vibe_utils
+
     proj = ns.project_name or vibe_utils.detect_project_name()
     stages = vibe_utils.get_base_path() / "prompts" / proj / "stages"
     stages.mkdir(parents=True, exist_ok=True)
@@ -231,6 +452,8 @@ def _cmd_new_milestone(ns: argparse.Namespace) -> None:
 
 # ----------------------------------------------------------------- PS
 def _cmd_prepare_sprint(ns: argparse.Namespace) -> None:
+    from personalvibe import vibe_utils
+
     proj = ns.project_name or vibe_utils.detect_project_name()
     stages = vibe_utils.get_base_path() / "prompts" / proj / "stages"
     stages.mkdir(parents=True, exist_ok=True)
@@ -253,6 +476,8 @@ def _cmd_prepare_sprint(ns: argparse.Namespace) -> None:
 
 # ----------------------------------------------------------------- PB
 def _cmd_prepare_bugfix(ns: argparse.Namespace) -> None:
+    from personalvibe import vibe_utils
+
     proj = ns.project_name or vibe_utils.detect_project_name()
     stages = vibe_utils.get_base_path() / "prompts" / proj / "stages"
     stages.mkdir(parents=True, exist_ok=True)
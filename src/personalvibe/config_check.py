@@ -0,0 +1,219 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Bulk validation of run configs behind ``pv check-configs``.
+
+Pre-commit hooks validate every ``prompts/*/configs/*.yaml``.  Loading them
+one by one through :func:`personalvibe.run_pipeline.load_config` (pure
+Python YAML, regex sanitiser, pydantic) takes seconds for a few hundred
+files, so this module:
+
+* parses with libyaml's ``CSafeLoader`` when it is available
+  (:func:`personalvibe.yaml_utils.safe_load`);
+* remembers every result – pass *or* failure – by file content hash in
+  ``<root>/.personalvibe/cache/config_check.json``.  The cache is dropped
+  when the schema code changes;
+* validates the remaining files in a process pool, skipping the pool
+  when only a few files are stale.
+
+Configs without ``project_name`` get the ``prompts/<project>/`` directory
+name, which is what ``load_config`` auto-detects for them.
+
+Public API
+----------
+CONFIG_GLOB                        configs checked when no paths are given
+ConfigResult                       outcome and timing for one file
+find_configs(root)                 every config under *root*
+check_file(path)                   validate one file → error message or ``None``
+check_configs(paths, root, jobs)   validate many → list of ConfigResult
+format_report(results)             per-file errors, timings and a summary
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from importlib import resources
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+log = logging.getLogger(__name__)
+
+CONFIG_GLOB = "prompts/*/configs/*.yaml"
+_CACHE_VERSION = 1
+# below this many stale files, forking workers costs more than it saves
+_POOL_THRESHOLD = 16
+
+
+@dataclass
+class ConfigResult:
+    """Outcome of validating one config file."""
+
+    path: Path
+    error: Union[str, None]
+    duration_s: float
+    cached: bool = False
+
+    @property
+    def ok(self: ConfigResult) -> bool:
+        return self.error is None
+
+
+def find_configs(root: Path) -> List[Path]:
+    """Every :data:`CONFIG_GLOB` file under *root*, sorted."""
+    return sorted(root.glob(CONFIG_GLOB))
+
+
+def check_file(path: Union[str, Path]) -> Tuple[Union[str, None], float]:
+    """Validate *path* like ``load_config``; return ``(error or None, seconds)``."""
+    from pydantic import ValidationError
+
+    from personalvibe.run_pipeline import ConfigModel, parse_config_text
+
+    t0 = time.perf_counter()
+    path = Path(path)
+    try:
+        raw = parse_config_text(path.read_text(encoding="utf-8"), path)
+        if not raw.get("project_name"):
+            raw["project_name"] = path.parent.parent.name
+        ConfigModel(**raw)
+        error = None
+    except ValidationError as e:
+        error = str(e)
+    except Exception as e:  # noqa: BLE001
+        error = f"{type(e).__name__}: {e}"
+    return error, time.perf_counter() - t0
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _schema_digest() -> str:
+    """Hash of the code that decides whether a config is valid."""
+    package = resources.files("personalvibe")  # also works when __file__ is unset (zipapps, frozen builds)
+    h = hashlib.sha256()
+    for module in ("run_pipeline.py", "yaml_utils.py"):
+        h.update(package.joinpath(module).read_bytes())
+    return h.hexdigest()
+
+
+class _ResultCache:
+    """``content sha256 → error or None`` for configs already checked."""
+
+    def __init__(self: _ResultCache, path: Path) -> None:
+        self.path = path
+        self.schema = _schema_digest()
+        self.results: Dict[str, Union[str, None]] = {}
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("version") == _CACHE_VERSION and data.get("schema") == self.schema:
+                    self.results = data["results"]
+            except (ValueError, KeyError):
+                log.debug("Ignoring corrupt config cache %s", path)
+
+    def save(self: _ResultCache) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {"version": _CACHE_VERSION, "schema": self.schema, "results": self.results}
+            self.path.write_text(json.dumps(payload), encoding="utf-8")
+        except OSError as e:
+            log.debug("Config cache not written (%s): %s", self.path, e)
+
+
+def check_configs(
+    paths: Union[Iterable[Union[str, Path]], None] = None,
+    root: Union[str, Path, None] = None,
+    jobs: Union[int, None] = None,
+    use_cache: bool = True,
+) -> List[ConfigResult]:
+    """Validate many config files, reusing cached results for unchanged ones.
+
+    Parameters
+    ----------
+    paths
+        Files to check (default: :func:`find_configs` under *root*).
+    root
+        Workspace holding ``prompts/`` and the cache (default:
+        :func:`personalvibe.vibe_utils.get_workspace_root`).
+    jobs
+        Worker processes (default: one per CPU).
+    use_cache
+        Read and update ``.personalvibe/cache/config_check.json``.
+
+    Returns
+    -------
+    list of ConfigResult
+        In input (or sorted) order.
+    """
+    if root is None:
+        from personalvibe import vibe_utils
+
+        root = vibe_utils.get_workspace_root()
+    root = Path(root)
+    files = [Path(p) for p in paths] if paths is not None else find_configs(root)
+    cache = _ResultCache(root / ".personalvibe" / "cache" / "config_check.json") if use_cache else None
+
+    results: Dict[Path, ConfigResult] = {}
+    digests: Dict[Path, str] = {}
+    stale: List[Path] = []
+    for path in files:
+        t0 = time.perf_counter()
+        try:
+            digest = _digest(path.read_bytes())
+        except OSError as e:
+            results[path] = ConfigResult(path, f"{type(e).__name__}: {e}", time.perf_counter() - t0)
+            continue
+        digests[path] = digest
+        if cache is not None and digest in cache.results:
+            results[path] = ConfigResult(path, cache.results[digest], time.perf_counter() - t0, cached=True)
+        else:
+            stale.append(path)
+
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(stale) or 1))
+    if len(stale) < _POOL_THRESHOLD:
+        workers = 1
+    outcomes: List[Tuple[Union[str, None], float]]
+    if workers > 1:
+        chunksize = max(1, len(stale) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(check_file, stale, chunksize=chunksize))
+    else:
+        outcomes = [check_file(p) for p in stale]
+    for path, (error, took) in zip(stale, outcomes):
+        results[path] = ConfigResult(path, error, took)
+        if cache is not None:
+            cache.results[digests[path]] = error
+
+    if cache is not None and stale:
+        cache.save()
+    log.info("Checked %d configs (%d from cache, %d worker(s))", len(files), len(files) - len(stale), workers)
+    return [results[p] for p in files]
+
+
+def format_report(
+    results: Sequence[ConfigResult], *, timings: bool = False, elapsed_s: Union[float, None] = None
+) -> str:
+    """Errors of failing files, optional per-file timings, then a summary line.
+
+    *elapsed_s* is the wall-clock time of the whole check (default: the sum
+    of the per-file times).
+    """
+    lines: List[str] = []
+    for r in results:
+        if timings:
+            status = "ok" if r.ok else "FAIL"
+            lines.append(f"{status:<4} {r.duration_s * 1000:>8.1f}ms{' (cached)' if r.cached else ''}  {r.path}")
+    for r in results:
+        if not r.ok:
+            lines += [f"── {r.path}", str(r.error).rstrip()]
+    failed = sum(not r.ok for r in results)
+    cached = sum(r.cached for r in results)
+    total = elapsed_s if elapsed_s is not None else sum(r.duration_s for r in results)
+    lines.append(f"{len(results)} configs, {failed} failed, {cached} cached in {total:.2f}s")
+    return "\n".join(lines)
@@ -0,0 +1,321 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Warm ``pv serve`` daemon and its thin ``pv --via-daemon`` client.
+
+Every ``pv`` process pays for interpreter start-up, the litellm / tiktoken /
+pydantic / Jinja imports and cold caches before doing any work.  ``pv
+serve`` pays that once: it imports the pipeline, initialises LiteLLM, loads
+the tokenizer and every prompt template, then answers requests on a local
+Unix socket.  Editor integrations and scripted loops get millisecond
+dispatch instead of seconds.
+
+Protocol (one connection per command, UTF-8 JSON lines)::
+
+    client → {"argv": ["run", "--config", "1.2.0.yaml"], "cwd": "...", "env": {...}}
+    daemon → {"stream": "stdout" | "stderr", "data": "..."}   (repeated)
+    daemon → {"exit": 0}
+
+The command runs through :func:`personalvibe.cli.cli_main` with the
+client's working directory and environment, and its output – including
+log records – is streamed back as it is written.  Requests are handled one
+at a time (they share ``sys.stdout``, the cwd and logging).  Only the
+commands in :data:`COMMANDS` are accepted; anything else runs in-process on
+the client side.
+
+Socket: ``$PV_DAEMON_SOCKET``, else ``<workspace>/.personalvibe/pv.sock``
+(``$PV_DATA_DIR`` or the cwd), created with mode ``0600``.
+
+Public API
+----------
+socket_path()            where the daemon listens
+warm()                   import / initialise the heavy stack once
+make_server(path)        bound (not yet serving) socket server
+serve(path)              ``pv serve`` – run until interrupted
+forward(argv, path)      ``pv --via-daemon`` – exit code, or ``None`` if no daemon
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, Sequence, TextIO, Union, cast
+
+log = logging.getLogger(__name__)
+
+SOCKET_ENV = "PV_DAEMON_SOCKET"
+COMMANDS = frozenset({"run", "milestone", "sprint", "prd", "bugfix", "context", "parse-stage"})
+_MAX_UNIX_PATH = 100  # sun_path is 104–108 bytes depending on the OS
+
+
+def socket_path() -> Path:
+    """``$PV_DAEMON_SOCKET`` or ``<workspace>/.personalvibe/pv.sock``.
+
+    Workspaces whose path is too long for ``AF_UNIX`` get a per-workspace
+    socket in the temp dir instead.
+    """
+    env = os.getenv(SOCKET_ENV)
+    if env:
+        return Path(env).expanduser()
+    workspace = Path(os.getenv("PV_DATA_DIR") or Path.cwd()).expanduser().resolve()
+    path = workspace / ".personalvibe" / "pv.sock"
+    if len(str(path)) > _MAX_UNIX_PATH:
+        digest = hashlib.sha256(str(workspace).encode()).hexdigest()[:12]
+        path = Path(tempfile.gettempdir()) / f"pv-{digest}.sock"
+    return path
+
+
+def warm() -> float:
+    """Import and initialise the heavy modules; return the seconds spent."""
+    started = time.perf_counter()
+    from personalvibe import llm_router, run_pipeline, templates, tokenizer  # noqa: F401
+
+    llm_router._get_litellm()
+    tokenizer.get_encoder()
+    templates.warm()
+    took = time.perf_counter() - started
+    log.info("Daemon warm-up took %.2fs", took)
+    return took
+
+
+# ------------------------------------------------------------------ server
+class _StreamWriter(io.TextIOBase):
+    """File-like object forwarding every write as a ``{"stream": …}`` line."""
+
+    def __init__(self: _StreamWriter, wfile: Any, name: str, lock: threading.Lock) -> None:  # noqa: ANN401
+        self.wfile = wfile
+        self.name = name
+        self.lock = lock
+
+    def writable(self: _StreamWriter) -> bool:
+        return True
+
+    def write(self: _StreamWriter, data: str) -> int:
+        if data:
+            _send(self.wfile, {"stream": self.name, "data": data}, self.lock)
+        return len(data)
+
+
+def _send(wfile: Any, message: Dict[str, Any], lock: threading.Lock) -> None:  # noqa: ANN401
+    line = (json.dumps(message) + "\n").encode("utf-8")
+    with lock:
+        try:
+            wfile.write(line)
+            wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client went away – finish the command anyway
+
+
+@contextlib.contextmanager
+def _client_context(cwd: Union[str, None], env: Union[Dict[str, str], None]) -> Iterator[None]:
+    """Temporarily adopt the client's working directory and environment.
+
+    The client's ``.env`` (nearest one above its cwd) is loaded on top of its
+    environment without overriding it – what ``pv`` would have loaded itself.
+    """
+    import dotenv
+
+    old_cwd = os.getcwd()
+    old_env = dict(os.environ)
+    try:
+        if env is not None:
+            os.environ.clear()
+            os.environ.update(env)
+        if cwd:
+            os.chdir(cwd)
+        env_file = dotenv.find_dotenv(usecwd=True)
+        if env_file:
+            dotenv.load_dotenv(env_file, override=False)
+        yield
+    finally:
+        os.chdir(old_cwd)
+        os.environ.clear()
+        os.environ.update(old_env)
+
+
+def _runs_generated_code(argv: Sequence[str]) -> bool:
+    return argv[0] == "parse-stage" and "--run" in argv
+
+
+def _dispatch_child(argv: Sequence[str], stdout: IO[str], stderr: IO[str]) -> int:
+    """Run ``pv <argv>`` in a child process (client cwd / env), relaying its output."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "personalvibe.cli", *argv],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+    )
+
+    def _pump(src: IO[str], dest: IO[str]) -> None:
+        for line in src:
+            dest.write(line)
+
+    assert proc.stdout is not None and proc.stderr is not None
+    relay = threading.Thread(target=_pump, args=(proc.stderr, stderr), daemon=True)
+    relay.start()
+    _pump(proc.stdout, stdout)
+    relay.join()
+    return proc.wait()
+
+
+def _dispatch(argv: Sequence[str], stdout: IO[str], stderr: IO[str]) -> int:
+    """Run ``pv <argv>`` with output bound to *stdout* / *stderr*.
+
+    Commands run in this process, except ``parse-stage --run``: LLM-generated
+    stage scripts get a child process so they cannot touch the daemon.
+    """
+    from personalvibe import cli, logger
+
+    if not argv or argv[0] not in COMMANDS:
+        print(f"pv serve: unsupported command {argv[:1]!r} (allowed: {', '.join(sorted(COMMANDS))})", file=stderr)
+        return 2
+    if _runs_generated_code(argv):
+        return _dispatch_child(argv, stdout, stderr)
+    daemon_handlers, daemon_level = logging.root.handlers[:], logging.root.level
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        logger.reset_logging()  # next configure_logging binds to the client's stream
+        try:
+            cli.cli_main(list(argv))
+            return 0
+        except SystemExit as exc:
+            code = exc.code
+            if code is None or isinstance(code, int):
+                return code or 0
+            print(code, file=stderr)
+            return 1
+        except Exception:  # noqa: BLE001
+            traceback.print_exc(file=stderr)
+            return 1
+        finally:
+            for handler in logging.root.handlers:
+                handler.close()  # per-run log files must not pile up in a long-lived process
+            logger.reset_logging()
+            logging.root.handlers[:] = daemon_handlers
+            logging.root.setLevel(daemon_level)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self: _Handler) -> None:
+        lock = threading.Lock()
+        started = time.perf_counter()
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+            argv = [str(a) for a in request.get("argv", [])]
+        except (ValueError, AttributeError, TypeError):
+            _send(self.wfile, {"stream": "stderr", "data": "pv serve: malformed request\n"}, lock)
+            _send(self.wfile, {"exit": 2}, lock)
+            return
+        # TextIOBase provides every IO[str] method; typeshed just does not relate the two
+        out = cast(IO[str], _StreamWriter(self.wfile, "stdout", lock))
+        err = cast(IO[str], _StreamWriter(self.wfile, "stderr", lock))
+        with _client_context(request.get("cwd"), request.get("env")):
+            code = _dispatch(argv, out, err)
+        _send(self.wfile, {"exit": code}, lock)
+        log.info("pv %s → exit %d in %.3fs", " ".join(argv), code, time.perf_counter() - started)
+
+
+def _check_supported() -> None:
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("pv serve needs Unix domain sockets (not available on this platform)")
+
+
+def make_server(path: Union[str, Path, None] = None) -> socketserver.UnixStreamServer:
+    """Bind the daemon socket at *path*, replacing a stale socket file.
+
+    The socket is bound inside a fresh ``0700`` directory, made ``0600`` and
+    only then renamed into place, so other users can never connect to it.
+
+    Raises
+    ------
+    RuntimeError
+        If another daemon is already answering on *path*.
+    """
+    _check_supported()
+    path = Path(path) if path else socket_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        with contextlib.suppress(OSError), socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.connect(str(path))
+            raise RuntimeError(f"a pv daemon is already listening on {path}")
+        path.unlink()  # left behind by a daemon that died
+    private = Path(tempfile.mkdtemp(prefix=".pv-sock-", dir=path.parent))  # mode 0700
+    try:
+        staged = private / "s"
+        server = socketserver.UnixStreamServer(str(staged), _Handler)
+        os.chmod(staged, 0o600)
+        os.replace(staged, path)
+    finally:
+        shutil.rmtree(private, ignore_errors=True)
+    return server
+
+
+def serve(path: Union[str, Path, None] = None, *, warm_up: bool = True) -> None:
+    """Warm up, then answer requests on *path* until interrupted."""
+    where = Path(path) if path else socket_path()
+    server = make_server(where)
+    try:
+        if warm_up:
+            warm()
+        log.info("pv daemon listening on %s", where)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        with contextlib.suppress(OSError):
+            where.unlink()
+        log.info("pv daemon on %s stopped", where)
+
+
+# ------------------------------------------------------------------ client
+def forward(
+    argv: Sequence[str],
+    path: Union[str, Path, None] = None,
+    *,
+    stdout: Union[TextIO, None] = None,
+    stderr: Union[TextIO, None] = None,
+) -> Union[int, None]:
+    """Run ``pv <argv>`` on the daemon, streaming its output.
+
+    Returns the command's exit code, or ``None`` when no daemon is reachable
+    at *path* (the caller should then run the command itself).
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = Path(path) if path else socket_path()
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    streams = {"stdout": stdout, "stderr": stderr}
+    with sock, sock.makefile("rwb") as conn:
+        request = {"argv": list(argv), "cwd": os.getcwd(), "env": dict(os.environ)}
+        conn.write((json.dumps(request) + "\n").encode("utf-8"))
+        conn.flush()
+        for raw in conn:
+            message = json.loads(raw)
+            if "exit" in message:
+                return int(message["exit"])
+            target = streams.get(message.get("stream"), stderr)
+            target.write(message.get("data", ""))
+            target.flush()
+    print("pv: daemon closed the connection without an exit code", file=stderr)
+    return 1
@@ -0,0 +1,174 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Turn raw pytest / mypy / flake8 logs into compact, structured failures.
+
+Bugfix prompts used to paste whole error files – often hundreds of KB of
+nox output where the same failure shows up once per interpreter.  This
+module extracts just the signal:
+
+* pytest   – test id, ``file:line``, the ``E`` assertion lines and a
+             trimmed traceback (``>`` source lines + locations)
+* mypy     – ``file:line`` + message + error code
+* flake8   – ``file:line`` + code + message
+
+Failures are deduplicated (repeats are counted) and rendered up to a
+token cap, test failures first.
+
+Public API
+----------
+Failure                           one extracted failure
+parse_failures(text)              every failure found in *text*, deduplicated
+format_failures(failures, cap)    prompt-ready text within *cap* tokens
+compact_error_text(text, cap)     the above, falling back to the log tail
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from personalvibe import tokenizer
+
+DEFAULT_TOKEN_CAP = 4000
+MAX_TRACEBACK_LINES = 12
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+_SECTION = re.compile(r"^_{3,} (?P<name>.+?) _{3,}$")
+_FIXTURE_ERROR = re.compile(r"^ERROR at (setup|teardown) of ")
+_RULE = re.compile(r"^(={3,}|_{3,}|-{3,}).*$")
+_SUMMARY = re.compile(r"^(?P<kind>FAILED|ERROR) (?P<id>\S+?)(?: - (?P<msg>.*))?$")
+_LOCATION = re.compile(r"^(?P<file>[^\s:]+\.py):(?P<line>\d+): (?P<exc>\w+)")
+_MYPY = re.compile(r"^(?P<file>[^\s:]+\.pyi?):(?P<line>\d+):(?:\d+:)? error: (?P<msg>.+?)(?:  \[(?P<code>[\w-]+)\])?$")
+_FLAKE8 = re.compile(r"^(?P<file>[^\s:]+\.py):(?P<line>\d+):\d+: (?P<code>[A-Z]+\d+) (?P<msg>.+)$")
+_TOOL_ORDER = {"pytest": 0, "mypy": 1, "flake8": 2}
+
+
+@dataclass
+class Failure:
+    """One failure extracted from a tool log."""
+
+    tool: str  # "pytest" | "mypy" | "flake8"
+    location: str = ""  # "path.py:123"
+    message: str = ""
+    test_id: str = ""
+    traceback: List[str] = field(default_factory=list)
+    count: int = 1
+
+    @property
+    def key(self: Failure) -> Tuple[str, str, str]:
+        """Identity used for deduplication."""
+        return (self.tool, self.test_id or self.location, self.message)
+
+    def render(self: Failure) -> str:
+        """Compact multi-line description."""
+        head = f"[{self.tool}] {self.test_id or self.location}"
+        if self.test_id and self.location:
+            head += f" ({self.location})"
+        if self.count > 1:
+            head += f" ×{self.count}"
+        lines = [head]
+        if self.message:
+            lines.append(f"  {self.message}")
+        lines += [f"    {t}" for t in self.traceback]
+        return "\n".join(lines)
+
+
+# ---------------------------------------------------------------- parsers
+def _parse_pytest(lines: List[str]) -> List[Failure]:
+    summary: Dict[str, str] = {}
+    for line in lines:
+        m = _SUMMARY.match(line)
+        if m and "::" in m["id"]:
+            summary[m["id"]] = (m["msg"] or "").strip()
+
+    failures: List[Failure] = []
+    seen_ids = set()
+    idx = 0
+    while idx < len(lines):
+        m = _SECTION.match(lines[idx])
+        if not m:
+            idx += 1
+            continue
+        name = m["name"].strip()
+        body: List[str] = []
+        idx += 1
+        while idx < len(lines) and not _SECTION.match(lines[idx]) and not _RULE.match(lines[idx]):
+            body.append(lines[idx])
+            idx += 1
+        name = _FIXTURE_ERROR.sub("", name)
+        if name.startswith(("Captured", "warnings")):
+            continue
+        suffix = "::" + name.replace(".", "::")
+        test_id = next((tid for tid in summary if tid.endswith(suffix)), name)
+        errors = [ln[1:].strip() for ln in body if ln.startswith("E ")]
+        locations = [ln.strip() for ln in body if _LOCATION.match(ln.strip())]
+        trace = [ln.rstrip() for ln in body if ln.startswith(">")] + locations
+        loc = _LOCATION.match(locations[-1]) if locations else None
+        failures.append(
+            Failure(
+                tool="pytest",
+                test_id=test_id,
+                location=f"{loc['file']}:{loc['line']}" if loc else "",
+                message=" ".join(errors[:3]) or summary.get(test_id, ""),
+                traceback=trace[-MAX_TRACEBACK_LINES:],
+            )
+        )
+        seen_ids.add(test_id)
+
+    # -q / --tb=no runs only have the short summary
+    failures += [Failure("pytest", test_id=tid, message=msg) for tid, msg in summary.items() if tid not in seen_ids]
+    return failures
+
+
+def _parse_linters(lines: List[str]) -> List[Failure]:
+    failures: List[Failure] = []
+    for line in lines:
+        m = _MYPY.match(line)
+        if m:
+            msg = m["msg"] + (f" [{m['code']}]" if m["code"] else "")
+            failures.append(Failure("mypy", location=f"{m['file']}:{m['line']}", message=msg))
+            continue
+        m = _FLAKE8.match(line)
+        if m:
+            failures.append(Failure("flake8", location=f"{m['file']}:{m['line']}", message=f"{m['code']} {m['msg']}"))
+    return failures
+
+
+def parse_failures(text: str) -> List[Failure]:
+    """Extract and deduplicate every pytest / mypy / flake8 failure in *text*."""
+    lines = [_ANSI.sub("", ln) for ln in text.splitlines()]
+    unique: Dict[Tuple[str, str, str], Failure] = {}
+    for failure in _parse_pytest(lines) + _parse_linters(lines):
+        if failure.key in unique:
+            unique[failure.key].count += 1
+        else:
+            unique[failure.key] = failure
+    return sorted(unique.values(), key=lambda f: _TOOL_ORDER[f.tool])  # stable: log order within a tool
+
+
+# -------------------------------------------------------------- rendering
+def format_failures(failures: List[Failure], token_cap: int = DEFAULT_TOKEN_CAP) -> str:
+    """Render *failures* in priority order until *token_cap* tokens are used."""
+    blocks: List[str] = []
+    used = 0
+    for idx, failure in enumerate(failures):
+        block = failure.render()
+        cost = tokenizer.num_tokens(block)
+        if blocks and used + cost > token_cap:
+            blocks.append(f"… {len(failures) - idx} more failure(s) omitted (token cap {token_cap})")
+            break
+        blocks.append(block)
+        used += cost
+    return "\n\n".join(blocks)
+
+
+def compact_error_text(text: str, token_cap: int = DEFAULT_TOKEN_CAP) -> str:
+    """Structured failures from *text*, or its tail when nothing parses."""
+    failures = parse_failures(text)
+    if failures:
+        return format_failures(failures, token_cap)
+    if tokenizer.num_tokens(text) <= token_cap:
+        return text
+    tail = text[-int(token_cap * tokenizer.CHARS_PER_TOKEN) :]
+    return "… (truncated)\n" + tail[tail.find("\n") + 1 :]
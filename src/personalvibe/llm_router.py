@@ -7,15 +7,23 @@ Public helper
 chat_completion(model: str | None, messages: list, **kw) -> Any
     • `model` None / "" defaults to "openai/gpt-4o-mini"
     • Thin sync wrapper around `litellm.completion`
+
+LiteLLM is imported lazily, the first time a non-custom provider is used –
+``sharp_boe/`` calls never pay for it.  Before that import we force the
+bundled model cost map (``LITELLM_LOCAL_MODEL_COST_MAP=True``) so a
+sandboxed / offline run does not stall on a remote fetch; export
+``LITELLM_LOCAL_MODEL_COST_MAP=False`` to opt back in.  The one-off
+initialisation time is logged at DEBUG.
 """
 
 from __future__ import annotations
 
 import logging
 import os
+import time
+from types import ModuleType
 from typing import Any, List, Union
 
-import litellm
 import requests
 
 # runtime dependency injected by chunk-1
@@ -24,6 +32,32 @@ _log = logging.getLogger(__name__)
 
 _DEFAULT_MODEL = "openai/o3"
 
+# set before the first ``import litellm`` (explicit user values win)
+_LITELLM_ENV_DEFAULTS = {
+    "LITELLM_LOCAL_MODEL_COST_MAP": "True",  # no network fetch at import
+    "LITELLM_TELEMETRY": "False",
+}
+
+_litellm: Union[ModuleType, None] = None
+_litellm_init_s: Union[float, None] = None
+
+
+def _get_litellm() -> ModuleType:
+    """Import and configure LiteLLM on first use (cached afterwards)."""
+    global _litellm, _litellm_init_s
+    if _litellm is None:
+        for key, value in _LITELLM_ENV_DEFAULTS.items():
+            os.environ.setdefault(key, value)
+        started = time.perf_counter()
+        import litellm
+
+        litellm.telemetry = False
+        litellm.suppress_debug_info = True
+        _litellm_init_s = time.perf_counter() - started
+        _litellm = litellm
+        _log.debug("LiteLLM initialised in %.2fs", _litellm_init_s)
+    return _litellm
+
 
 # ------------------------------------------------------------------
 
@@ -108,7 +142,7 @@ def chat_completion(
     _log.debug("llm_router → %s  (%d msgs)", _model, len(messages))
 
     try:
-        return litellm.completion(model=_model, messages=messages, **kwargs)
+        return _get_litellm().completion(model=_model, messages=messages, **kwargs)
     except Exception as exc:  # noqa: BLE001
         # LiteLLM raises many specialised errors; we re-raise untouched
         _log.error("LiteLLM call failed: %s", exc)
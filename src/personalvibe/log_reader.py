@@ -0,0 +1,109 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Read only the most recent session of an append-only ``*_base.log``.
+
+``logger.configure_logging`` appends a ``BEGIN-STAMP <iso>`` line to
+``logs/<run_id>.log`` on every invocation, so these files grow across
+sessions.  Readers that build error context only want the last session.
+
+When writing a stamp we also append its byte offset to a sidecar
+``<log>.idx`` file (one decimal offset per line).  Finding the last session
+is then O(1): read the tail of the index, check the stamp is really at that
+offset, seek, read.  Files without a (valid) index – e.g. logs produced by
+older versions or copied elsewhere – are scanned *backwards* from the end
+in fixed-size blocks until the last stamp is found.
+
+Public API
+----------
+write_begin_stamp(path)     append a stamp line and index its offset
+last_session_offset(path)   byte offset of the last stamp (0 if none)
+read_last_session(path)     text of the last session only
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Union
+
+log = logging.getLogger(__name__)
+
+STAMP = b"BEGIN-STAMP "
+INDEX_SUFFIX = ".idx"
+_BLOCK = 64 * 1024
+
+
+def index_path(log_path: Union[str, Path]) -> Path:
+    """Sidecar offset index for *log_path*."""
+    p = Path(log_path)
+    return p.with_name(p.name + INDEX_SUFFIX)
+
+
+def write_begin_stamp(log_path: Union[str, Path], when: Union[datetime, None] = None) -> int:
+    """Append ``BEGIN-STAMP <iso>`` to *log_path*; return (and index) its offset."""
+    ts = (when or datetime.utcnow()).isoformat(timespec="seconds")
+    with Path(log_path).open("ab") as fh:
+        offset = fh.seek(0, os.SEEK_END)
+        fh.write(STAMP + ts.encode() + b"\n")
+    with index_path(log_path).open("a", encoding="utf-8") as idx:
+        idx.write(f"{offset}\n")
+    return offset
+
+
+def _indexed_offset(log_path: Path, size: int) -> Union[int, None]:
+    idx = index_path(log_path)
+    try:
+        with idx.open("rb") as fh:
+            end = fh.seek(0, os.SEEK_END)
+            fh.seek(max(0, end - 64))
+            last = fh.read().split()[-1]
+        offset = int(last)
+    except (OSError, ValueError, IndexError):
+        return None
+    if offset >= size:
+        return None
+    with log_path.open("rb") as fh:
+        fh.seek(offset)
+        if fh.read(len(STAMP)) != STAMP:  # log rewritten / truncated – index is stale
+            return None
+    return offset
+
+
+def _scan_backwards(log_path: Path, size: int) -> int:
+    needle = b"\n" + STAMP
+    with log_path.open("rb") as fh:
+        pos = size
+        carry = b""
+        while pos > 0:
+            start = max(0, pos - _BLOCK)
+            fh.seek(start)
+            block = fh.read(pos - start) + carry
+            hit = block.rfind(needle)
+            if hit != -1:
+                return start + hit + 1
+            if start == 0 and block.startswith(STAMP):
+                return 0
+            carry = block[: len(needle)]  # a stamp may straddle two blocks
+            pos = start
+    return 0
+
+
+def last_session_offset(log_path: Union[str, Path]) -> int:
+    """Byte offset of the last ``BEGIN-STAMP`` line (``0`` when there is none)."""
+    path = Path(log_path)
+    size = path.stat().st_size
+    offset = _indexed_offset(path, size)
+    if offset is None:
+        offset = _scan_backwards(path, size)
+        log.debug("No usable index for %s – scanned backwards to offset %d", path, offset)
+    return offset
+
+
+def read_last_session(log_path: Union[str, Path]) -> str:
+    """Text from the last ``BEGIN-STAMP`` to the end (whole file if unstamped)."""
+    path = Path(log_path)
+    with path.open("rb") as fh:
+        fh.seek(last_session_offset(path))
+        return fh.read().decode("utf-8", errors="replace")
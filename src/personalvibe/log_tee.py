@@ -0,0 +1,153 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""In-process tee: copy output to the console *and* a log file.
+
+Replaces the ``tee -a`` helper process that ``noxfile._log_to`` used to
+spawn.  A reader thread drains a pipe, writes each chunk straight to the
+console and hands it to a writer thread through a **bounded** queue.  When
+the log file falls behind the queue fills up, the reader stops draining,
+the pipe fills and the producer blocks – backpressure instead of unbounded
+memory.  stdout and stderr share one pipe, so their relative order is kept.
+
+Public API
+----------
+tee_output(path)      context manager: fds 1/2 (+ child processes) → console + *path*
+run_teed(cmd, path)   run a command, streaming its output to console + *path*
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Sequence, Union
+
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_CHUNKS = 256  # ≤ 16 MiB waiting for the log file
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+class _Pump:
+    """Drain *src_fd* into *console_fd* and (via a bounded queue) *log_path*."""
+
+    def __init__(
+        self: _Pump,
+        src_fd: int,
+        log_path: Union[str, Path],
+        console_fd: Union[int, None],
+        max_chunks: int = DEFAULT_MAX_CHUNKS,
+    ) -> None:
+        self.src_fd = src_fd
+        self.console_fd = console_fd
+        self.chunks: "queue.Queue[Union[bytes, None]]" = queue.Queue(maxsize=max(1, max_chunks))
+        path = Path(log_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.log_fh = path.open("ab")
+        self.reader = threading.Thread(target=self._read, name="pv-tee-read", daemon=True)
+        self.writer = threading.Thread(target=self._write, name="pv-tee-write", daemon=True)
+        self.writer.start()
+        self.reader.start()
+
+    def _read(self: _Pump) -> None:
+        try:
+            while True:
+                chunk = os.read(self.src_fd, CHUNK_SIZE)
+                if not chunk:
+                    break
+                if self.console_fd is not None:
+                    try:
+                        _write_all(self.console_fd, chunk)
+                    except OSError:  # console went away – keep logging
+                        self.console_fd = None
+                self.chunks.put(chunk)  # blocks when the log writer lags
+        finally:
+            self.chunks.put(None)
+
+    def _write(self: _Pump) -> None:
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                break
+            self.log_fh.write(chunk)
+            self.log_fh.flush()
+
+    def join(self: _Pump) -> None:
+        """Wait until EOF on the source and everything is on disk."""
+        self.reader.join()
+        self.writer.join()
+        self.log_fh.close()
+
+
+@contextmanager
+def tee_output(path: Union[str, Path], *, max_chunks: int = DEFAULT_MAX_CHUNKS) -> Iterator[None]:
+    """Duplicate stdout / stderr – including child-process output – to *path*.
+
+    The file is opened in append mode.  Inside the block fds 1 and 2 point
+    at a pipe, so anything inheriting them (``subprocess.run`` without
+    redirection, nox ``session.run``) is captured as well.
+    """
+    for stream in (sys.stdout, sys.stderr):
+        stream.flush()
+    read_fd, write_fd = os.pipe()
+    saved_out, saved_err = os.dup(1), os.dup(2)
+    pump = _Pump(read_fd, path, console_fd=saved_out, max_chunks=max_chunks)
+
+    os.dup2(write_fd, 1)
+    os.dup2(write_fd, 2)
+    os.close(write_fd)
+    saved_stdout, saved_stderr = sys.stdout, sys.stderr
+    # Python-level streams may not be fd 1/2 (e.g. under pytest) – rebind them
+    sys.stdout = io.TextIOWrapper(os.fdopen(os.dup(1), "wb", buffering=0), encoding="utf-8", write_through=True)
+    sys.stderr = io.TextIOWrapper(os.fdopen(os.dup(2), "wb", buffering=0), encoding="utf-8", write_through=True)
+    try:
+        yield
+    finally:
+        try:
+            sys.stdout.close()  # every write-end must close for the reader to see EOF
+            sys.stderr.close()
+        finally:
+            sys.stdout, sys.stderr = saved_stdout, saved_stderr
+            os.dup2(saved_out, 1)
+            os.dup2(saved_err, 2)
+            pump.join()
+            for fd in (read_fd, saved_out, saved_err):
+                os.close(fd)
+
+
+def run_teed(
+    cmd: Sequence[str],
+    log_path: Union[str, Path],
+    *,
+    console: bool = True,
+    max_chunks: int = DEFAULT_MAX_CHUNKS,
+    **popen_kwargs: Any,  # noqa: ANN401
+) -> int:
+    """Run *cmd* with stdout+stderr streamed to the console and *log_path*.
+
+    Returns
+    -------
+    int
+        The command's exit code.
+    """
+    with subprocess.Popen(list(cmd), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, **popen_kwargs) as proc:
+        assert proc.stdout is not None  # noqa: S101
+        if console:
+            sys.stdout.flush()
+        pump = _Pump(proc.stdout.fileno(), log_path, console_fd=1 if console else None, max_chunks=max_chunks)
+        pump.join()
+        rc = proc.wait()
+    log.debug("run_teed %s → rc=%d", cmd[0], rc)
+    return rc
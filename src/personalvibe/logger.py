@@ -1,17 +1,37 @@
 # Copyright © 2025 by Nick Jenkins. All rights reserved
 
-"""Opinionated Structured Logging (per-run log file aware)."""
+"""Opinionated Structured Logging (per-run log file aware).
+
+Opt-in extras (keyword or environment variable):
+
+* ``async_logging`` / ``PV_LOG_ASYNC=1`` – the root logger only gets a
+  ``QueueHandler``; a background ``QueueListener`` thread does the console
+  and file I/O, off the LLM / context-building hot path.  The queue is
+  drained at interpreter exit.
+* ``max_bytes`` / ``PV_LOG_MAX_BYTES`` – rotate ``<run_id>.log`` once it
+  exceeds this size, keeping ``backup_count`` (``PV_LOG_BACKUPS``, default
+  5) gzip-compressed segments ``<run_id>.log.1.gz`` …
+"""
 
 from __future__ import annotations
 
+import atexit
+import gzip
 import logging
 import logging.config
+import logging.handlers
+import os
+import queue
+import shutil
 import sys
-from datetime import datetime
 from pathlib import Path
-from typing import Literal, Union
+from typing import Any, Dict, List, Literal, Union
+
+from personalvibe import log_reader
 
 _configured = False
+_listener: Union[logging.handlers.QueueListener, None] = None
+_atexit_registered = False  # stop_listener drains whichever listener is current at exit
 
 
 class ColorFormatter(logging.Formatter):
@@ -24,10 +44,44 @@ class ColorFormatter(logging.Formatter):
     }
     RESET = "\033[0m"
 
+    def __init__(
+        self: ColorFormatter, fmt: Union[str, None] = None, datefmt: Union[str, None] = None, **kwargs: Any
+    ) -> None:
+        super().__init__(fmt, datefmt, **kwargs)
+        # one pre-coloured formatter per level – the record is never mutated,
+        # so ANSI codes cannot leak into other handlers
+        base = fmt or "%(levelname)s:%(name)s:%(message)s"
+        self._by_level: Dict[str, logging.Formatter] = {
+            name: logging.Formatter(base.replace("%(levelname)s", f"{color}%(levelname)s{self.RESET}"), datefmt)
+            for name, color in self.COLORS.items()
+        }
+
     def format(self, record):  # type: ignore[override]
-        color = self.COLORS.get(record.levelname, self.RESET)
-        record.levelname = f"{color}{record.levelname}{self.RESET}"
-        return super().format(record)
+        level_formatter = self._by_level.get(record.levelname)
+        return level_formatter.format(record) if level_formatter else super().format(record)
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+    log_reader.index_path(source).unlink(missing_ok=True)  # offsets belonged to the old segment
+
+
+def _rotating_handler(log_path: Path, max_bytes: int, backup_count: int) -> logging.Handler:
+    handler = logging.handlers.RotatingFileHandler(
+        log_path, mode="a", maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
+    handler.namer = lambda name: f"{name}.gz"
+    handler.rotator = _gzip_rotator
+    return handler
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
 
 
 def configure_logging(
@@ -36,6 +90,9 @@ def configure_logging(
     color: bool = True,
     run_id: Union[str, None] = None,
     log_dir: Union[str, Path] = "logs",
+    async_logging: Union[bool, None] = None,
+    max_bytes: Union[int, None] = None,
+    backup_count: Union[int, None] = None,
 ) -> None:
     """Idempotent logging bootstrap.
 
@@ -52,12 +109,26 @@ def configure_logging(
             BEGIN-STAMP <iso-timestamp>   # line-2  (always for *_base)
 
         Subsequent processes with the *same* run_id will **append** a fresh
-        BEGIN-STAMP line (useful for tee piping).
+        BEGIN-STAMP line (useful for tee piping); see
+        :func:`personalvibe.log_reader.read_last_session`.
+    async_logging
+        Hand records to a background listener thread (default:
+        ``$PV_LOG_ASYNC``).
+    max_bytes, backup_count
+        Size-capped gzip rotation of the run log (default:
+        ``$PV_LOG_MAX_BYTES`` – ``0`` disables – and ``$PV_LOG_BACKUPS``).
     """
-    global _configured
+    global _configured, _listener, _atexit_registered
     if _configured:  # pragma: no cover
         return
 
+    if async_logging is None:
+        async_logging = os.getenv("PV_LOG_ASYNC", "").lower() in ("1", "true", "yes")
+    if max_bytes is None:
+        max_bytes = _env_int("PV_LOG_MAX_BYTES", 0)
+    if backup_count is None:
+        backup_count = _env_int("PV_LOG_BACKUPS", 5)
+
     # ------------------------ base console handler -------------------------
     levels = {"verbose": logging.DEBUG, "none": logging.INFO, "errors": logging.ERROR}
     level = levels.get(verbosity, logging.INFO)
@@ -69,10 +140,7 @@ def configure_logging(
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-
-    logging.root.setLevel(level)
-    logging.root.handlers.clear()
-    logging.root.addHandler(console_handler)
+    handlers: List[logging.Handler] = [console_handler]
 
     # ----------------------------- file handler ----------------------------
     if run_id:
@@ -84,20 +152,47 @@ def configure_logging(
             log_path.write_text(f"RUN_ID={run_id}\n", encoding="utf-8")
 
         # For *_base logs record a session stamp **every** invocation
+        # (offset indexed in <log>.idx so readers can seek to the last one)
         if run_id.endswith("_base"):
-            ts = datetime.utcnow().isoformat(timespec="seconds")
-            with log_path.open("a", encoding="utf-8") as fh:
-                fh.write(f"BEGIN-STAMP {ts}\n")
+            log_reader.write_begin_stamp(log_path)
 
-        file_handler = logging.FileHandler(log_path, mode="a", encoding="utf-8")
+        if max_bytes > 0:
+            file_handler = _rotating_handler(log_path, max_bytes, backup_count)
+        else:
+            file_handler = logging.FileHandler(log_path, mode="a", encoding="utf-8")
         file_handler.setFormatter(logging.Formatter(fmt, date))
-        logging.root.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    logging.root.setLevel(level)
+    logging.root.handlers.clear()
+    if async_logging:
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        if not _atexit_registered:
+            atexit.register(stop_listener)
+            _atexit_registered = True
+        logging.root.addHandler(logging.handlers.QueueHandler(records))
+    else:
+        for handler in handlers:
+            logging.root.addHandler(handler)
 
     _configured = True
 
 
+def stop_listener() -> None:
+    """Drain the async queue, then flush and close its handlers (idempotent)."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()  # processes every queued record before returning
+        for handler in listener.handlers:
+            handler.close()
+
+
 def reset_logging() -> None:
     """Utility for unit tests – wipes all handlers so we can re-init."""
     global _configured
+    stop_listener()
     logging.root.handlers.clear()
     _configured = False
@@ -0,0 +1,117 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Model metadata registry + pre-flight sizing for LLM calls.
+
+Oversized requests (prompt + ``max_tokens`` above the model window) only
+fail *after* upload and queueing, so we check locally first.
+
+Registry resolution
+-------------------
+1. Built-in table ``_BUILTIN_MODELS`` (conservative published limits).
+2. Local overrides merged on top, read from ``$PV_MODELS_FILE`` or
+   ``<workspace>/.personalvibe/models.yaml``::
+
+       openai/o3:
+         context_window: 200000
+         max_output_tokens: 100000
+
+Unknown models skip the pre-flight entirely (we never block a call we
+know nothing about).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+import yaml
+from pydantic import BaseModel, ValidationError
+
+log = logging.getLogger(__name__)
+
+# Tokens we insist on leaving for the answer; smaller requests use their own value.
+MIN_OUTPUT_TOKENS = 1024
+
+
+class ModelInfo(BaseModel):
+    """Token limits for one ``<provider>/<model>``."""
+
+    context_window: int
+    max_output_tokens: int
+
+
+class ContextWindowError(ValueError):
+    """Raised when a prompt cannot fit the model window even after trimming."""
+
+
+_BUILTIN_MODELS: Dict[str, ModelInfo] = {
+    "openai/o3": ModelInfo(context_window=200_000, max_output_tokens=100_000),
+    "openai/o3-mini": ModelInfo(context_window=200_000, max_output_tokens=100_000),
+    "openai/o4-mini": ModelInfo(context_window=200_000, max_output_tokens=100_000),
+    "openai/gpt-4.1": ModelInfo(context_window=1_047_576, max_output_tokens=32_768),
+    "openai/gpt-4.1-mini": ModelInfo(context_window=1_047_576, max_output_tokens=32_768),
+    "openai/gpt-4o": ModelInfo(context_window=128_000, max_output_tokens=16_384),
+    "openai/gpt-4o-mini": ModelInfo(context_window=128_000, max_output_tokens=16_384),
+    "openai/gpt-4-turbo": ModelInfo(context_window=128_000, max_output_tokens=4_096),
+    "anthropic/claude-3-opus": ModelInfo(context_window=200_000, max_output_tokens=4_096),
+    "anthropic/claude-3-sonnet": ModelInfo(context_window=200_000, max_output_tokens=4_096),
+    "anthropic/claude-3-haiku": ModelInfo(context_window=200_000, max_output_tokens=4_096),
+    "google/gemini-pro": ModelInfo(context_window=32_760, max_output_tokens=8_192),
+    "mistral/mistral-large": ModelInfo(context_window=128_000, max_output_tokens=8_192),
+}
+
+
+def _overrides_path(workspace: Union[Path, None]) -> Union[Path, None]:
+    env = os.getenv("PV_MODELS_FILE")
+    if env:
+        return Path(env).expanduser()
+    if workspace is None:
+        return None
+    return Path(workspace) / ".personalvibe" / "models.yaml"
+
+
+@lru_cache(maxsize=8)
+def _read_overrides(path: str, _mtime: float) -> Tuple[Tuple[str, ModelInfo], ...]:
+    """Parse an overrides file; cached on (path, mtime) so edits are picked up."""
+    raw = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or {}
+    if not isinstance(raw, dict):
+        raise ValueError(f"{path}: expected a mapping of <provider>/<model> → limits")
+    try:
+        return tuple((str(name), ModelInfo(**spec)) for name, spec in raw.items())
+    except (TypeError, ValidationError) as e:
+        raise ValueError(f"{path}: invalid model entry: {e}") from e
+
+
+def load_registry(workspace: Union[Path, None] = None) -> Dict[str, ModelInfo]:
+    """Return built-in model limits merged with local overrides."""
+    registry = dict(_BUILTIN_MODELS)
+    path = _overrides_path(workspace)
+    if path is not None and path.is_file():
+        registry.update(_read_overrides(str(path), path.stat().st_mtime))
+    return registry
+
+
+def get_model_info(model: str, workspace: Union[Path, None] = None) -> Union[ModelInfo, None]:
+    """Limits for *model*, or ``None`` when the registry does not know it."""
+    return load_registry(workspace).get(model)
+
+
+def size_max_tokens(info: ModelInfo, prompt_tokens: int, requested: int) -> int:
+    """Clamp *requested* completion tokens to what the window has left.
+
+    Raises
+    ------
+    ContextWindowError
+        If fewer than ``min(requested, MIN_OUTPUT_TOKENS)`` tokens remain.
+    """
+    remaining = info.context_window - prompt_tokens
+    needed = min(requested, MIN_OUTPUT_TOKENS)
+    if remaining < needed:
+        raise ContextWindowError(
+            f"Prompt uses {prompt_tokens} tokens; the {info.context_window}-token window "
+            f"leaves {max(remaining, 0)} for the answer (need ≥ {needed})."
+        )
+    return min(requested, remaining, info.max_output_tokens)
@@ -0,0 +1,107 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Cost / latency-aware model routing.
+
+Small prompts (``naked``, ``bugfix`` …) do not need ``openai/o3``.  Rules
+pick a model from the task name, the prompt token count and an optional
+latency target; an explicit ``model:`` in the run YAML always wins.
+
+Rule sources (first non-empty wins)
+-----------------------------------
+1. Routing file ``$PV_ROUTING_FILE`` or ``<workspace>/.personalvibe/routing.yaml``,
+   keyed by task name::
+
+       bugfix:
+         - model: openai/gpt-4.1-mini
+           max_prompt_tokens: 8000
+           expected_latency_s: 15
+         - model: openai/o3
+
+2. The ``routing:`` list inside the task YAML (``data/tasks/<task>.yaml``).
+3. The routing file's ``default:`` entry, for tasks without rules of their own.
+
+Rules are tried in order; the first whose limits accept the prompt wins.
+Every decision is logged as ``Routing decision …`` for later analysis.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import yaml
+from pydantic import BaseModel
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "openai/o3"
+
+
+class RouteRule(BaseModel):
+    """One routing candidate – all limits are optional."""
+
+    model: str
+    max_prompt_tokens: Optional[int] = None
+    expected_latency_s: Optional[float] = None
+
+    def accepts(self: RouteRule, prompt_tokens: int, latency_target_s: Optional[float]) -> bool:
+        """True when this rule's model suits the prompt size and latency target."""
+        if self.max_prompt_tokens is not None and prompt_tokens > self.max_prompt_tokens:
+            return False
+        if latency_target_s is not None and self.expected_latency_s is not None:
+            return self.expected_latency_s <= latency_target_s
+        return True
+
+
+def _routing_path(workspace: Union[Path, None]) -> Union[Path, None]:
+    env = os.getenv("PV_ROUTING_FILE")
+    if env:
+        return Path(env).expanduser()
+    if workspace is None:
+        return None
+    return Path(workspace) / ".personalvibe" / "routing.yaml"
+
+
+def load_routing_file(workspace: Union[Path, None] = None) -> Dict[str, List[RouteRule]]:
+    """Parse the local routing file (empty mapping when absent)."""
+    path = _routing_path(workspace)
+    if path is None or not path.is_file():
+        return {}
+    raw = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    if not isinstance(raw, dict):
+        raise ValueError(f"{path}: expected a mapping of task name → list of rules")
+    return {str(task): [RouteRule(**r) for r in (rules or [])] for task, rules in raw.items()}
+
+
+def choose_model(
+    task_name: str,
+    prompt_tokens: int,
+    *,
+    explicit: Optional[str] = None,
+    latency_target_s: Optional[float] = None,
+    task_rules: Sequence[RouteRule] = (),
+    workspace: Union[Path, None] = None,
+) -> str:
+    """Return the model to call for this prompt and log why."""
+    if explicit:
+        model, reason = explicit, "explicit model in config"
+    else:
+        local = load_routing_file(workspace)
+        rules = local.get(task_name) or list(task_rules) or local.get("default", [])
+        model, reason = DEFAULT_MODEL, "no matching rule – default"
+        for idx, rule in enumerate(rules):
+            if rule.accepts(prompt_tokens, latency_target_s):
+                model, reason = rule.model, f"rule #{idx}"
+                break
+
+    log.info(
+        "Routing decision – task=%s tokens=%d latency_target=%s → %s (%s)",
+        task_name,
+        prompt_tokens,
+        latency_target_s,
+        model,
+        reason,
+    )
+    return model
@@ -8,6 +8,7 @@ from pathlib import Path
 from typing import Union
 
 from personalvibe import vibe_utils
+from personalvibe.snapshot import FileSnapshot, format_report
 
 
 def find_latest_log_file(project_name: Union[str, None] = None) -> Path:
@@ -70,6 +71,26 @@ def extract_and_save_code_block(project_name: Union[str, None] = None) -> str:
     return str(output_file)
 
 
+def run_stage_script(path: Union[str, Path], *, snapshot: bool = True) -> None:
+    """Execute a stage script in-process, undoing its file writes if it fails.
+
+    With *snapshot* every file the script writes is backed up first (see
+    ``personalvibe.snapshot``); on error only those files are restored.
+    """
+    print(f"Running extracted code from: {path}")
+    if not snapshot:
+        runpy.run_path(str(path), run_name="__main__")
+        return
+
+    snap = FileSnapshot(root=vibe_utils.get_base_path())
+    try:
+        with snap:
+            runpy.run_path(str(path), run_name="__main__")
+    finally:
+        verb = "Rolled back" if snap.rolled_back else "Changed"
+        print(f"{verb} files:\n{format_report(snap.changes, snap.root)}")
+
+
 # === helper added by chunk 2
 def _ensure_project_name(name: Union[str, None]) -> str:
     if name:
@@ -140,5 +161,4 @@ if __name__ == "__main__":
     saved_file = extract_and_save_code_block(args.project_name)
 
     if args.run:
-        print(f"Running extracted code from: {saved_file}")
-        runpy.run_path(saved_file, run_name="__main__")
+        run_stage_script(saved_file)
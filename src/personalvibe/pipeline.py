@@ -0,0 +1,160 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Embeddable pipeline object with reusable warm state.
+
+The module-level helpers re-resolve the workspace on every call and (via
+the global ``task_manager``) re-index tasks for whatever the cwd is.  Services
+that render or run many configs should hold a :class:`Pipeline` instead: it
+resolves the workspace once, owns its task configs and uses the shared
+compiled templates (:mod:`personalvibe.templates`) and tokenizer.  Every
+cache is lock-protected, so one instance can serve any number of threads;
+``arun`` offloads the blocking LLM call to a worker thread for asyncio
+callers.
+
+Example
+-------
+>>> from personalvibe import Pipeline
+>>> pipe = Pipeline(workspace="/srv/vibes")
+>>> prompt = pipe.render(config)             # no LLM call
+>>> path = pipe.run(config, prompt_only=True)  # streamed to disk
+>>> reply = pipe.run(config, max_tokens=8000)
+
+Public API
+----------
+Pipeline(workspace=None)       warm, thread-safe pipeline
+DEFAULT_MAX_TOKENS             completion budget when none is given
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Union
+
+from jinja2 import Template
+
+from personalvibe import model_routing, templates, tokenizer, tracing, vibe_utils
+from personalvibe.task_config import TaskManager
+
+if TYPE_CHECKING:
+    from personalvibe.run_pipeline import ConfigModel
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_TOKENS = 16_000
+
+
+class Pipeline:
+    """Render prompts and call the LLM for many configs with shared warm state.
+
+    Parameters
+    ----------
+    workspace
+        Where ``data/<project>/prompt_*`` artefacts go.  Resolved once
+        (default: :func:`personalvibe.vibe_utils.get_workspace_root`).
+    tasks
+        Task registry to use (default: a private :class:`TaskManager` that
+        also indexes ``<workspace>/.personalvibe/tasks``).
+    """
+
+    def __init__(
+        self: Pipeline,
+        workspace: Union[str, Path, None] = None,
+        *,
+        tasks: Union[TaskManager, None] = None,
+    ) -> None:
+        self.workspace = Path(workspace).expanduser().resolve() if workspace else vibe_utils.get_workspace_root()
+        self.tasks = tasks or TaskManager(self.workspace)
+
+    def __repr__(self: Pipeline) -> str:
+        return f"Pipeline(workspace={str(self.workspace)!r})"
+
+    # ------------------------------------------------------------ state
+    @property
+    def master_template(self: Pipeline) -> Template:
+        """The compiled master template (shared, see :mod:`personalvibe.templates`)."""
+        return templates.get_template(templates.MASTER)
+
+    def warm(self: Pipeline) -> Pipeline:
+        """Validate every task, compile the bundled templates and load the tokenizer up front."""
+        self.tasks.preload()
+        templates.warm()
+        tokenizer.get_encoder()
+        return self
+
+    # ------------------------------------------------------------ calls
+    def stream(self: Pipeline, config: ConfigModel) -> Iterator[str]:
+        """Yield the prompt for *config* chunk by chunk (``Template.generate``).
+
+        Only the variables the master template references are computed
+        (see :func:`personalvibe.vibe_utils.lazy_replacements`).
+        """
+        master = self.master_template
+        with tracing.span("get_replacements"):
+            lazy = vibe_utils.lazy_replacements(config, self.tasks)
+            replacements = lazy.select(templates.template_variables(master))
+        return master.generate(**replacements)
+
+    def render(self: Pipeline, config: ConfigModel) -> str:
+        """Build the full prompt for *config* (no files written, no LLM call)."""
+        chunks = self.stream(config)
+        with tracing.span("render_template"):
+            return "".join(chunks)
+
+    def save_prompt(self: Pipeline, config: ConfigModel) -> vibe_utils.SavedPrompt:
+        """Render *config* straight into ``<workspace>/data/<project>/prompt_inputs``.
+
+        The prompt is hashed and token-counted as it streams to disk; it is
+        never held in memory as a whole.
+        """
+        base_input_path = vibe_utils.get_data_dir(config.project_name, self.workspace) / "prompt_inputs"
+        chunks = self.stream(config)
+        with tracing.span("render_template"), tracing.span("save_prompt"):
+            return vibe_utils.save_prompt_stream(chunks, base_input_path, count_tokens=True)
+
+    def run(
+        self: Pipeline,
+        config: ConfigModel,
+        *,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        prompt_only: bool = False,
+    ) -> Union[str, Path]:
+        """Render *config* and call the routed model; return its reply.
+
+        With *prompt_only* the prompt is only saved and its path returned.
+        """
+        saved = self.save_prompt(config)
+        log.info("Prompt: %d tokens, %d chars → %s", saved.tokens, saved.chars, saved.path.name)
+        if prompt_only:
+            return saved.path
+
+        # save_prompt counts while streaming; recount only if that was skipped
+        tokens = saved.tokens if saved.tokens is not None else tokenizer.num_tokens(saved.read())
+        model = model_routing.choose_model(
+            config.task,
+            tokens,
+            explicit=config.model or None,
+            latency_target_s=config.latency_target_s,
+            task_rules=self.tasks.load_task_config(config.task).routing,
+            workspace=self.workspace,
+        )
+        with tracing.span("get_vibed"):
+            return vibe_utils.get_vibed(
+                saved.read(),  # the one in-memory copy, handed straight to the provider
+                project_name=config.project_name,
+                max_completion_tokens=max_tokens,
+                workspace=self.workspace,
+                model=model,
+                saved=saved,
+            )
+
+    async def arun(
+        self: Pipeline,
+        config: ConfigModel,
+        *,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        prompt_only: bool = False,
+    ) -> Union[str, Path]:
+        """:meth:`run` on a worker thread, so the event loop stays responsive."""
+        return await asyncio.to_thread(self.run, config, max_tokens=max_tokens, prompt_only=prompt_only)
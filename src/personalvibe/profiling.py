@@ -0,0 +1,80 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""``--profile`` support for every ``pv`` sub-command.
+
+Wraps the command in ``cProfile``, writes the raw stats next to the run log
+(``logs/<run_id>.<timestamp>.prof`` – open with ``snakeviz`` or
+``python -m pstats``) and prints the top-N cumulative hotspots.  With
+``--profile-memory`` ``tracemalloc`` also reports the peak allocation.
+
+Public API
+----------
+profile_path(log_dir, run_id)        where the ``.prof`` file goes
+run_profiled(func, *args, out=…)     run *func* under the profiler
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import sys
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, TextIO, TypeVar, Union
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TOP = 25
+
+T = TypeVar("T")
+
+
+def profile_path(log_dir: Union[str, Path], run_id: str) -> Path:
+    """``<log_dir>/<run_id>.<YYYYmmdd-HHMMSS>.prof`` (directory created)."""
+    log_dir = Path(log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return log_dir / f"{run_id}.{stamp}.prof"
+
+
+def format_hotspots(profiler: cProfile.Profile, top: int = DEFAULT_TOP) -> str:
+    """Top *top* functions by cumulative time, as printed by ``pstats``."""
+    buf = io.StringIO()
+    pstats.Stats(profiler, stream=buf).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    return buf.getvalue()
+
+
+def run_profiled(
+    func: Callable[..., T],
+    *args: Any,  # noqa: ANN401
+    out: Union[str, Path],
+    top: int = DEFAULT_TOP,
+    memory: bool = False,
+    stream: Union[TextIO, None] = None,
+) -> T:
+    """Call ``func(*args)`` under ``cProfile``; dump to *out* and report.
+
+    The profile is written and reported even when *func* raises (including
+    ``SystemExit``), so failing runs can be profiled too.
+    """
+    stream = stream or sys.stderr
+    profiler = cProfile.Profile()
+    started_tracemalloc = memory and not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    profiler.enable()
+    try:
+        return func(*args)
+    finally:
+        profiler.disable()
+        peak = tracemalloc.get_traced_memory()[1] if memory else None
+        if started_tracemalloc:
+            tracemalloc.stop()
+        profiler.dump_stats(str(out))
+        print(format_hotspots(profiler, top), file=stream)
+        if peak is not None:
+            print(f"Peak traced memory: {peak / 2**20:.1f} MiB", file=stream)
+        print(f"Profile written to {out}", file=stream)
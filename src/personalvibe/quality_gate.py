@@ -0,0 +1,524 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Change-aware quality-gate behind ``pv validate``.
+
+``tests/personalvibe.sh`` always runs ``poetry install``, full lint, every
+test and ``smoke_dist``.  For a one-line patch most of that is wasted, so
+``pv validate --changed``:
+
+1. lists changed files (``git diff --name-only <base>`` + untracked);
+2. maps them to the tests that import them via a cached import graph
+   (``<repo>/.personalvibe/cache/import_graph.json``, re-parsing only
+   files whose mtime/size changed);
+3. runs black / flake8 / mypy on the changed modules only, pytest on the
+   affected tests only, and ``nox -s smoke_dist`` only when packaging
+   files changed.
+
+``pv validate`` without ``--changed`` keeps the full nox gate for merges.
+
+The tools run from the *target project's* environment – its Poetry
+virtualenv or ``<root>/.venv`` – and only otherwise from ``PATH``, never
+from whichever interpreter happens to run ``pv``.
+
+``--jobs N`` swaps nox's sequential chain for concurrent subprocesses
+(the ``lint`` + ``tests`` session checks, or the ``--changed`` subset) with
+captured output and one combined report, so latency approaches that of the
+slowest single check.  black / flake8 remember every file that passed by
+content hash (``.personalvibe/cache/lint_results.json``) and skip it next
+time until the file or the tool configuration changes.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Pattern, Sequence, Set, Union
+
+from personalvibe import log_tee
+
+log = logging.getLogger(__name__)
+
+# mirrors ``locations`` in noxfile.py
+LINT_LOCATIONS = ("src/personalvibe", "tests", "noxfile.py", "docs/conf.py")
+PACKAGING_FILES = ("pyproject.toml", "poetry.lock", "README.md", "LICENSE")
+PACKAGE_DATA_DIR = "src/personalvibe/data/"
+FULL_GATE = ("nox", "-rs", "lint", "tests", "smoke_dist")
+PACKAGE = "personalvibe"
+# per-file checks whose passes may be cached by content hash
+CACHEABLE = ("black", "flake8")
+TOOL_CONFIG_FILES = ("pyproject.toml", ".flake8", "setup.cfg", "tox.ini")
+_GRAPH_VERSION = 1
+_LINT_CACHE_VERSION = 1
+
+
+@dataclass
+class Check:
+    """One command of the gate."""
+
+    name: str
+    cmd: List[str]
+    files: List[str] = field(default_factory=list)  # per-file targets inside ``cmd``
+
+
+@dataclass
+class CheckResult:
+    """Captured outcome of one check run by :func:`run_parallel`."""
+
+    name: str
+    cmd: List[str]
+    returncode: int
+    duration_s: float
+    output: str = ""
+    skipped_files: int = 0  # unchanged since they last passed
+
+    @property
+    def passed(self: CheckResult) -> bool:
+        """True for a zero exit code."""
+        return self.returncode == 0
+
+
+@dataclass
+class GatePlan:
+    """Checks to run plus the reasoning behind the selection."""
+
+    checks: List[Check] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    tests: List[str] = field(default_factory=list)
+
+
+# ------------------------------------------------------------------ git helpers
+def repo_root(cwd: Union[Path, None] = None) -> Path:
+    """Top-level dir of the git checkout containing *cwd*."""
+    out = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"], cwd=cwd, check=True, text=True, stdout=subprocess.PIPE
+    ).stdout
+    return Path(out.strip())
+
+
+def changed_files(root: Path, base: str = "HEAD") -> List[str]:
+    """Repo-relative paths modified vs *base*, plus untracked files."""
+    cmds = (
+        ["git", "diff", "--name-only", base],
+        ["git", "ls-files", "--others", "--exclude-standard"],
+    )
+    found: Set[str] = set()
+    for cmd in cmds:
+        out = subprocess.run(cmd, cwd=root, check=True, text=True, stdout=subprocess.PIPE).stdout
+        found.update(line.strip() for line in out.splitlines() if line.strip())
+    return sorted(f for f in found if not f.startswith(".personalvibe/"))  # our own caches
+
+
+# ----------------------------------------------------------------- import graph
+def module_name(rel_path: str) -> Union[str, None]:
+    """``src/personalvibe/x.py`` → ``personalvibe.x``; ``tests/t.py`` → ``tests.t``."""
+    if not rel_path.endswith(".py"):
+        return None
+    parts = list(Path(rel_path).with_suffix("").parts)
+    if parts and parts[0] == "src":
+        parts = parts[1:]
+    if parts and parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts) or None
+
+
+def _imports_of(path: Path, mod: str) -> List[str]:
+    """Every dotted module name (and its parents) imported by *path*."""
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    except (SyntaxError, UnicodeDecodeError, OSError):
+        return []
+    is_pkg = path.name == "__init__.py"
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                pkg = mod.split(".") if is_pkg else mod.split(".")[:-1]
+                pkg = pkg[: len(pkg) - (node.level - 1)] if node.level > 1 else pkg
+                base = ".".join([*pkg, base] if base else pkg)
+            if base:
+                names.add(base)
+                names.update(f"{base}.{alias.name}" for alias in node.names if alias.name != "*")
+    expanded: Set[str] = set()
+    for name in names:
+        bits = name.split(".")
+        expanded.update(".".join(bits[: i + 1]) for i in range(len(bits)))
+    return sorted(expanded)
+
+
+def _python_sources(root: Path) -> Iterable[Path]:
+    for loc in LINT_LOCATIONS:
+        p = root / loc
+        if p.is_file() and p.suffix == ".py":
+            yield p
+        elif p.is_dir():
+            yield from (f for f in p.rglob("*.py") if "__pycache__" not in f.parts)
+
+
+def build_import_graph(root: Path, cache_path: Union[Path, None] = None) -> Dict[str, List[str]]:
+    """Map repo-relative file → imported modules, reusing the on-disk cache."""
+    cache_path = cache_path or root / ".personalvibe" / "cache" / "import_graph.json"
+    cached: Dict[str, Dict] = {}
+    if cache_path.exists():
+        try:
+            data = json.loads(cache_path.read_text(encoding="utf-8"))
+            if data.get("version") == _GRAPH_VERSION:
+                cached = data["files"]
+        except (ValueError, KeyError):
+            log.debug("Ignoring corrupt import-graph cache %s", cache_path)
+
+    files: Dict[str, Dict] = {}
+    reparsed = 0
+    for path in _python_sources(root):
+        rel = path.relative_to(root).as_posix()
+        st = path.stat()
+        stamp = [st.st_mtime_ns, st.st_size]
+        entry = cached.get(rel)
+        if not entry or entry["stamp"] != stamp:
+            entry = {"stamp": stamp, "imports": _imports_of(path, module_name(rel) or "")}
+            reparsed += 1
+        files[rel] = entry
+
+    if reparsed or set(files) != set(cached):
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps({"version": _GRAPH_VERSION, "files": files}), encoding="utf-8")
+    log.debug("Import graph: %d files (%d re-parsed)", len(files), reparsed)
+    return {rel: entry["imports"] for rel, entry in files.items()}
+
+
+def affected_tests(changed: Sequence[str], graph: Dict[str, List[str]]) -> List[str]:
+    """Test files that (transitively) import any changed file."""
+    tests = sorted(f for f in graph if f.startswith("tests/") and Path(f).name.startswith("test_"))
+    if any(Path(f).name == "conftest.py" for f in changed):
+        return tests
+
+    dirty: Set[str] = set()
+    for rel in changed:
+        mod = module_name(rel)
+        if mod:
+            dirty.add(mod)
+        elif rel.startswith("src/personalvibe/"):  # package data → anything using the package
+            dirty.add("personalvibe")
+
+    # propagate: a module importing a dirty module is dirty too
+    grew = True
+    while grew:
+        grew = False
+        for rel, imports in graph.items():
+            mod = module_name(rel)
+            if mod and mod not in dirty and dirty.intersection(imports):
+                dirty.add(mod)
+                grew = True
+
+    return [f for f in tests if module_name(f) in dirty]
+
+
+# ------------------------------------------------------------------- planning
+def _project_python(root: Path) -> Union[str, None]:
+    """Interpreter of *root*'s own environment (Poetry env or ``.venv``), if any."""
+    pyproject = root / "pyproject.toml"
+    poetry = shutil.which("poetry")
+    if poetry and pyproject.is_file() and "[tool.poetry" in pyproject.read_text(encoding="utf-8"):
+        res = subprocess.run(
+            [poetry, "env", "info", "--executable"],
+            cwd=root,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        if res.returncode == 0 and res.stdout.strip() and Path(res.stdout.strip()).is_file():
+            return res.stdout.strip()
+    for venv_python in (root / ".venv" / "bin" / "python", root / ".venv" / "Scripts" / "python.exe"):
+        if venv_python.is_file():
+            return str(venv_python)
+    return None
+
+
+def _tool_commands(root: Path, tools: Sequence[str]) -> Dict[str, List[str]]:
+    """Command prefix per tool, resolved from *root*'s environment, else ``PATH``.
+
+    Raises
+    ------
+    RuntimeError
+        Naming every tool that is not installed where the project would run it.
+    """
+    if not tools:
+        return {}
+    python = _project_python(root)
+    if python is not None:
+        probe = "import importlib.util, sys; print(*[t for t in sys.argv[1:] if importlib.util.find_spec(t) is None])"
+        res = subprocess.run([python, "-c", probe, *tools], cwd=root, text=True, stdout=subprocess.PIPE)
+        missing = res.stdout.split() if res.returncode == 0 else list(tools)
+        where = f"the project environment ({python}); run `poetry install`"
+        commands = {tool: [python, "-m", tool] for tool in tools}
+    else:
+        found = {tool: shutil.which(tool) for tool in tools}
+        missing = [tool for tool, exe in found.items() if exe is None]
+        where = "PATH (no Poetry env or .venv found for the project)"
+        commands = {tool: [exe] for tool, exe in found.items() if exe is not None}
+    if missing:
+        raise RuntimeError(f"Quality-gate tool(s) {', '.join(missing)} not found in {where}")
+    return commands
+
+
+def _lintable(changed: Sequence[str]) -> List[str]:
+    return [
+        f
+        for f in changed
+        if f.endswith(".py") and any(f == loc or f.startswith(loc.rstrip("/") + "/") for loc in LINT_LOCATIONS)
+    ]
+
+
+def plan_changed(root: Path, base: str = "HEAD") -> GatePlan:
+    """Checks needed for what changed since *base*."""
+    changed = changed_files(root, base)
+    existing = [f for f in changed if (root / f).exists()]  # deletions still select tests
+    plan = GatePlan(changed=changed)
+    lint = _lintable(existing)
+    src = [f for f in lint if f.startswith("src/")]
+    plan.tests = affected_tests(changed, build_import_graph(root))
+    needed = ["black", "flake8"] if lint else []
+    needed += ["mypy"] if src else []
+    needed += ["pytest"] if plan.tests else []
+    tool = _tool_commands(root, needed)
+
+    if lint:
+        plan.checks.append(Check("black", [*tool["black"], "--check", *lint], files=lint))
+        plan.checks.append(Check("flake8", [*tool["flake8"], *lint, "--select=ANN,E,F"], files=lint))
+    if src:
+        plan.checks.append(Check("mypy", [*tool["mypy"], *src]))
+    if plan.tests:
+        plan.checks.append(Check("pytest", [*tool["pytest"], *plan.tests, "-m", "not advanced"]))
+
+    if any(f in PACKAGING_FILES or f.startswith(PACKAGE_DATA_DIR) for f in changed):
+        plan.checks.append(Check("smoke_dist", ["nox", "-s", "smoke_dist"]))
+    return plan
+
+
+def plan_full() -> GatePlan:
+    """The unchanged merge gate (same sessions as tests/personalvibe.sh)."""
+    return GatePlan(checks=[Check("nox", list(FULL_GATE))])
+
+
+def plan_all(root: Path) -> GatePlan:
+    """The ``lint`` + ``tests`` nox session checks as independent commands."""
+    files = sorted(p.relative_to(root).as_posix() for p in _python_sources(root))
+    tool = _tool_commands(root, ["black", "flake8", "mypy", "pytest"])
+    return GatePlan(
+        checks=[
+            Check("black", [*tool["black"], "--check", *files], files=files),
+            Check("flake8", [*tool["flake8"], *files, "--select=ANN,E,F"], files=files),
+            Check("mypy", [*tool["mypy"], "-p", PACKAGE]),
+            Check("pytest", [*tool["pytest"], "-m", "not advanced", "-W", "ignore::DeprecationWarning"]),
+        ]
+    )
+
+
+# -------------------------------------------------------------------- running
+def run_plan(plan: GatePlan, root: Path, log_path: Union[Path, None] = None) -> int:
+    """Run every check sequentially; return the first non-zero exit code.
+
+    With *log_path* each check's output is also appended to that file
+    (see :func:`personalvibe.log_tee.run_teed`).
+    """
+    if not plan.checks:
+        log.info("Quality-gate: nothing to check for %d changed file(s).", len(plan.changed))
+        return 0
+    worst = 0
+    for check in plan.checks:
+        log.info("Quality-gate ▶ %s", " ".join(check.cmd))
+        if log_path is None:
+            rc = subprocess.run(check.cmd, cwd=root).returncode
+        else:
+            rc = log_tee.run_teed(check.cmd, log_path, cwd=root)
+        log.info("Quality-gate ◀ %s rc=%d", check.name, rc)
+        worst = worst or rc
+    return worst
+
+
+# ------------------------------------------------------- per-file lint cache
+def _digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _config_digest(root: Path) -> str:
+    h = hashlib.sha256()
+    for name in TOOL_CONFIG_FILES:
+        p = root / name
+        if p.is_file():
+            h.update(name.encode() + b"\0" + p.read_bytes())
+    return h.hexdigest()
+
+
+class LintCache:
+    """``check → {file: sha256}`` of files that last passed that check."""
+
+    def __init__(self: LintCache, root: Path, path: Union[Path, None] = None) -> None:
+        self.root = root
+        self.path = path or root / ".personalvibe" / "cache" / "lint_results.json"
+        self.config = _config_digest(root)
+        self.passed: Dict[str, Dict[str, str]] = {}
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("version") == _LINT_CACHE_VERSION and data.get("config") == self.config:
+                    self.passed = data["checks"]
+            except (ValueError, KeyError):
+                log.debug("Ignoring corrupt lint cache %s", self.path)
+
+    def stale(self: LintCache, check: str, files: Sequence[str]) -> List[str]:
+        """Subset of *files* that changed since they last passed *check*."""
+        known = self.passed.get(check, {})
+        return [f for f in files if known.get(f) != _digest(self.root / f)]
+
+    def record(self: LintCache, check: str, files: Sequence[str]) -> None:
+        """Remember *files* (current content) as passing *check*."""
+        known = self.passed.setdefault(check, {})
+        known.update({f: _digest(self.root / f) for f in files})
+
+    def save(self: LintCache) -> None:
+        """Write the cache back to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": _LINT_CACHE_VERSION, "config": self.config, "checks": self.passed}
+        self.path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+@dataclass(frozen=True)
+class _Diagnostics:
+    """How to read per-file results out of a failed :data:`CACHEABLE` check."""
+
+    exit_codes: frozenset  # exit codes meaning "lint findings", not a crash
+    failing: Pattern[str]  # group 1 = the offending file
+    noise: Union[Pattern[str], None] = None  # other lines a normal run prints
+
+
+_DIAGNOSTICS = {
+    "black": _Diagnostics(
+        frozenset({1}),
+        re.compile(r"^would reformat (.+)$"),
+        re.compile(r"^(Oh no!|All done!|\d+ files? would be )"),
+    ),
+    "flake8": _Diagnostics(frozenset({1}), re.compile(r"^(.+?):\d+:\d+: [A-Z]+\d+ ")),
+}
+
+
+def _proven_clean(check: Check, result: CheckResult) -> List[str]:
+    """Files of *check* that *result* proves clean (cacheable as passed).
+
+    A failed run only vouches for the files it did not flag when its exit
+    code is a lint exit and every output line is a recognised diagnostic –
+    a missing tool, crash or config error records nothing.
+    """
+    if result.passed:
+        return list(check.files)
+    spec = _DIAGNOSTICS.get(check.name)
+    if spec is None or result.returncode not in spec.exit_codes:
+        return []
+    failing: Set[str] = set()
+    for line in result.output.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = spec.failing.match(line)
+        if match:
+            failing.add(os.path.normpath(match.group(1)))
+        elif spec.noise is None or not spec.noise.match(line):
+            return []
+    known = {os.path.normpath(f) for f in check.files}
+    if not failing or not failing <= known:
+        return []
+    return [f for f in check.files if os.path.normpath(f) not in failing]
+
+
+# ----------------------------------------------------------- parallel runner
+def _run_captured(check: Check, root: Path) -> CheckResult:
+    log.info("Quality-gate ▶ %s", check.name)
+    t0 = time.perf_counter()
+    proc = subprocess.run(check.cmd, cwd=root, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    result = CheckResult(check.name, check.cmd, proc.returncode, time.perf_counter() - t0, proc.stdout)
+    log.info("Quality-gate ◀ %s rc=%d in %.1fs", check.name, result.returncode, result.duration_s)
+    return result
+
+
+def run_parallel(
+    plan: GatePlan,
+    root: Path,
+    jobs: Union[int, None] = None,
+    cache: Union[LintCache, None] = None,
+    log_path: Union[Path, None] = None,
+) -> List[CheckResult]:
+    """Run every check of *plan* concurrently and return their results.
+
+    Parameters
+    ----------
+    plan
+        Checks to run (``plan_all`` or ``plan_changed``).
+    root
+        Repo root; commands run with it as cwd.
+    jobs
+        Maximum concurrent checks (default: one per CPU).
+    cache
+        Per-file pass cache for :data:`CACHEABLE` checks; files unchanged
+        since their last pass are dropped from the command line.
+    log_path
+        Optional file the captured output of every check is appended to.
+
+    Returns
+    -------
+    list of CheckResult
+        In plan order.
+    """
+    cache = cache if cache is not None else LintCache(root)
+    todo: List[Check] = []
+    results: Dict[str, CheckResult] = {}
+    skipped: Dict[str, int] = {}
+    for check in plan.checks:
+        if check.name in CACHEABLE and check.files:
+            stale = cache.stale(check.name, check.files)
+            skip = set(check.files) - set(stale)
+            skipped[check.name] = len(skip)
+            if not stale:
+                results[check.name] = CheckResult(check.name, check.cmd, 0, 0.0, "", len(skip))
+                continue
+            check = Check(check.name, [a for a in check.cmd if a not in skip], stale)
+        todo.append(check)
+
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(todo) or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pv-gate") as pool:
+        for check, res in zip(todo, pool.map(lambda c: _run_captured(c, root), todo)):
+            res.skipped_files = skipped.get(check.name, 0)
+            results[check.name] = res
+            if check.name in CACHEABLE and check.files:
+                cache.record(check.name, _proven_clean(check, res))
+    cache.save()
+    ordered = [results[c.name] for c in plan.checks]
+    if log_path is not None:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with log_path.open("a", encoding="utf-8") as fh:
+            for r in ordered:
+                fh.write(f"── {r.name}: {' '.join(r.cmd)}  rc={r.returncode}\n{r.output}")
+    return ordered
+
+
+def format_report(results: Sequence[CheckResult]) -> str:
+    """One summary row per check, followed by the output of failing ones."""
+    lines = [f"{'check':<10} {'status':<6} {'time':>7}  skipped"]
+    for r in results:
+        status = "ok" if r.passed else f"rc={r.returncode}"
+        lines.append(f"{r.name:<10} {status:<6} {r.duration_s:>6.1f}s  {r.skipped_files or ''}")
+    for r in results:
+        if not r.passed:
+            lines += ["", f"── {r.name}: {' '.join(r.cmd)}", r.output.rstrip()]
+    return "\n".join(lines)
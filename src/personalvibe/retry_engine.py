@@ -1,23 +1,197 @@
 # Copyright © 2025 by Nick Jenkins. All rights reserved
 
-"""Generic retry–with–rollback helper (Chunk A)."""
+"""Generic retry–with–rollback helper (Chunk A).
+
+Building blocks
+---------------
+Backoff policies   ``FixedBackoff`` · ``ExponentialBackoff`` (full jitter) ·
+                   ``RetryAfterBackoff`` (honours provider ``Retry-After``)
+Classification     ``is_retryable`` – fatal errors (e.g. a ``SyntaxError`` in
+                   generated code, HTTP 4xx auth errors) stop immediately,
+                   rate limits / 5xx / timeouts are retried.
+Budgets            per-attempt ``attempt_timeout`` and overall ``deadline``.
+                   A timed-out attempt is cancelled (``attempt_cancelled()``
+                   turns True) and joined before the next one starts, so two
+                   attempts never touch the same git / file state at once.
+Reporting          one ``AttemptRecord`` per attempt, logged as a timing
+                   summary and attached to ``RetryError.attempts``.
+"""
 
 from __future__ import annotations
 
+import email.utils
 import logging
+import random
 import subprocess
 import sys
+import threading
 import time
+from dataclasses import dataclass, field
 from types import TracebackType
-from typing import Callable, List, Type, Union
+from typing import Any, Callable, Dict, List, Protocol, Tuple, Type, Union
 
 log = logging.getLogger(__name__)
 
+# indirection so tests can fast-forward time
+_sleep = time.sleep
+_clock = time.monotonic
+
 
 class RetryError(RuntimeError):
     """Raised when *all* retry attempts fail."""
 
+    def __init__(self: RetryError, message: str, attempts: Union[List[AttemptRecord], None] = None) -> None:
+        super().__init__(message)
+        self.attempts: List[AttemptRecord] = attempts or []
+
+
+class FatalError(RuntimeError):
+    """Raise from an action to stop retrying immediately."""
+
+
+class AttemptTimeout(TimeoutError):
+    """An attempt exceeded ``attempt_timeout`` and was cancelled."""
+
+
+class AttemptStuck(AttemptTimeout):
+    """A timed-out attempt ignored cancellation; retrying would run two at once."""
+
+
+_attempt = threading.local()
+
+
+def attempt_cancelled() -> bool:
+    """``True`` inside an attempt that has exceeded its time budget.
+
+    Actions with side effects should poll this between steps and return
+    promptly – the next attempt only starts once they have.
+    """
+    cancel = getattr(_attempt, "cancel", None)
+    return cancel is not None and cancel.is_set()
+
+
+@dataclass
+class AttemptRecord:
+    """Timing + outcome of one attempt."""
+
+    attempt: int
+    duration_s: float
+    outcome: str  # "ok" | "false" | "error" | "timeout" | "fatal"
+    error: Union[BaseException, None] = field(default=None, repr=False)
+    delay_s: float = 0.0  # backoff slept *after* this attempt
+
+
+# ------------------------------------------------------------ backoff policies
+class BackoffPolicy(Protocol):
+    """Return seconds to wait before attempt ``attempt + 1``."""
+
+    def delay(self, attempt: int, error: Union[BaseException, None]) -> float:  # noqa: D102, ANN101
+        ...
+
+
+@dataclass(frozen=True)
+class FixedBackoff:
+    """Constant delay (``0`` = legacy immediate retry)."""
+
+    seconds: float = 0.0
+
+    def delay(self: FixedBackoff, attempt: int, error: Union[BaseException, None]) -> float:
+        """Same wait every time."""
+        return self.seconds
+
+
+@dataclass(frozen=True)
+class ExponentialBackoff:
+    """``base * factor**(attempt-1)`` capped at ``cap``, with optional full jitter."""
+
+    base: float = 1.0
+    factor: float = 2.0
+    cap: float = 60.0
+    jitter: bool = True
+
+    def delay(self: ExponentialBackoff, attempt: int, error: Union[BaseException, None]) -> float:
+        """Grow geometrically; jitter spreads concurrent clients apart."""
+        ceiling = min(self.cap, self.base * self.factor ** max(attempt - 1, 0))
+        return random.uniform(0, ceiling) if self.jitter else ceiling  # noqa: S311
+
+
+@dataclass(frozen=True)
+class RetryAfterBackoff:
+    """Use the provider's ``Retry-After`` hint, else defer to *fallback*."""
+
+    fallback: BackoffPolicy = field(default_factory=ExponentialBackoff)
+    cap: float = 300.0
+
+    def delay(self: RetryAfterBackoff, attempt: int, error: Union[BaseException, None]) -> float:
+        """Honour the server hint when present."""
+        hinted = retry_after_seconds(error)
+        if hinted is not None:
+            return min(hinted, self.cap)
+        return self.fallback.delay(attempt, error)
+
 
+def _headers(exc: BaseException) -> Dict[str, Any]:
+    for holder in (exc, getattr(exc, "response", None)):
+        headers = getattr(holder, "headers", None)
+        if headers:
+            return {str(k).lower(): v for k, v in dict(headers).items()}
+    return {}
+
+
+def retry_after_seconds(exc: Union[BaseException, None]) -> Union[float, None]:
+    """Extract a ``Retry-After`` delay (seconds or HTTP-date) from *exc*."""
+    if exc is None:
+        return None
+    explicit = getattr(exc, "retry_after", None)
+    if isinstance(explicit, (int, float)):
+        return float(explicit)
+    raw = _headers(exc).get("retry-after")
+    if raw is None:
+        return None
+    try:
+        return max(float(raw), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(str(raw))
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+# -------------------------------------------------------------- classification
+DEFAULT_FATAL: Tuple[Type[BaseException], ...] = (FatalError, SyntaxError)
+_FATAL_STATUS = {400, 401, 403, 404, 422}
+
+
+def _status_code(exc: BaseException) -> Union[int, None]:
+    for holder in (exc, getattr(exc, "response", None)):
+        code = getattr(holder, "status_code", None)
+        if isinstance(code, int):
+            return code
+    return None
+
+
+def is_retryable(
+    exc: BaseException,
+    *,
+    fatal: Tuple[Type[BaseException], ...] = DEFAULT_FATAL,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+) -> bool:
+    """Decide whether *exc* deserves another attempt.
+
+    Order: explicit *fatal* types → HTTP status (4xx client errors are
+    fatal, 408/409/429/5xx retryable) → membership of *retry_on*.
+    """
+    if isinstance(exc, fatal):
+        return False
+    status = _status_code(exc)
+    if status in _FATAL_STATUS:
+        return False
+    return isinstance(exc, retry_on)
+
+
+# -------------------------------------------------------------------- helpers
 def _rollback_branch(branch_name: str) -> None:
     """Hard-reset the git branch to its first commit & delete it.
 
@@ -37,12 +211,70 @@ def _rollback_branch(branch_name: str) -> None:
             log.warning("Git rollback step failed: %s", exc.stdout)
 
 
+def _call_with_timeout(
+    action: Callable[[], bool],
+    timeout: Union[float, None],
+    *,
+    side_effect_free: bool = False,
+    cancel_grace: float = 5.0,
+) -> bool:
+    """Run *action*, raising ``AttemptTimeout`` if it outlives *timeout*.
+
+    On timeout the attempt is cancelled (see :func:`attempt_cancelled`) and
+    joined for up to *cancel_grace* seconds; if it is still running,
+    ``AttemptStuck`` is raised.  Only *side_effect_free* actions are
+    abandoned without waiting.
+    """
+    if timeout is None:
+        return action()
+
+    result: Dict[str, Any] = {}
+    cancel = threading.Event()
+
+    def _target() -> None:
+        _attempt.cancel = cancel
+        try:
+            result["value"] = action()
+        except BaseException as exc:  # noqa: BLE001
+            result["error"] = exc
+
+    worker = threading.Thread(target=_target, name="pv-retry-attempt", daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        cancel.set()
+        if not side_effect_free:
+            worker.join(cancel_grace)
+            if worker.is_alive():
+                raise AttemptStuck(f"attempt exceeded {timeout:.1f}s and ignored cancellation for {cancel_grace:.1f}s")
+        raise AttemptTimeout(f"attempt exceeded {timeout:.1f}s")
+    if "error" in result:
+        raise result["error"]
+    return bool(result.get("value"))
+
+
+def _log_report(records: List[AttemptRecord]) -> None:
+    summary = " | ".join(
+        f"#{r.attempt} {r.outcome} {r.duration_s:.2f}s" + (f" (+{r.delay_s:.2f}s backoff)" if r.delay_s else "")
+        for r in records
+    )
+    log.info("RetryEngine timings: %s", summary)
+
+
 def run_with_retries(
     action: Callable[[], bool],
     *,
     max_retries: int = 5,
     sleep_seconds: float = 0.0,
     branch_name: Union[str, None] = None,
+    backoff: Union[BackoffPolicy, None] = None,
+    fatal: Tuple[Type[BaseException], ...] = DEFAULT_FATAL,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+    attempt_timeout: Union[float, None] = None,
+    deadline: Union[float, None] = None,
+    on_attempt: Union[Callable[[AttemptRecord], None], None] = None,
+    side_effect_free: bool = False,
+    cancel_grace: float = 5.0,
 ) -> bool:
     """Run *action* until it returns ``True`` or retries exhausted.
 
@@ -50,15 +282,35 @@ def run_with_retries(
     ----------
     action
         Callable that **returns bool** – *True* ⇒ success.
-        It may raise; all exceptions count as failure / trigger retry.
+        It may raise; retryable exceptions count as failure / trigger retry.
     max_retries
         Maximum number of *attempts* (so ``max_retries=1`` means **no**
         retry, just a single execution).
     sleep_seconds
-        Optional backoff between attempts (very small by default).
+        Legacy fixed delay, used when *backoff* is not given.
     branch_name
         When supplied and the action still fails after all retries,
         ``_rollback_branch`` is invoked.
+    backoff
+        Policy deciding the wait between attempts, e.g.
+        ``RetryAfterBackoff(ExponentialBackoff())`` for provider calls.
+    fatal, retry_on
+        Exception classification, see :func:`is_retryable`.
+    attempt_timeout
+        Seconds one attempt may take before it is cancelled as failed.
+        Python threads cannot be killed: the attempt must notice
+        :func:`attempt_cancelled` and return within *cancel_grace* seconds,
+        otherwise retrying stops (``AttemptStuck``) rather than run a second
+        attempt beside it.
+    deadline
+        Total time budget in seconds (attempts + backoff).
+    on_attempt
+        Callback receiving each ``AttemptRecord`` as soon as it is known.
+    side_effect_free
+        Declare that *action* touches no shared state; a timed-out attempt
+        is then abandoned immediately and may keep running in the background.
+    cancel_grace
+        Seconds a cancelled attempt gets to finish before giving up.
 
     Returns
     -------
@@ -68,33 +320,77 @@ def run_with_retries(
     Raises
     ------
     RetryError
-        If all attempts fail.
+        If all attempts fail, a fatal error occurs or the deadline passes.
     """
+    policy: BackoffPolicy = backoff or FixedBackoff(sleep_seconds)
+    started = _clock()
     attempt = 0
     errors: List[Union[BaseException, None]] = []
+    records: List[AttemptRecord] = []
+    reason = f"All {max_retries} attempts failed; see logs."
 
     while attempt < max_retries:
         attempt += 1
+        remaining = None if deadline is None else deadline - (_clock() - started)
+        timeout = attempt_timeout
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        t0 = _clock()
+        error: Union[BaseException, None] = None
         try:
             log.debug("RetryEngine – attempt %d/%d", attempt, max_retries)
-            if action():
-                if attempt > 1:
-                    log.info("✅  Succeeded after %d attempts", attempt)
-                return True
-            else:
+            ok = _call_with_timeout(action, timeout, side_effect_free=side_effect_free, cancel_grace=cancel_grace)
+            outcome = "ok" if ok else "false"
+            if not ok:
                 log.warning("Action returned False (attempt %d)", attempt)
         except Exception as exc:  # noqa: BLE001
+            error = exc
             errors.append(exc)
             etype: Type[BaseException] = type(exc)
+            retryable = is_retryable(exc, fatal=fatal, retry_on=retry_on) and not isinstance(exc, AttemptStuck)
+            if not retryable:
+                outcome = "fatal"
+            else:
+                outcome = "timeout" if isinstance(exc, AttemptTimeout) else "error"
             log.warning("Action raised %s: %s  (attempt %d)", etype.__name__, exc, attempt)
 
-        if attempt < max_retries and sleep_seconds:
-            time.sleep(sleep_seconds)
+        record = AttemptRecord(attempt, _clock() - t0, outcome, error)
+        records.append(record)
+
+        if outcome == "ok":
+            if on_attempt:
+                on_attempt(record)
+            if attempt > 1:
+                log.info("✅  Succeeded after %d attempts", attempt)
+                _log_report(records)
+            return True
+        if outcome == "fatal":
+            if on_attempt:
+                on_attempt(record)
+            reason = f"Fatal {type(error).__name__} on attempt {attempt}; not retrying."
+            break
+
+        if attempt < max_retries:
+            record.delay_s = max(policy.delay(attempt, error), 0.0)
+            if deadline is not None:
+                left = deadline - (_clock() - started)
+                if left <= record.delay_s:
+                    record.delay_s = 0.0
+                    if on_attempt:
+                        on_attempt(record)
+                    reason = f"Deadline of {deadline:.1f}s exhausted after {attempt} attempts."
+                    break
+        if on_attempt:
+            on_attempt(record)
+        if record.delay_s:
+            _sleep(record.delay_s)
 
     # ---- failure after all attempts ------------------------------------
-    log.error("❌  All %d attempts failed.", max_retries)
+    log.error("❌  %s", reason)
+    _log_report(records)
     if branch_name:
         _rollback_branch(branch_name)
 
     # Preserve last error for callers wanting more context
-    raise RetryError(f"All {max_retries} attempts failed; see logs.") from (errors[-1] if errors else None)
+    raise RetryError(reason, attempts=records) from (errors[-1] if errors else None)
@@ -1,19 +1,35 @@
 # Copyright © 2025 by Nick Jenkins. All rights reserved
-"""Orchestrates YAML → prompt rendering → vibecoding."""
+"""Orchestrates YAML → prompt rendering → vibecoding.
+
+Public API
+----------
+load_config(path)            YAML → validated :class:`ConfigModel`
+parse_config_text(text, path)  the raw mapping ``load_config`` validates
+PipelineOptions              run-time knobs (verbosity, prompt_only, max_tokens …)
+execute(config, options)     run one iteration for an already-loaded config
+main(argv)                   argparse front-end (``python -m personalvibe.run_pipeline``)
+"""
 
 import argparse
 import logging
 import re
 import textwrap
+import threading
+import warnings
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Union
 
-import yaml
-from jinja2 import Template
 from pydantic import BaseModel, ValidationError, field_validator
 
-from personalvibe import logger, vibe_utils
-from personalvibe.yaml_utils import sanitize_yaml_text
+from personalvibe import logger, tracing, vibe_utils
+from personalvibe.pipeline import DEFAULT_MAX_TOKENS, Pipeline
+from personalvibe.yaml_utils import safe_load, sanitize_yaml_text
+
+VERBOSITY_CHOICES = ("verbose", "none", "errors")
+
+_pipelines: Dict[Path, Pipeline] = {}
+_pipelines_lock = threading.Lock()
 
 
 class ConfigModel(BaseModel):
@@ -28,10 +44,14 @@ class ConfigModel(BaseModel):
     project_name: str
     task: str
     model: Optional[str] = None
+    # ---- optional latency target used by model routing --------------
+    latency_target_s: Optional[float] = None
     user_instructions: str = ""
     project_context_paths: List[str]
     # ---- still used by validate flow --------------------------------
     error_file_name: str = ""
+    # ---- token budget for the structured failures taken from it -------
+    error_token_cap: int = 4000
     # ---- optional conversation history ------------------------------
     conversation_history: Optional[List[dict[str, str]]] = None
 
@@ -47,15 +67,21 @@ class ConfigModel(BaseModel):
         extra = "ignore"  # silently discard unknown legacy fields
 
 
+def parse_config_text(text: str, config_path: Union[str, Path]) -> dict:
+    """Dedent, sanitise and parse the YAML of *config_path* (``version`` = file stem)."""
+    yaml_txt = sanitize_yaml_text(textwrap.dedent(text), origin=str(config_path))
+    raw = safe_load(yaml_txt)
+    if not isinstance(raw, dict):
+        raise ValueError(f"{config_path}: expected a YAML mapping")
+    raw["version"] = Path(config_path).stem
+    return raw
+
+
 def load_config(config_path: str) -> ConfigModel:
     """Load YAML then validate. Auto-fills *project_name* if missing."""
     try:
         with open(config_path, "r", encoding="utf-8") as f:
-            _raw = f.read()
-            _yaml_txt = textwrap.dedent(_raw)
-            _yaml_txt = sanitize_yaml_text(_yaml_txt, origin=config_path)
-            raw = yaml.safe_load(_yaml_txt)
-            raw["version"] = Path(config_path).stem
+            raw = parse_config_text(f.read(), config_path)
 
         # ---- auto-detect project_name if missing ----
         if not raw.get("project_name"):
@@ -71,50 +97,76 @@ def load_config(config_path: str) -> ConfigModel:
         raise
 
 
-def main() -> None:
+@dataclass
+class PipelineOptions:
+    """Run-time knobs shared by ``pv run`` / ``pv <mode>`` and :func:`main`."""
+
+    verbosity: str = "none"
+    prompt_only: bool = False
+    max_tokens: int = DEFAULT_MAX_TOKENS
+
+
+def warn_max_retries_deprecated() -> None:
+    """``--max_retries`` never reached a retry loop; say so instead of ignoring it silently."""
+    warnings.warn("--max_retries is deprecated and has no effect", DeprecationWarning, stacklevel=2)
+    logging.getLogger(__name__).warning("--max_retries is deprecated and has no effect; drop it.")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
     """Run an iteration of personal vibe based on a config file."""
     parser = argparse.ArgumentParser(description="Run the Personalvibe Workflow.")
     parser.add_argument("--config", required=True, help="Path to YAML config file.")
-    parser.add_argument("--verbosity", choices=["verbose", "none", "errors"], default="none", help="Console log level")
+    parser.add_argument("--verbosity", choices=VERBOSITY_CHOICES, default="none", help="Console log level")
     parser.add_argument("--prompt_only", action="store_true", help="If set, only generate the prompt.")
-    parser.add_argument("--max_retries", type=int, default=5, help="Maximum attempts for sprint validation")
-    parser.add_argument("--max_tokens", type=int, default=20000, help="Maximum completion tokens for LLM")
-    args = parser.parse_args()
-
-    # 1️⃣  Parse config first – we need the semver to derive run_id
-    config = load_config(args.config)
+    parser.add_argument("--max_retries", type=int, help="Deprecated: accepted for compatibility, has no effect.")
+    parser.add_argument("--max_tokens", type=int, default=DEFAULT_MAX_TOKENS, help="Maximum completion tokens for LLM")
+    parser.add_argument("--trace", metavar="FILE", help="Write per-phase timing spans as Chrome trace JSON.")
+    args = parser.parse_args(argv)
+    if args.max_retries is not None:
+        warn_max_retries_deprecated()
+
+    options = PipelineOptions(verbosity=args.verbosity, prompt_only=args.prompt_only, max_tokens=args.max_tokens)
+    with tracing.recording(args.trace):
+        with tracing.span("load_config"):
+            config = load_config(args.config)
+        execute(config, options)
+
+
+def execute(config: ConfigModel, options: Optional[PipelineOptions] = None) -> None:
+    """Render the prompt for *config* and (unless ``prompt_only``) call the LLM.
+
+    *config* is used as-is – callers that already hold a validated
+    :class:`ConfigModel` (the CLI, batch scripts) skip re-reading the YAML.
+    Tracing is the caller's business: wrap the call in
+    :func:`personalvibe.tracing.recording`.
+    """
+    options = options or PipelineOptions()
+    # 1️⃣  The config's semver gives the run_id
     run_id = f"{config.version}_base"
 
     # workspace aware ----------------------------------------------------
     workspace = vibe_utils.get_workspace_root()
 
     # 2️⃣  Bootstrap logging (console + per-semver file)
-    logger.configure_logging(args.verbosity, run_id=run_id, log_dir=workspace / "logs")
-    logger.configure_logging(args.verbosity, run_id=run_id)
+    logger.configure_logging(options.verbosity, run_id=run_id, log_dir=workspace / "logs")
+    logger.configure_logging(options.verbosity, run_id=run_id)
     log = logging.getLogger(__name__)
     log.info(vibe_utils.rainbow("P  E  R  S  O  N  A  L  V  I  B  E"))
 
-    # 3️⃣  Render prompt template ------------------------------------------------
-    project_context = vibe_utils.get_context(config.project_context_paths)
-    replacements = vibe_utils.get_replacements(config, project_context)
-
-    # Use master template for all tasks
-    # SRC will need to be updated!
-    master_template = Template(vibe_utils._load_template("master.md"))
-    prompt = master_template.render(**replacements)
-
-    if args.prompt_only:
-        base_input_path = vibe_utils.get_data_dir(config.project_name, workspace) / "prompt_inputs"
-        base_input_path.mkdir(parents=True, exist_ok=True)
-        _ = vibe_utils.save_prompt(prompt, base_input_path)
-    else:
-        vibe_utils.get_vibed(
-            prompt,
-            project_name=config.project_name,
-            max_completion_tokens=args.max_tokens,
-            workspace=workspace,
-            model=(config.model or None),
-        )
+    # 3️⃣  Render the prompt and (unless prompt_only) call the LLM ----------------
+    pipe = _pipeline_for(workspace)
+    with tracing.span("load_tasks"):
+        pipe.tasks.preload()  # a malformed task file fails here, before anything is rendered
+    pipe.run(config, max_tokens=options.max_tokens, prompt_only=options.prompt_only)
+
+
+def _pipeline_for(workspace: Path) -> Pipeline:
+    """One warm :class:`Pipeline` per workspace (reused by daemon / batch callers)."""
+    with _pipelines_lock:
+        pipe = _pipelines.get(workspace)
+        if pipe is None:
+            pipe = _pipelines[workspace] = Pipeline(workspace)
+        return pipe
 
 
 if __name__ == "__main__":  # pragma: no cover
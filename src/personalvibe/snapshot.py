@@ -0,0 +1,226 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""File-level snapshot / restore around in-process stage scripts.
+
+``pv parse-stage --run`` executes LLM-generated code with ``runpy``; the
+only undo used to be a git reset of the whole branch.  ``FileSnapshot``
+instead watches the interpreter's audit events (``sys.addaudithook``) and,
+*just before* a file is opened for writing, truncated, renamed or removed,
+backs up that one file.  Rollback therefore only touches what the script
+touched and is near-instant, whatever the repo size.
+
+Scope: writes made by *this* Python process.  Child processes spawned by
+the script are not observed.
+
+Usage
+-----
+>>> with FileSnapshot(root=Path.cwd()) as snap:   # doctest: +SKIP
+...     runpy.run_path("stage.py", run_name="__main__")
+>>> print(format_report(snap.changes))             # doctest: +SKIP
+"""
+
+from __future__ import annotations
+
+import filecmp
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+log = logging.getLogger(__name__)
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT | os.O_TRUNC
+
+_active: List[FileSnapshot] = []
+_hook_installed = False
+_state = threading.local()  # .busy → ignore our own file operations
+
+
+@dataclass(frozen=True)
+class FileChange:
+    """One file whose content differs from the snapshot."""
+
+    path: Path
+    kind: str  # "modified" | "created" | "deleted"
+
+
+def _fspath(obj: Any) -> Union[str, None]:  # noqa: ANN401
+    if isinstance(obj, int):  # already-open fd
+        return None
+    try:
+        path = os.fspath(obj)
+    except TypeError:
+        return None
+    return os.fsdecode(path)
+
+
+def _audit(event: str, args: Tuple[Any, ...]) -> None:
+    if not _active or getattr(_state, "busy", False):
+        return
+    try:
+        targets: List[Tuple[Union[str, None], bool]] = []  # (path, will_be_removed)
+        if event == "open":
+            path, mode, flags = args
+            if (isinstance(mode, str) and any(c in mode for c in "wax+")) or (flags or 0) & _WRITE_FLAGS:
+                targets.append((_fspath(path), False))
+        elif event == "os.remove":
+            targets.append((_fspath(args[0]), True))
+        elif event == "os.rename":  # also raised by os.replace / shutil.move
+            targets += [(_fspath(args[0]), True), (_fspath(args[1]), False)]
+        elif event == "os.truncate":
+            targets.append((_fspath(args[0]), False))
+        elif event == "os.mkdir":
+            for snap in _active:
+                snap._note_dir(_fspath(args[0]))
+            return
+        elif event == "shutil.rmtree":
+            root = _fspath(args[0])
+            if root and os.path.isdir(root):
+                for dirpath, _, files in os.walk(root):
+                    targets += [(os.path.join(dirpath, f), True) for f in files]
+        else:
+            return
+
+        for path, removing in targets:
+            if path:
+                for snap in _active:
+                    snap._record(path, removing)
+    except Exception:  # noqa: BLE001  # pragma: no cover - an audit hook must never raise
+        log.debug("snapshot audit hook failed for %s", event, exc_info=True)
+
+
+def _install_hook() -> None:
+    global _hook_installed
+    if not _hook_installed:  # audit hooks cannot be removed – install once
+        sys.addaudithook(_audit)
+        _hook_installed = True
+
+
+class FileSnapshot:
+    """Back up files under *root* right before the first write to each."""
+
+    def __init__(self: FileSnapshot, root: Union[str, Path, None] = None, *, rollback_on_error: bool = True) -> None:
+        self.root = os.path.abspath(root or os.getcwd())
+        self.rollback_on_error = rollback_on_error
+        self.changes: List[FileChange] = []
+        self.rolled_back = False
+        self._store: Optional[Path] = None
+        self._originals: Dict[str, Optional[Path]] = {}  # path → backup (None = did not exist)
+        self._new_dirs: List[str] = []
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------------------- recording
+    def _tracked(self: FileSnapshot, path: str) -> bool:
+        return path == self.root or path.startswith(self.root + os.sep)
+
+    def _record(self: FileSnapshot, path: str, removing: bool) -> None:
+        path = os.path.abspath(path)
+        if not self._tracked(path) or self._store is None:
+            return
+        with self._lock:
+            if path in self._originals:
+                return
+            backup: Optional[Path] = None
+            if os.path.isfile(path):
+                backup = self._store / str(len(self._originals))
+                _state.busy = True
+                try:
+                    if removing:  # inode survives the unlink – a hardlink is enough
+                        try:
+                            os.link(path, backup)
+                        except OSError:
+                            shutil.copy2(path, backup)
+                    else:
+                        shutil.copy2(path, backup)
+                finally:
+                    _state.busy = False
+            self._originals[path] = backup
+
+    def _note_dir(self: FileSnapshot, path: Union[str, None]) -> None:
+        if path:
+            path = os.path.abspath(path)
+            if self._tracked(path) and not os.path.exists(path):
+                self._new_dirs.append(path)
+
+    # --------------------------------------------------------------- results
+    def diff(self: FileSnapshot) -> List[FileChange]:
+        """Compare touched files with their snapshot (unchanged ones omitted)."""
+        changes: List[FileChange] = []
+        for path, backup in self._originals.items():
+            exists = os.path.isfile(path)
+            if backup is None:
+                kind = "created" if exists else ""
+            elif not exists:
+                kind = "deleted"
+            else:
+                kind = "" if filecmp.cmp(backup, path, shallow=False) else "modified"
+            if kind:
+                changes.append(FileChange(Path(path), kind))
+        return changes
+
+    def rollback(self: FileSnapshot) -> List[FileChange]:
+        """Restore every touched file; return what was undone."""
+        undone = self.diff()
+        _state.busy = True
+        try:
+            for path, backup in self._originals.items():
+                if backup is None:
+                    if os.path.isfile(path):
+                        os.remove(path)
+                else:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    shutil.copy2(backup, path)
+            for new_dir in sorted(self._new_dirs, reverse=True):
+                try:
+                    os.rmdir(new_dir)
+                except OSError:
+                    pass  # not empty / already gone
+        finally:
+            _state.busy = False
+        self.rolled_back = True
+        log.warning("Snapshot rollback restored %d file(s)", len(undone))
+        return undone
+
+    # -------------------------------------------------------- context manager
+    def __enter__(self: FileSnapshot) -> FileSnapshot:
+        _install_hook()
+        self._store = Path(tempfile.mkdtemp(prefix="pv_snapshot_"))
+        _active.append(self)
+        return self
+
+    def __exit__(
+        self: FileSnapshot,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        _active.remove(self)
+        failed = exc is not None and not (isinstance(exc, SystemExit) and exc.code in (0, None))
+        if failed and self.rollback_on_error:
+            self.changes = self.rollback()
+        else:
+            self.changes = self.diff()
+        if self._store is not None:
+            shutil.rmtree(self._store, ignore_errors=True)
+            self._store = None
+
+
+def format_report(changes: List[FileChange], root: Union[str, Path, None] = None) -> str:
+    """Human-readable one-line-per-file summary."""
+    if not changes:
+        return "No files changed."
+    base = Path(root or os.getcwd())
+    lines = []
+    for change in changes:
+        try:
+            shown = change.path.relative_to(base)
+        except ValueError:
+            shown = change.path
+        lines.append(f"  {change.kind:<8}  {shown}")
+    return "\n".join(lines)
@@ -0,0 +1,216 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Speculative, parallel stage attempts in isolated ``git worktree``s.
+
+Instead of retrying one candidate stage script after another (each with a
+destructive ``_rollback_branch``), up to *jobs* candidates run at once:
+
+1. ``git worktree add --detach <tmp>/cand-<i> HEAD`` per candidate
+2. ``python <script>`` inside that worktree, whose changes are committed
+   there straight away – before the gate can add logs or other artefacts
+3. the quality-gate (``bash tests/personalvibe.sh`` by default)
+
+``<branch_name>`` is pointed at the snapshot of the first candidate whose
+gate passes (it must not be checked out anywhere).  Everything else is killed and
+all worktrees are removed – the user's own checkout is never touched.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Dict, List, Sequence, Set, Union
+
+from personalvibe.retry_engine import RetryError
+
+log = logging.getLogger(__name__)
+
+DEFAULT_GATE = ("bash", "tests/personalvibe.sh")
+
+
+@dataclass
+class CandidateResult:
+    """Outcome of one speculative candidate."""
+
+    index: int
+    script: Path
+    passed: bool
+    returncode: int
+    duration_s: float
+    log_path: Path
+    commit: Union[str, None] = None
+
+
+def _git(args: Sequence[str], cwd: Path) -> str:
+    res = subprocess.run(
+        ["git", *args], cwd=cwd, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    )
+    return res.stdout.strip()
+
+
+class _Speculation:
+    """Shared state for one ``run_speculative`` call."""
+
+    def __init__(self: _Speculation, repo: Path, base: str, tmp_root: Path, message: str) -> None:
+        self.repo = repo
+        self.base = base
+        self.message = message
+        self.tmp_root = tmp_root
+        self.stop = threading.Event()
+        self.git_lock = threading.Lock()  # serialise worktree add / remove
+        self.procs: Dict[int, subprocess.Popen] = {}
+        self.worktrees: List[Path] = []
+
+    def _step(self: _Speculation, idx: int, cmd: Sequence[str], cwd: Path, log_fh: IO[str]) -> int:
+        if self.stop.is_set():
+            return -1
+        proc = subprocess.Popen(list(cmd), cwd=cwd, stdout=log_fh, stderr=subprocess.STDOUT, start_new_session=True)
+        self.procs[idx] = proc
+        if self.stop.is_set():  # a winner appeared while we were spawning
+            self.kill_running()
+        try:
+            return proc.wait()
+        finally:
+            self.procs.pop(idx, None)
+
+    def run_candidate(
+        self: _Speculation, idx: int, script: Path, gate: Sequence[str], python: str, log_path: Path
+    ) -> CandidateResult:
+        started = time.perf_counter()
+        worktree = self.tmp_root / f"cand-{idx}"
+        with self.git_lock:
+            _git(["worktree", "add", "--detach", str(worktree), self.base], self.repo)
+            self.worktrees.append(worktree)
+
+        commit = None
+        with log_path.open("w", encoding="utf-8") as fh:
+            rc = self._step(idx, [python, str(script)], worktree, fh)
+            if rc == 0:
+                _git(["add", "-A"], worktree)
+                # the snapshot must not depend on the user's hooks or signing setup
+                _git(
+                    ["-c", "commit.gpgsign=false", "commit", "--no-verify", "--allow-empty", "-q"]
+                    + ["-m", f"{self.message}: candidate {script.name}"],
+                    worktree,
+                )
+                commit = _git(["rev-parse", "HEAD"], worktree)
+                rc = self._step(idx, list(gate), worktree, fh)
+
+        result = CandidateResult(idx, script, rc == 0, rc, time.perf_counter() - started, log_path, commit)
+        log.info("Candidate #%d (%s) → rc=%d in %.1fs", idx, script.name, rc, result.duration_s)
+        return result
+
+    def kill_running(self: _Speculation) -> None:
+        for proc in list(self.procs.values()):
+            if proc.poll() is None:
+                try:
+                    if hasattr(os, "killpg"):
+                        os.killpg(proc.pid, signal.SIGTERM)
+                    else:  # pragma: no cover - windows
+                        proc.terminate()
+                except ProcessLookupError:  # pragma: no cover - raced with exit
+                    pass
+
+    def cleanup(self: _Speculation) -> None:
+        with self.git_lock:
+            for worktree in self.worktrees:
+                try:
+                    _git(["worktree", "remove", "--force", str(worktree)], self.repo)
+                except subprocess.CalledProcessError as exc:  # pragma: no cover
+                    log.warning("Could not remove worktree %s: %s", worktree, exc.stdout)
+            _git(["worktree", "prune"], self.repo)
+        shutil.rmtree(self.tmp_root, ignore_errors=True)
+
+
+def _checked_out_branches(repo: Path) -> Set[str]:
+    listing = _git(["worktree", "list", "--porcelain"], repo)
+    prefix = "branch refs/heads/"
+    return {line[len(prefix) :] for line in listing.splitlines() if line.startswith(prefix)}
+
+
+def run_speculative(
+    scripts: Sequence[Union[str, Path]],
+    *,
+    branch_name: str,
+    jobs: int = 3,
+    gate: Sequence[str] = DEFAULT_GATE,
+    repo: Union[Path, None] = None,
+    python: str = sys.executable,
+    log_dir: Union[Path, None] = None,
+) -> CandidateResult:
+    """Run candidate stage *scripts* concurrently; keep the first that passes.
+
+    Returns
+    -------
+    CandidateResult
+        The winning candidate (``commit`` is the sha ``branch_name`` now
+        points at).
+
+    Raises
+    ------
+    ValueError
+        If *branch_name* is checked out (``git branch -f`` cannot move it).
+    RetryError
+        If no candidate passed the gate.
+    """
+    if not scripts:
+        raise ValueError("run_speculative needs at least one candidate script")
+
+    repo = Path(_git(["rev-parse", "--show-toplevel"], Path(repo or Path.cwd())))
+    if branch_name in _checked_out_branches(repo):
+        raise ValueError(f"{branch_name} is checked out; pass a branch that is not, or switch away from it first")
+    base = _git(["rev-parse", "HEAD"], repo)
+    log_dir = Path(log_dir or repo / "logs")
+    log_dir.mkdir(parents=True, exist_ok=True)
+    tag = branch_name.replace("/", "_")
+
+    spec = _Speculation(repo, base, Path(tempfile.mkdtemp(prefix="pv_spec_")), branch_name)
+    winner: Union[CandidateResult, None] = None
+
+    pool = ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="pv-spec")
+    pending: Set[Future] = set()
+    try:
+        pending = {
+            pool.submit(
+                spec.run_candidate,
+                idx,
+                Path(script).resolve(),
+                gate,
+                python,
+                log_dir / f"{tag}_cand{idx}.log",
+            )
+            for idx, script in enumerate(scripts)
+        }
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                res = fut.result()
+                if res.passed and winner is None:
+                    winner = res
+
+        if winner is not None:
+            assert winner.commit is not None  # snapshotted before its gate ran
+            _git(["branch", "-f", branch_name, winner.commit], repo)
+            log.info("✅  %s → candidate #%d (%s)", branch_name, winner.index, winner.commit[:10])
+    finally:
+        # also on errors / Ctrl-C: nothing may outlive the call or block the shutdown
+        spec.stop.set()
+        spec.kill_running()
+        for fut in pending:
+            fut.cancel()
+        pool.shutdown(wait=True)
+        spec.cleanup()
+
+    if winner is None:
+        raise RetryError(f"None of {len(scripts)} speculative candidates passed the gate; see {log_dir}.")
+    return winner
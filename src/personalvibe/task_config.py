@@ -1,19 +1,44 @@
 # Copyright © 2025 by Nick Jenkins. All rights reserved
-"""Task configuration loading and management."""
+"""Task configuration loading and management.
+
+Tasks are ``<task_name>.yaml`` files indexed from, lowest precedence first:
+
+1. the bundled ``personalvibe/data/tasks``;
+2. ``<workspace>/.personalvibe/tasks`` (project-local tasks);
+3. every directory in ``$PV_TASK_DIRS`` (``os.pathsep``-separated).
+
+A later directory overrides a task of the same name from an earlier one.
+The index is rebuilt only when a directory changes; parsed configs are
+cached per file and re-read only when its mtime changes.
+
+Public API
+----------
+TaskConfig                    one validated task file
+TaskConfigError               raised for malformed task files (all of them at once)
+task_dirs(workspace)          directories searched, lowest precedence first
+TaskManager(workspace)        indexed, cached registry (``load_task_config``, ``preload``)
+task_manager                  process-wide instance (workspace resolved per call)
+"""
 
 from __future__ import annotations
 
 import logging
-from typing import Dict
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
 
 import yaml
-from jinja2 import BaseLoader, Environment
 from pydantic import BaseModel
 
-from personalvibe import vibe_utils
+from personalvibe import templates, vibe_utils
+from personalvibe.model_routing import RouteRule
 
 log = logging.getLogger(__name__)
 
+TASK_DIRS_ENV = "PV_TASK_DIRS"
+BUILTIN_TASK_DIR = Path(__file__).parent / "data" / "tasks"
+
 
 class TaskConfig(BaseModel):
     """Configuration for a specific task type."""
@@ -22,42 +47,130 @@ class TaskConfig(BaseModel):
     task_summary: str
     semver: str  # major, minor, or patch
     task_instructions: str
+    routing: List[RouteRule] = []  # optional model routing rules, tried in order
 
 
-class TaskManager:
-    """Manages loading and rendering of task configurations."""
+class TaskConfigError(ValueError):
+    """One or more task files failed to parse or validate.
 
-    def __init__(self: TaskManager) -> None:
-        self._task_cache: Dict[str, TaskConfig] = {}
+    ``errors`` maps each offending file to its error message.
+    """
+
+    def __init__(self: TaskConfigError, errors: Dict[Path, str]) -> None:
+        self.errors = errors
+        lines = [f"  {path}: {message}" for path, message in errors.items()]
+        super().__init__("Invalid task file(s):\n" + "\n".join(lines))
 
-    def load_task_config(self: TaskManager, task_name: str) -> TaskConfig:
-        """Load task configuration from bundled data."""
-        if task_name in self._task_cache:
-            return self._task_cache[task_name]
 
-        try:
-            # Load from package data
-            task_file = f"tasks/{task_name}.yaml"
-            task_yaml = vibe_utils._load_template(task_file)
+def task_dirs(workspace: Union[str, Path, None] = None) -> List[Path]:
+    """Directories searched for ``<task>.yaml``, lowest precedence first."""
+    root = Path(workspace) if workspace else vibe_utils.get_workspace_root()
+    dirs = [BUILTIN_TASK_DIR, root / ".personalvibe" / "tasks"]
+    dirs += [Path(entry).expanduser() for entry in os.getenv(TASK_DIRS_ENV, "").split(os.pathsep) if entry]
+    return dirs
 
-            # Parse YAML
-            task_data = yaml.safe_load(task_yaml)
 
-            # Create and cache config
-            config = TaskConfig(**task_data)
-            self._task_cache[task_name] = config
+def _parse_task_file(path: Path) -> TaskConfig:
+    data = yaml.safe_load(path.read_text(encoding="utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError("expected a YAML mapping")
+    config = TaskConfig(**data)
+    if config.task_name != path.stem:
+        raise ValueError(f"task_name {config.task_name!r} does not match the file name")
+    return config
 
-            log.info("Loaded task config: %s", task_name)
-            return config
 
-        except Exception as e:
-            log.error("Failed to load task config '%s': %s", task_name, e)
-            raise ValueError(f"Unknown task: {task_name}") from e
+class TaskManager:
+    """Indexed registry of task configurations.
+
+    Parameters
+    ----------
+    workspace
+        Workspace whose ``.personalvibe/tasks`` is searched (default:
+        :func:`personalvibe.vibe_utils.get_workspace_root`, resolved per call).
+
+    All caches are lock-protected, so one instance can be shared between
+    threads; compiled instructions live in :mod:`personalvibe.templates`.
+    """
+
+    def __init__(self: TaskManager, workspace: Union[str, Path, None] = None) -> None:
+        self.workspace = workspace
+        self._task_cache: Dict[Path, Tuple[int, TaskConfig]] = {}  # file → (mtime_ns, config)
+        self._index: Dict[str, Path] = {}
+        self._index_key: Tuple[Tuple[str, int], ...] = ()
+        self._lock = threading.RLock()
+
+    def index(self: TaskManager) -> Dict[str, Path]:
+        """``{task_name: yaml file}`` across :func:`task_dirs` (rescanned only when a directory changes)."""
+        with self._lock:
+            key = []
+            for directory in task_dirs(self.workspace):
+                try:
+                    key.append((str(directory), directory.stat().st_mtime_ns))
+                except OSError:
+                    continue
+            if tuple(key) != self._index_key:
+                found: Dict[str, Path] = {}
+                for dir_str, _ in key:
+                    for path in sorted(Path(dir_str).glob("*.yaml")):
+                        if path.stem in found:
+                            log.info("Task %s: %s overrides %s", path.stem, path, found[path.stem])
+                        found[path.stem] = path
+                self._index, self._index_key = found, tuple(key)
+            return dict(self._index)
+
+    def _get(self: TaskManager, path: Path) -> TaskConfig:
+        mtime = path.stat().st_mtime_ns
+        hit = self._task_cache.get(path)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+        config = _parse_task_file(path)
+        self._task_cache[path] = (mtime, config)
+        log.info("Loaded task config: %s (%s)", config.task_name, path)
+        return config
+
+    def load_task_config(self: TaskManager, task_name: str) -> TaskConfig:
+        """The validated config of *task_name*.
+
+        Raises
+        ------
+        ValueError
+            If no task of that name exists (:class:`TaskConfigError` if its file is malformed).
+        """
+        with self._lock:
+            path = self.index().get(task_name)
+            if path is None:
+                log.error("Unknown task '%s'", task_name)
+                raise ValueError(f"Unknown task: {task_name}")
+            try:
+                return self._get(path)
+            except Exception as e:
+                log.error("Failed to load task config '%s': %s", task_name, e)
+                raise TaskConfigError({path: str(e)}) from e
+
+    def preload(self: TaskManager) -> Dict[str, TaskConfig]:
+        """Parse and validate every indexed task file.
+
+        Raises
+        ------
+        TaskConfigError
+            Listing *every* malformed file, so a broken task fails before a run starts.
+        """
+        with self._lock:
+            configs: Dict[str, TaskConfig] = {}
+            errors: Dict[Path, str] = {}
+            for name, path in self.index().items():
+                try:
+                    configs[name] = self._get(path)
+                except Exception as e:  # noqa: BLE001
+                    errors[path] = str(e)
+            if errors:
+                raise TaskConfigError(errors)
+            return configs
 
     def render_task_instructions(self: TaskManager, task_config: TaskConfig, context: dict) -> str:
-        """Render task instructions with Jinja2 templating."""
-        env = Environment(loader=BaseLoader())
-        template = env.from_string(task_config.task_instructions)
+        """Render task instructions with Jinja2 templating (compiled once per task)."""
+        template = templates.task_template(task_config.task_name, task_config.task_instructions)
         return template.render(**context)
 
     def get_semver_type(self: TaskManager, task_name: str) -> str:
@@ -0,0 +1,260 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""One shared, compiled Jinja environment for every prompt template.
+
+``master.md`` and the ``task_instructions`` of ``tasks/*.yaml`` used to be
+re-read and recompiled on every render.  Now:
+
+* a single module-level :class:`jinja2.Environment` reads package data
+  through a :class:`jinja2.PackageLoader`;
+* compiled templates are memoized per process – ``master.md`` is re-checked
+  by mtime, task instructions are keyed by their content; the least recently
+  used are dropped beyond :data:`MAX_TEMPLATES` (a long-lived ``pv serve``
+  sees every edit of every task file);
+* compiled bytecode is persisted in a :class:`jinja2.FileSystemBytecodeCache`
+  (``$PV_TEMPLATE_CACHE_DIR`` or ``<workspace>/.personalvibe/cache/jinja``),
+  so a fresh process skips the Jinja compiler too;
+* ``python -m personalvibe.templates --precompile`` writes the bundled
+  templates as Python modules into ``personalvibe/data/_compiled`` which the
+  wheel ships; when present they are loaded with a
+  :class:`jinja2.ModuleLoader` and nothing is compiled at all.
+
+Templates are registered under content-addressed names (``<name>@<sha>``)
+so neither cache can ever serve a template whose source has changed.
+
+Public API
+----------
+MAX_TEMPLATES                       compiled templates memoized before LRU eviction
+get_environment()                   the shared environment
+get_template(name)                  compiled package-data template (e.g. ``master.md``)
+task_template(task_name, source)    compiled task instructions
+template_variables(template)        names a compiled template reads from its context
+warm()                              compile master.md + every bundled task
+precompile(target)                  write compiled modules for the wheel
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from importlib import resources
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple, Union
+
+from jinja2 import (
+    BaseLoader,
+    ChoiceLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    ModuleLoader,
+    PackageLoader,
+    Template,
+    TemplateNotFound,
+    meta,
+)
+
+log = logging.getLogger(__name__)
+
+MASTER = "master.md"
+COMPILED_DIR = Path(__file__).parent / "data" / "_compiled"
+MAX_TEMPLATES = 128  # memoized compiled templates (LRU)
+
+_lock = threading.RLock()
+_env: Optional[Environment] = None
+_package: Optional[PackageLoader] = None
+_sources: Dict[str, Tuple[str, Optional[str]]] = {}  # addressed name → (source, filename)
+_compiled: OrderedDict[str, Tuple[Template, Optional[Callable[[], bool]]]] = OrderedDict()
+_variables: Dict[str, FrozenSet[str]] = {}  # addressed name → undeclared variables
+
+
+class _SourceLoader(BaseLoader):
+    """Serves the sources registered under content-addressed names."""
+
+    def get_source(
+        self: _SourceLoader, environment: Environment, template: str
+    ) -> Tuple[str, Optional[str], Callable[[], bool]]:
+        try:
+            source, filename = _sources[template]
+        except KeyError:
+            raise TemplateNotFound(template) from None
+        return source, filename, lambda: True  # the name changes when the source does
+
+
+def _addressed(name: str, source: str) -> str:
+    return f"{name}@{hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _bytecode_cache_dir() -> Path:
+    env = os.getenv("PV_TEMPLATE_CACHE_DIR")
+    if env:
+        return Path(env).expanduser()
+    from personalvibe import vibe_utils
+
+    return vibe_utils.get_workspace_root() / ".personalvibe" / "cache" / "jinja"
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    directory = _bytecode_cache_dir()
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError as exc:
+        log.debug("Template bytecode cache disabled (%s): %s", directory, exc)
+        return None
+    return FileSystemBytecodeCache(str(directory))
+
+
+def get_environment() -> Environment:
+    """The process-wide environment (created on first use)."""
+    global _env, _package
+    with _lock:
+        if _env is None:
+            loaders: List[BaseLoader] = [_SourceLoader()]
+            if COMPILED_DIR.is_dir():
+                loaders.insert(0, ModuleLoader(str(COMPILED_DIR)))
+            _package = PackageLoader("personalvibe", "data")
+            _env = Environment(loader=ChoiceLoader(loaders), bytecode_cache=_bytecode_cache(), auto_reload=False)
+        return _env
+
+
+def _compile(name: str, source: str, filename: Optional[str]) -> Template:
+    addressed = _addressed(name, source)
+    _sources[addressed] = (source, filename)
+    return get_environment().get_template(addressed)
+
+
+def _forget(template: Template) -> None:
+    name = template.name or ""
+    _sources.pop(name, None)
+    _variables.pop(name, None)
+
+
+def _remember(key: str, template: Template, uptodate: Optional[Callable[[], bool]]) -> None:
+    """Memoize *template* under *key*, evicting the least recently used beyond :data:`MAX_TEMPLATES`."""
+    old = _compiled.pop(key, None)
+    if old is not None and old[0].name != template.name:
+        _forget(old[0])
+    _compiled[key] = (template, uptodate)
+    while len(_compiled) > MAX_TEMPLATES:
+        _, (evicted, _) = _compiled.popitem(last=False)
+        _forget(evicted)
+
+
+def get_template(name: str = MASTER) -> Template:
+    """Compiled package-data template *name*, recompiled only when the file changes."""
+    with _lock:
+        hit = _compiled.get(name)
+        if hit is not None and (hit[1] is None or hit[1]()):
+            _compiled.move_to_end(name)
+            return hit[0]
+        env = get_environment()
+        assert _package is not None
+        source, filename, uptodate = _package.get_source(env, name)
+        template = _compile(name, source, filename)
+        _remember(name, template, uptodate)
+        return template
+
+
+def task_template(task_name: str, source: str) -> Template:
+    """Compiled ``task_instructions`` of *task_name* (memoized by content)."""
+    key = _addressed(f"tasks/{task_name}", source)
+    with _lock:
+        hit = _compiled.get(key)
+        if hit is not None:
+            _compiled.move_to_end(key)
+            return hit[0]
+        template = _compile(f"tasks/{task_name}", source, None)
+        _remember(key, template, None)
+        return template
+
+
+def template_variables(template: Template) -> FrozenSet[str]:
+    """Undeclared variables of *template* (from ``get_template`` / ``task_template``).
+
+    Parsed once per template with :func:`jinja2.meta.find_undeclared_variables`.
+    """
+    name = template.name or ""
+    with _lock:
+        found = _variables.get(name)
+        if found is None:
+            source = _sources[name][0]
+            found = _variables[name] = frozenset(meta.find_undeclared_variables(get_environment().parse(source)))
+        return found
+
+
+def _bundled_tasks() -> Dict[str, str]:
+    import yaml
+
+    tasks_dir = resources.files("personalvibe.data").joinpath("tasks")
+    found: Dict[str, str] = {}
+    for entry in sorted(tasks_dir.iterdir(), key=lambda e: e.name):
+        if entry.name.endswith(".yaml"):
+            data = yaml.safe_load(entry.read_text(encoding="utf-8")) or {}
+            found[entry.name[: -len(".yaml")]] = data.get("task_instructions", "")
+    return found
+
+
+def warm() -> int:
+    """Compile ``master.md`` and every bundled task template; return the count."""
+    get_template(MASTER)
+    tasks = _bundled_tasks()
+    for task_name, source in tasks.items():
+        task_template(task_name, source)
+    return 1 + len(tasks)
+
+
+def precompile(target: Union[str, Path] = COMPILED_DIR) -> List[Path]:
+    """Write the bundled templates as Python modules for :class:`jinja2.ModuleLoader`.
+
+    Run before building the wheel; stale modules are harmless (they are
+    looked up by content-addressed name) but are removed anyway.
+    """
+    env = get_environment()
+    assert _package is not None
+    target = Path(target)
+    target.mkdir(parents=True, exist_ok=True)
+    for old in target.glob("tmpl_*.py"):
+        old.unlink()
+
+    master, filename, _ = _package.get_source(env, MASTER)
+    entries: List[Tuple[str, str, Optional[str]]] = [(MASTER, master, filename)]
+    entries += [(f"tasks/{name}", source, None) for name, source in _bundled_tasks().items()]
+
+    written: List[Path] = []
+    for name, source, fname in entries:
+        addressed = _addressed(name, source)
+        out = target / ModuleLoader.get_module_filename(addressed)
+        out.write_text(env.compile(source, addressed, fname, raw=True, defer_init=True), encoding="utf-8")
+        written.append(out)
+    log.info("Precompiled %d templates into %s", len(written), target)
+    return written
+
+
+def reset() -> None:
+    """Forget the environment and every memoized template (tests)."""
+    global _env, _package
+    with _lock:
+        _env = _package = None
+        _sources.clear()
+        _compiled.clear()
+        _variables.clear()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """``python -m personalvibe.templates --precompile [--out DIR]``."""
+    parser = argparse.ArgumentParser(description="Personalvibe template utilities.")
+    parser.add_argument("--precompile", action="store_true", help="Compile bundled templates to Python modules.")
+    parser.add_argument("--out", default=str(COMPILED_DIR), help="Target directory for --precompile.")
+    args = parser.parse_args(argv)
+    if args.precompile:
+        for path in precompile(args.out):
+            print(path)
+    else:
+        print(f"{warm()} templates compiled")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
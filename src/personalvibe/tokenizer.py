@@ -0,0 +1,197 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Offline-friendly token counting.
+
+``tiktoken`` downloads its BPE files on first use, which hangs (or fails)
+inside fresh containers and air-gapped CI.  This module wraps it so that:
+
+• the BPE cache directory can be pre-seeded via ``$PV_TOKENIZER_CACHE_DIR``
+  (falls back to tiktoken's own ``$TIKTOKEN_CACHE_DIR``);
+• ``pv warm-cache`` fills that directory ahead of time;
+• loading the encoder is bounded by ``$PV_TOKENIZER_TIMEOUT`` seconds –
+  on timeout / error we fall back to a conservative chars-per-token
+  heuristic (it over- rather than under-counts code).
+
+A failed load (tiktoken missing, offline without a cached BPE file) is
+remembered for the process; a timed-out one is not – the download keeps
+going in the background and a later call picks up its result.
+
+Public API
+----------
+num_tokens(text, model="o3") -> int
+estimate_tokens(text) -> int
+CHARS_PER_TOKEN = 3.0  (used by estimate_tokens)
+get_encoder(model="o3") -> Encoding | None
+warm_cache(cache_dir=None, models=("o3",)) -> Path
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set, Tuple, Union
+
+log = logging.getLogger(__name__)
+
+_DEFAULT_MODEL = "o3"
+_DEFAULT_TIMEOUT = 5.0
+CHARS_PER_TOKEN = 3.0  # code tokenizes denser than prose's ~4; err towards over-counting
+
+# model → loaded encoder, or None once loading failed (never retried)
+_encoders: Dict[str, Any] = {}
+# model → (loader thread, its result) for loads that outlived the timeout
+_pending: Dict[str, Tuple[threading.Thread, Dict[str, Any]]] = {}
+_warned: Set[str] = set()
+_lock = threading.Lock()
+
+
+def get_cache_dir() -> Union[Path, None]:
+    """Return the configured tokenizer cache dir (``None`` = tiktoken default)."""
+    env = os.getenv("PV_TOKENIZER_CACHE_DIR") or os.getenv("TIKTOKEN_CACHE_DIR")
+    if env:
+        return Path(env).expanduser().resolve()
+    return None
+
+
+def _default_cache_dir() -> Path:
+    """Mirror tiktoken's own fallback location (``$TMPDIR/data-gym-cache``)."""
+    return Path(tempfile.gettempdir()) / "data-gym-cache"
+
+
+def _load_timeout() -> float:
+    raw = os.getenv("PV_TOKENIZER_TIMEOUT", "")
+    try:
+        return float(raw) if raw else _DEFAULT_TIMEOUT
+    except ValueError:
+        log.warning("Ignoring invalid PV_TOKENIZER_TIMEOUT=%r", raw)
+        return _DEFAULT_TIMEOUT
+
+
+def _load_encoder(model: str) -> Any:  # noqa: ANN401
+    """Import tiktoken and build the encoder for *model* (may hit the network)."""
+    import tiktoken
+
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return tiktoken.encoding_for_model(model)
+    # tiktoken reads the env var lazily on every blob fetch; point it at our
+    # dir for this load only, without leaking into the process or subprocesses
+    previous = os.environ.get("TIKTOKEN_CACHE_DIR")
+    os.environ["TIKTOKEN_CACHE_DIR"] = str(cache_dir)
+    try:
+        return tiktoken.encoding_for_model(model)
+    finally:
+        if previous is None:
+            os.environ.pop("TIKTOKEN_CACHE_DIR", None)
+        else:
+            os.environ["TIKTOKEN_CACHE_DIR"] = previous
+
+
+def _warn_once(model: str, msg: str, *args: object) -> None:
+    if model not in _warned:
+        _warned.add(model)
+        log.warning(msg, *args)
+
+
+def get_encoder(model: str = _DEFAULT_MODEL) -> Any:  # noqa: ANN401
+    """Return a cached tiktoken encoder for *model*, or ``None`` if unavailable.
+
+    The load runs on a daemon thread so a stalled download can never keep
+    the caller (or interpreter shutdown) waiting longer than the timeout.
+    While a timed-out load is still running, later calls return ``None``
+    at once; the first call after it finishes uses its result.
+    """
+    with _lock:
+        if model in _encoders:
+            return _encoders[model]
+
+        if model in _pending:
+            worker, result = _pending[model]
+            if worker.is_alive():
+                return None
+            del _pending[model]
+        else:
+            result = {}
+
+            def _target() -> None:
+                try:
+                    result["encoder"] = _load_encoder(model)
+                except Exception as exc:  # noqa: BLE001
+                    result["error"] = exc
+
+            timeout = _load_timeout()
+            worker = threading.Thread(target=_target, name="pv-tokenizer-load", daemon=True)
+            worker.start()
+            worker.join(timeout)
+            if worker.is_alive():
+                _pending[model] = (worker, result)  # not a verdict – a later call retries
+                _warn_once(
+                    model,
+                    "Tokenizer for %s not loaded within %.1fs – using heuristic estimate (~%g chars/token) "
+                    "until it is. Run `pv warm-cache` to pre-seed the cache.",
+                    model,
+                    timeout,
+                    CHARS_PER_TOKEN,
+                )
+                return None
+
+        if "error" in result:
+            _warn_once(
+                model,
+                "Tokenizer for %s unavailable (%s) – using heuristic estimate (~%g chars/token).",
+                model,
+                result["error"],
+                CHARS_PER_TOKEN,
+            )
+        encoder = result.get("encoder")
+        _encoders[model] = encoder
+        return encoder
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, dependency-free token estimate (~3 chars per token, deliberately high)."""
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def num_tokens(text: str, model: str = _DEFAULT_MODEL) -> int:
+    """Count tokens with tiktoken, falling back to :func:`estimate_tokens`."""
+    encoder = get_encoder(model)
+    if encoder is None:
+        return estimate_tokens(text)
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def warm_cache(cache_dir: Union[str, Path, None] = None, models: Iterable[str] = (_DEFAULT_MODEL,)) -> Path:
+    """Download the BPE files for *models* into *cache_dir* and return it.
+
+    Unlike :func:`get_encoder` this is allowed to block on the network –
+    it is meant to run once, ahead of time (image build, CI setup step).
+    """
+    target = Path(cache_dir).expanduser().resolve() if cache_dir else (get_cache_dir() or _default_cache_dir())
+    target.mkdir(parents=True, exist_ok=True)
+    os.environ["TIKTOKEN_CACHE_DIR"] = str(target)
+
+    import tiktoken
+
+    loaded: List[str] = []
+    for model in models:
+        name = tiktoken.encoding_name_for_model(model)
+        if name not in loaded:
+            tiktoken.get_encoding(name)
+            loaded.append(name)
+        log.info("Tokenizer cache warm for %s (%s) in %s", model, name, target)
+
+    reset_cache()
+    return target
+
+
+def reset_cache() -> None:
+    """Forget loaded / failed encoders (unit tests, post warm-up)."""
+    with _lock:
+        _encoders.clear()
+        _pending.clear()
+        _warned.clear()
@@ -0,0 +1,156 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Lightweight per-phase timing spans with Chrome trace export.
+
+``pv run --trace out.json`` records a span around every pipeline phase
+(load_config, get_context, each ``_process_file``, get_replacements, the
+template render, token counting, saving, the provider call …) and writes
+them as Chrome trace-event JSON – open it in ``chrome://tracing`` or
+https://ui.perfetto.dev.  A per-phase summary table goes to the log.
+
+When tracing is off, :func:`span` returns a shared no-op context manager,
+so the instrumented code pays one global lookup per span.
+
+Public API
+----------
+span(name, **args)          context manager timing one phase
+start() / stop()            begin / end recording (stop returns the events)
+write_chrome_trace(path)    dump events as ``{"traceEvents": [...]}``
+summary_table(events)       count / total / mean / max per span name
+finish(path)                stop, write the trace and log the summary
+recording(path)             ``start()`` … ``finish(path)`` around a block
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from types import TracebackType
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Type, Union
+
+log = logging.getLogger(__name__)
+
+_NOOP = nullcontext()
+
+
+class _Recorder:
+    def __init__(self: _Recorder) -> None:
+        self.events: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+        self.origin_ns = time.perf_counter_ns()
+        self.pid = os.getpid()
+
+
+_recorder: Optional[_Recorder] = None
+
+
+class _Span:
+    __slots__ = ("recorder", "name", "args", "t0")
+
+    def __init__(self: _Span, recorder: _Recorder, name: str, args: Dict[str, Any]) -> None:
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+        self.t0 = 0
+
+    def __enter__(self: _Span) -> _Span:
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(
+        self: _Span,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        t1 = time.perf_counter_ns()
+        rec = self.recorder
+        event: Dict[str, Any] = {
+            "name": self.name,
+            "ph": "X",  # complete event
+            "ts": (self.t0 - rec.origin_ns) / 1000,  # µs
+            "dur": (t1 - self.t0) / 1000,
+            "pid": rec.pid,
+            "tid": threading.get_ident(),
+        }
+        if self.args or exc_type is not None:
+            args = {k: str(v) for k, v in self.args.items()}
+            if exc_type is not None:
+                args["error"] = exc_type.__name__
+            event["args"] = args
+        with rec.lock:
+            rec.events.append(event)
+
+
+def span(name: str, **args: Any) -> ContextManager[Any]:  # noqa: ANN401
+    """Time the enclosed block as *name* (no-op unless tracing is on)."""
+    rec = _recorder
+    if rec is None:
+        return _NOOP
+    return _Span(rec, name, args)
+
+
+def enabled() -> bool:
+    """True while spans are being recorded."""
+    return _recorder is not None
+
+
+def start() -> None:
+    """Begin recording spans (resets any previous recording)."""
+    global _recorder
+    _recorder = _Recorder()
+
+
+def stop() -> List[Dict[str, Any]]:
+    """Stop recording and return the collected events."""
+    global _recorder
+    rec, _recorder = _recorder, None
+    return rec.events if rec is not None else []
+
+
+def write_chrome_trace(path: Union[str, Path], events: List[Dict[str, Any]]) -> Path:
+    """Write *events* in Chrome trace-event format (Perfetto compatible)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    meta = {"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": "personalvibe"}}
+    payload = {"traceEvents": [meta, *events], "displayTimeUnit": "ms"}
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    return path
+
+
+def summary_table(events: List[Dict[str, Any]]) -> str:
+    """Per span name: count, total / mean / max ms – slowest total first."""
+    stats: Dict[str, List[float]] = {}
+    for ev in events:
+        stats.setdefault(ev["name"], []).append(ev["dur"] / 1000)
+    lines = [f"{'span':<24} {'count':>5} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"]
+    for name, durs in sorted(stats.items(), key=lambda kv: -sum(kv[1])):
+        total = sum(durs)
+        lines.append(f"{name:<24} {len(durs):>5} {total:>10.1f} {total / len(durs):>9.1f} {max(durs):>9.1f}")
+    return "\n".join(lines)
+
+
+def finish(path: Union[str, Path]) -> Path:
+    """Stop recording, write the trace to *path* and log the summary table."""
+    events = stop()
+    out = write_chrome_trace(path, events)
+    log.info("Trace written to %s (%d spans)\n%s", out, len(events), summary_table(events))
+    return out
+
+
+@contextmanager
+def recording(path: Union[str, Path, None]) -> Iterator[None]:
+    """Record spans inside the block and :func:`finish` to *path* (no-op if falsy)."""
+    if not path:
+        yield
+        return
+    start()
+    try:
+        yield
+    finally:
+        finish(path)
@@ -1,26 +1,34 @@
 # Copyright © 2025 by Nick Jenkins. All rights reserved
 # mypy: ignore-errors
 import fnmatch
+import functools
 import hashlib
 import html
 import logging
 import logging as _pv_log
 import os
 import random
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime
 from importlib import resources
 from pathlib import Path
-from typing import TYPE_CHECKING, Iterable, List, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Union
 
 import dotenv
-import pathspec
-import tiktoken
-from jinja2 import Environment, FileSystemLoader
 
-from personalvibe import llm_router  # ← LiteLLM shim (chunk-3)
+from personalvibe import tokenizer, tracing
 
+# Heavy deps (litellm via llm_router, pydantic via model_registry, pathspec)
+# are imported inside the functions that need them so that `pv --help` and
+# the scaffolding commands start fast.
 if TYPE_CHECKING:
+    import pathspec  # noqa: F401
+
     from personalvibe.run_pipeline import ConfigModel  # noqa: F401
+    from personalvibe.task_config import TaskConfig, TaskManager  # noqa: F401
 
 from personalvibe.yaml_utils import sanitize_yaml_text
 
@@ -56,6 +64,93 @@ def find_existing_hash(root_dir: Union[str, Path], hash_str: str) -> Union[Path,
     return None
 
 
+END_PROMPT_MARKER = "### END PROMPT\n"
+_STREAM_FLUSH_CHARS = 64 * 1024  # batch tiny Jinja chunks before hashing / token counting
+
+
+@dataclass
+class SavedPrompt:
+    """A prompt persisted by :func:`save_prompt_stream`."""
+
+    path: Path
+    sha256: str
+    chars: int
+    nbytes: int  # UTF-8 size of the prompt, END marker excluded
+    tokens: Union[int, None] = None  # None when not counted
+    duplicate: bool = False
+
+    def read(self: "SavedPrompt") -> str:
+        """The prompt text (without the END marker) – the only in-memory copy."""
+        with self.path.open("rb") as fh:
+            return fh.read(self.nbytes).decode("utf-8")
+
+
+def save_prompt_stream(
+    chunks: Iterable[str],
+    root_dir: Path,
+    input_hash: str = "",
+    *,
+    count_tokens: bool = False,
+) -> SavedPrompt:
+    """Stream *chunks* (e.g. ``Template.generate()``) into a prompt file.
+
+    SHA-256, size and (optionally) token count are computed as the chunks
+    pass, so the prompt is never assembled in memory.  Naming, duplicate
+    detection and the END marker are exactly those of :func:`save_prompt`;
+    the file is written under a temporary name and renamed once complete.
+    """
+    root_dir = Path(root_dir)
+    root_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    digest = hashlib.sha256()
+    totals = {"chars": 0, "nbytes": 0, "tokens": 0}
+    pending: List[str] = []
+
+    fd, tmp_name = tempfile.mkstemp(dir=root_dir, prefix=".", suffix=".partial")
+    tmp = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+
+            def _flush() -> None:
+                text = "".join(pending)
+                pending.clear()
+                data = text.encode("utf-8")
+                digest.update(data)
+                fh.write(data)
+                totals["chars"] += len(text)
+                totals["nbytes"] += len(data)
+                if count_tokens:
+                    totals["tokens"] += num_tokens(text)
+
+            buffered = 0
+            for chunk in chunks:
+                pending.append(chunk)
+                buffered += len(chunk)
+                if buffered >= _STREAM_FLUSH_CHARS:
+                    _flush()
+                    buffered = 0
+            _flush()
+            fh.write(b"\n" + END_PROMPT_MARKER.encode("utf-8"))
+
+        sha = digest.hexdigest()
+        hash_str = sha[:10]
+        saved = SavedPrompt(tmp, sha, totals["chars"], totals["nbytes"], totals["tokens"] if count_tokens else None)
+        if existing := find_existing_hash(root_dir, hash_str):
+            tmp.unlink()
+            log.info("Duplicate prompt detected. Existing file: %s", existing)
+            saved.path, saved.duplicate = existing, True
+            return saved
+
+        filename = f"{timestamp}_{input_hash}_{hash_str}.md" if input_hash else f"{timestamp}_{hash_str}.md"
+        saved.path = root_dir / filename
+        os.replace(tmp, saved.path)
+        log.info("Prompt saved to: %s", saved.path)
+        return saved
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
 def save_prompt(prompt: str, root_dir: Path, input_hash: str = "") -> Path:
     """Persist *one* prompt to disk and return its Path.
 
@@ -71,31 +166,7 @@ def save_prompt(prompt: str, root_dir: Path, input_hash: str = "") -> Path:
 
       to make `grep -A999 '^### END PROMPT$'` trivially reliable.
     """
-    # Timestamp + hash bits
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    hash_str = get_prompt_hash(prompt)[:10]
-
-    if existing := find_existing_hash(root_dir, hash_str):
-        log.info("Duplicate prompt detected. Existing file: %s", existing)
-        return existing
-
-    # Compose filename
-    if input_hash:
-        filename = f"{timestamp}_{input_hash}_{hash_str}.md"
-    else:
-        filename = f"{timestamp}_{hash_str}.md"
-    filepath = Path(root_dir) / filename
-    filepath.parent.mkdir(parents=True, exist_ok=True)
-
-    # Write prompt + END-marker
-    filepath.write_text(
-        f"""{prompt}
-### END PROMPT
-""",
-        encoding="utf-8",
-    )
-    log.info("Prompt saved to: %s", filepath)
-    return filepath
+    return save_prompt_stream((prompt,), root_dir, input_hash).path
 
 
 def get_vibed(
@@ -106,16 +177,25 @@ def get_vibed(
     max_completion_tokens: int = 100_000,
     *,
     workspace: Union[Path, None] = None,
+    saved: Union[SavedPrompt, None] = None,
 ) -> str:
-    """Wrapper for O3 vibecoding – **now workspace-aware**."""
+    """Wrapper for O3 vibecoding – **now workspace-aware**.
+
+    Pass *saved* when *prompt* was already persisted with
+    :func:`save_prompt_stream` – its file and token count are reused.
+    """
     if contexts is None:
         contexts = []
 
     workspace = workspace or get_workspace_root()
 
-    base_input_path = get_data_dir(project_name, workspace) / "prompt_inputs"
-    base_input_path.mkdir(parents=True, exist_ok=True)
-    prompt_file = save_prompt(prompt, base_input_path)
+    if saved is None:
+        base_input_path = get_data_dir(project_name, workspace) / "prompt_inputs"
+        base_input_path.mkdir(parents=True, exist_ok=True)
+        with tracing.span("save_prompt"):
+            prompt_file = save_prompt(prompt, base_input_path)
+    else:
+        prompt_file = saved.path
     input_hash = prompt_file.stem.split("_")[-1]
 
     # -- build messages ---------------------------------------------------
@@ -127,26 +207,73 @@ def get_vibed(
 
     messages.append({"role": "user", "content": [{"type": "text", "text": prompt}]})
 
-    message_chars = len(str(messages))
     model = model or "openai/o3"
-    message_tokens = num_tokens(str(messages))
-    log.info("Prompt size – Tokens: %s, Chars: %s, Model:%s", message_tokens, message_chars, model)
-
-    resp = llm_router.chat_completion(
-        model=model,
-        messages=messages,
-        max_tokens=max_completion_tokens,
-    )
+    texts = [m["content"][0]["text"] for m in messages]
+    with tracing.span("num_tokens", messages=len(texts)):
+        token_counts = [num_tokens(t) for t in texts[:-1]]
+        token_counts.append(saved.tokens if saved and saved.tokens is not None else num_tokens(prompt))
+    message_chars = sum(len(t) for t in texts)
+    log.info("Prompt size – Tokens: %s, Chars: %s, Model:%s", sum(token_counts), message_chars, model)
+
+    # -- pre-flight: fail fast locally instead of after upload + queueing --
+    max_completion_tokens = _preflight(model, messages, token_counts, max_completion_tokens, workspace)
+
+    from personalvibe import llm_router  # ← LiteLLM shim (chunk-3), heavy
+
+    started = time.perf_counter()
+    with tracing.span("llm_call", model=model):
+        resp = llm_router.chat_completion(
+            model=model,
+            messages=messages,
+            max_tokens=max_completion_tokens,
+        )
+    log.info("LLM call – Model: %s, Latency: %.2fs", model, time.perf_counter() - started)
     response = resp["choices"][0]["message"]["content"]
 
     # -- save assistant reply --------------------------------------------
     base_output_path = get_data_dir(project_name, workspace) / "prompt_outputs"
     base_output_path.mkdir(parents=True, exist_ok=True)
-    _ = save_prompt(response, base_output_path, input_hash=input_hash)
+    with tracing.span("save_response"):
+        _ = save_prompt(response, base_output_path, input_hash=input_hash)
 
     return response
 
 
+def _preflight(
+    model: str,
+    messages: List[dict],
+    token_counts: List[int],
+    requested: int,
+    workspace: Union[Path, None] = None,
+) -> int:
+    """Trim oldest context messages to fit *model*, then size ``max_tokens``.
+
+    Mutates *messages* / *token_counts* in place; the final (prompt) message
+    is never dropped.  Raises ``ContextWindowError`` if it still won't fit.
+    """
+    from personalvibe import model_registry
+
+    info = model_registry.get_model_info(model, workspace)
+    if info is None:
+        log.debug("No registry entry for %s – skipping pre-flight", model)
+        return requested
+
+    needed = min(requested, model_registry.MIN_OUTPUT_TOKENS)
+    while len(messages) > 1 and sum(token_counts) + needed > info.context_window:
+        dropped = messages.pop(0)
+        log.warning(
+            "Pre-flight: dropped oldest %s message (%d tokens) to fit %s",
+            dropped["role"],
+            token_counts.pop(0),
+            model,
+        )
+
+    sized = model_registry.size_max_tokens(info, sum(token_counts), requested)
+    if sized != requested:
+        log.info("Pre-flight: max_tokens %d → %d for %s", requested, sized, model)
+    return sized
+
+
 COMMENT_PREFIX = "#"
 EXCLUDE_PREFIX = "X "
 WILDCARD_CHARS = "*?[]"
@@ -218,7 +345,8 @@ def get_context(filenames: List[str], extension: str = ".txt") -> str:  # type:
         ):
             return
         try:
-            big_string += _process_file(path)
+            with tracing.span("_process_file", file=rel):
+                big_string += _process_file(path)
         except UnicodeDecodeError:
             log.error("Unicode error reading %s", rel)
 
@@ -285,9 +413,21 @@ def _process_file(file_path: Path) -> str:
         return f"\n#### Start of {rel_path}\n" f"```{language}\n" f"{content}\n" f"```\n" f"#### End of {rel_path}\n"
 
 
-def load_gitignore(base_path: Path) -> pathspec.PathSpec:
+def load_gitignore(base_path: Path) -> "pathspec.PathSpec":
+    """Parsed ``<base_path>/.gitignore`` (cached until the file changes)."""
     gitignore_path = base_path / ".gitignore"
-    if gitignore_path.exists():
+    try:
+        mtime_ns = gitignore_path.stat().st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    return _gitignore_spec(gitignore_path, mtime_ns)
+
+
+@functools.lru_cache(maxsize=32)
+def _gitignore_spec(gitignore_path: Path, mtime_ns: Union[int, None]) -> "pathspec.PathSpec":
+    import pathspec
+
+    if mtime_ns is not None:
         with open(gitignore_path, "r") as f:
             spec = pathspec.PathSpec.from_lines("gitwildmatch", f)
         return spec
@@ -357,15 +497,22 @@ def get_base_path(base: str = "personalvibe") -> Path:
 
 
 def num_tokens(text: str) -> int:
-    """Just use o3 for a rough guide."""
-    enc = tiktoken.encoding_for_model("o3")
-    return len(enc.encode(text))
+    """Just use o3 for a rough guide (heuristic estimate when offline)."""
+    return tokenizer.num_tokens(text)
 
 
 def _get_error_text(config: "ConfigModel") -> str:
+    """Deduplicated pytest / mypy / flake8 failures from the error file, within ``error_token_cap``.
+
+    Only the last ``BEGIN-STAMP`` session is read when the file is a stamped log.
+    """
+    from personalvibe import failure_parser, log_reader
+
     error_path = Path(get_base_path(), "prompts", config.project_name, "errors", config.error_file_name)
-    # NOTE TO LLM: improve the handling here as per my usual codestyle
-    return error_path.read_text()
+    raw = log_reader.read_last_session(error_path)
+    compact = failure_parser.compact_error_text(raw, config.error_token_cap)
+    log.info("Error context %s: %d → %d chars", error_path.name, len(raw), len(compact))
+    return compact
 
 
 def _get_milestone_text(config: "ConfigModel") -> str:
@@ -403,47 +550,118 @@ def _load_template(fname: str) -> str:
         raise FileNotFoundError(f"Template {fname!s} not found in package or legacy path")
 
 
-def get_replacements(config: "ConfigModel", project_context: str) -> dict:
-    """Build the Jinja replacement map using task-based configuration."""
-    from personalvibe.task_config import task_manager
+class Replacements:
+    """Template variables computed on first access, then memoized.
+
+    Built once per run by :func:`lazy_replacements`; :meth:`select` pulls
+    just the names a template actually references.  Thread-safe.
+    """
+
+    def __init__(self: "Replacements", providers: Dict[str, Callable[[], Any]]) -> None:
+        self._providers = providers
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def __contains__(self: "Replacements", name: object) -> bool:
+        return name in self._providers
+
+    def __getitem__(self: "Replacements", name: str) -> Any:  # noqa: ANN401
+        with self._lock:
+            if name not in self._values:
+                self._values[name] = self._providers[name]()
+            return self._values[name]
+
+    def names(self: "Replacements") -> List[str]:
+        """Every variable this run can provide."""
+        return list(self._providers)
+
+    def computed(self: "Replacements") -> List[str]:
+        """Variables evaluated so far."""
+        return list(self._values)
+
+    def select(self: "Replacements", names: Iterable[str]) -> Dict[str, Any]:
+        """``{name: value}`` for the provided *names* (computing them if needed)."""
+        return {name: self[name] for name in names if name in self._providers}
+
+
+def lazy_replacements(
+    config: "ConfigModel",
+    tasks: Union["TaskManager", None] = None,
+    project_context: Union[str, None] = None,
+) -> Replacements:
+    """Master-template variables for *config*, each computed only on demand.
+
+    The task instructions are rendered with just the variables their
+    template references (``jinja2.meta.find_undeclared_variables``), so
+    milestone files and error logs are only read by tasks that embed them.
+    *project_context* is built from ``config.project_context_paths`` unless
+    given.
+    """
+    from personalvibe import templates
+
+    if tasks is None:
+        from personalvibe.task_config import task_manager as tasks
 
     log.info("Running config version: %s", config.version)
     log.info("Running task: %s", config.task)
 
-    # Load task configuration
-    try:
-        task_config = task_manager.load_task_config(config.task)
-    except ValueError as e:
-        log.error("Failed to load task config: %s", e)
-        raise
+    def _task_config() -> "TaskConfig":
+        try:
+            return tasks.load_task_config(config.task)
+        except ValueError as e:
+            log.error("Failed to load task config: %s", e)
+            raise
 
-    # Build context for task instruction rendering
-    task_context = {
-        "project_name": config.project_name,
-        "version": config.version,
+    def _milestone_text() -> str:
+        try:
+            return _get_milestone_text(config)
+        except Exception as e:
+            log.warning("Could not load milestone text: %s", e)
+            return ""
+
+    task_providers: Dict[str, Callable[[], Any]] = {
+        "project_name": lambda: config.project_name,
+        "version": lambda: config.version,
+        "milestone_text": _milestone_text,
     }
+    if config.task in ("validate", "bugfix") and config.error_file_name:
+        task_providers["error_details"] = lambda: _get_error_text(config)
+    task_vars = Replacements(task_providers)
+
+    def _task_instructions() -> str:
+        task_config = task["task_config"]
+        needed = templates.template_variables(
+            templates.task_template(task_config.task_name, task_config.task_instructions)
+        )
+        return tasks.render_task_instructions(task_config, task_vars.select(needed))
+
+    def _project_context() -> str:
+        if project_context is not None:
+            return project_context
+        with tracing.span("get_context"):
+            return get_context(config.project_context_paths)
+
+    task = Replacements({"task_config": _task_config})
+    return Replacements(
+        {
+            "project_name": lambda: config.project_name,
+            "task_summary": lambda: task["task_config"].task_summary,
+            "user_instructions": lambda: config.user_instructions,
+            "task_instructions": _task_instructions,
+            "project_context": _project_context,
+        }
+    )
 
-    # Handle task-specific context requirements
-    if config.task == "validate" and config.error_file_name:
-        task_context["error_details"] = _get_error_text(config)
 
-    # Attempt to get milestone text
-    try:
-        task_context["milestone_text"] = _get_milestone_text(config)
-    except Exception as e:
-        log.warning("Could not load milestone text: %s", e)
-        task_context["milestone_text"] = ""
-
-    # Render task instructions with context
-    task_instructions = task_manager.render_task_instructions(task_config, task_context)
-
-    return {
-        "project_name": config.project_name,
-        "task_summary": task_config.task_summary,
-        "user_instructions": config.user_instructions,
-        "task_instructions": task_instructions,
-        "project_context": project_context,
-    }
+def get_replacements(config: "ConfigModel", project_context: str, tasks: Union["TaskManager", None] = None) -> dict:
+    """Build the Jinja replacement map using task-based configuration.
+
+    Eager form of :func:`lazy_replacements`: every master-template variable
+    is returned, but the task instructions still only read what they use.
+    *tasks* defaults to the process-wide ``task_config.task_manager``.
+    """
+    lazy = lazy_replacements(config, tasks, project_context)
+    return lazy.select(lazy.names())
 
 
 def detect_project_name(cwd: Union[Path, None] = None) -> str:
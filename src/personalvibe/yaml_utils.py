@@ -7,12 +7,19 @@ Public API
 sanitize_yaml_text(text: str, *, origin: Union[str, None] = None) -> str
     • strips ASCII control chars 0x00-0x1F (except \n, \r, \t)
     • raises *ValueError* on any remaining surrogate code-points
+safe_load(text: str)
+    ``yaml.safe_load`` through libyaml's ``CSafeLoader`` when available
 """
 
 from __future__ import annotations
 
 import re
-from typing import Union
+from typing import Any, Union
+
+import yaml
+
+# libyaml's C loader is ~10x faster; same safe constructors
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 # Control characters excluding \n, \r, \t
 _CTRL = "".join(chr(i) for i in range(32) if chr(i) not in "\n\r\t")
@@ -46,3 +53,8 @@ def sanitize_yaml_text(text: str, *, origin: Union[str, None] = None) -> str:
         raise ValueError(f'Invalid Unicode rune {bad} found while reading YAML {origin or ""}'.strip())
 
     return cleaned
+
+
+def safe_load(text: str) -> Any:  # noqa: ANN401
+    """Parse *text* like ``yaml.safe_load``, using :data:`SafeLoader`."""
+    return yaml.load(text, Loader=SafeLoader)  # noqa: S506 – SafeLoader / CSafeLoader only
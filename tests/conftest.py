@@ -1,7 +1,14 @@
 # Copyright © 2025 by Nick Jenkins. All rights reserved
 
+import os
+
 import pytest
 
+# Tests that import litellm directly (e.g. to monkeypatch litellm.completion)
+# bypass llm_router._get_litellm(); keep them off the remote cost map too, or
+# litellm's background retry thread races the main thread's imports.
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
 
 # Single authoritative place to declare project-wide markers.  Older
 # code used the removed `pytest.register_mark`.  The hook below works
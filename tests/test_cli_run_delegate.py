@@ -2,14 +2,16 @@
 
 # Copyright © 2025 by Nick Jenkins.
 #
-# Purpose: ensure `pv run` inspects YAML, routes to the correct
-# specialised handler, and honours --raw-argv passthrough.
+# Purpose: ensure `pv run` loads the YAML once, hands the validated config
+# to run_pipeline.execute(), and honours --raw-argv passthrough.
 from __future__ import annotations
 
 import types
 from pathlib import Path
 from unittest import mock
 
+import pytest
+
 import personalvibe.cli as cli
 
 
@@ -26,30 +28,52 @@ project_context_paths: []""",
 
 
 def test_run_delegates_to_mode(monkeypatch, tmp_path):
-    called = types.SimpleNamespace(args=None)
+    called = types.SimpleNamespace(config=None, options=None)
 
-    def _fake_main():
-        called.args = cli.sys.argv[1:]  # skip prog name
+    def _fake_execute(config, options):
+        called.config, called.options = config, options
 
-    monkeypatch.patch.object(cli.run_pipeline, "main", _fake_main)
+    monkeypatch.patch.object(cli.run_pipeline, "execute", _fake_execute)
 
     cfg = _tmp_cfg(tmp_path, "milestone")
     cli.cli_main(["run", "--config", str(cfg)])
 
-    assert called.args is not None, "run_pipeline.main not invoked"
-    # Should be same args as explicit 'pv milestone'
-    assert "--config" in called.args
-    assert str(cfg) in called.args
+    assert called.config is not None, "run_pipeline.execute not invoked"
+    # Already-validated config is handed over – no argv round-trip
+    assert called.config.task == "milestone"
+    assert called.config.version == "milestone"
+    assert called.options == cli.run_pipeline.PipelineOptions()
+    assert called.options.max_tokens == cli.run_pipeline.DEFAULT_MAX_TOKENS
+
+
+def test_mode_forwards_options(monkeypatch, tmp_path):
+    called = {}
+    monkeypatch.patch.object(cli.run_pipeline, "execute", lambda config, options: called.update(options=options))
+
+    cfg = _tmp_cfg(tmp_path, "sprint")
+    cli.cli_main(["sprint", "--config", str(cfg), "--prompt_only", "--max_tokens", "123", "--verbosity", "errors"])
+
+    assert called["options"] == cli.run_pipeline.PipelineOptions(verbosity="errors", prompt_only=True, max_tokens=123)
+
+
+def test_max_retries_is_deprecated(monkeypatch, tmp_path):
+    called = {}
+    monkeypatch.patch.object(cli.run_pipeline, "execute", lambda config, options: called.update(options=options))
+
+    cfg = _tmp_cfg(tmp_path, "sprint")
+    with pytest.warns(DeprecationWarning, match="max_retries"):
+        cli.cli_main(["sprint", "--config", str(cfg), "--max_retries", "3"])
+
+    assert called["options"] == cli.run_pipeline.PipelineOptions()
 
 
 def test_run_raw_argv_passthrough(monkeypatch, tmp_path):
     captured = {}
 
-    def _fake_main():
-        captured["argv"] = cli.sys.argv[1:]
+    def _fake_main(argv=None):
+        captured["argv"] = list(argv)
 
     monkeypatch.patch.object(cli.run_pipeline, "main", _fake_main)
-
     cfg = _tmp_cfg(tmp_path, "prd")
     cli.cli_main(
         [
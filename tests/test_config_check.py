@@ -0,0 +1,73 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""pv check-configs – bulk validation, content-hash cache, process pool."""
+
+import pytest
+
+from personalvibe import cli, config_check
+
+_GOOD = """task: sprint
+project_context_paths: []
+user_instructions: hi
+"""
+
+
+def _write(root, name, text, project="demo"):
+    path = root / "prompts" / project / "configs" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_reports_each_bad_file_and_infers_project_name(tmp_path):
+    good = _write(tmp_path, "1.0.0.yaml", _GOOD)
+    missing = _write(tmp_path, "1.1.0.yaml", "task: sprint\n")
+    garbled = _write(tmp_path, "1.2.0.yaml", "task: [unclosed\n")
+
+    results = config_check.check_configs(root=tmp_path)
+
+    assert [r.path for r in results] == [good, missing, garbled]
+    assert results[0].ok
+    assert "project_context_paths" in results[1].error
+    assert results[2].error.startswith("ParserError")
+    assert "2 failed" in config_check.format_report(results)
+
+
+def test_results_are_cached_by_content(tmp_path, monkeypatch):
+    path = _write(tmp_path, "1.0.0.yaml", _GOOD)
+    config_check.check_configs(root=tmp_path)
+
+    def _boom(p):
+        raise AssertionError("should have been cached")
+
+    monkeypatch.setattr(config_check, "check_file", _boom)
+    (result,) = config_check.check_configs(root=tmp_path)
+    assert result.ok and result.cached
+
+    path.write_text(_GOOD + "model: not-a-model\n", encoding="utf-8")
+    monkeypatch.undo()
+    (result,) = config_check.check_configs(root=tmp_path)
+    assert not result.cached and "provider" in result.error
+
+
+def test_process_pool_matches_serial(tmp_path):
+    for i in range(config_check._POOL_THRESHOLD + 4):
+        _write(tmp_path, f"1.{i}.0.yaml", _GOOD if i % 3 else "task: sprint\n", project=f"p{i % 2}")
+
+    pooled = config_check.check_configs(root=tmp_path, jobs=2, use_cache=False)
+    serial = config_check.check_configs(root=tmp_path, jobs=1, use_cache=False)
+
+    assert [(r.path, r.error) for r in pooled] == [(r.path, r.error) for r in serial]
+    assert sum(not r.ok for r in pooled) == 7
+
+
+def test_cli_exit_code_and_timings(tmp_path, capsys):
+    _write(tmp_path, "1.0.0.yaml", _GOOD)
+    cli.cli_main(["check-configs", "--root", str(tmp_path), "--timings"])
+    assert "1 configs, 0 failed" in capsys.readouterr().out
+
+    bad = _write(tmp_path, "1.1.0.yaml", "task: sprint\n")
+    with pytest.raises(SystemExit) as exc:
+        cli.cli_main(["check-configs", "--root", str(tmp_path), str(bad)])
+    assert exc.value.code == 1
+    assert str(bad) in capsys.readouterr().out
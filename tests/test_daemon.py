@@ -0,0 +1,128 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""pv serve / pv --via-daemon round trips over a real Unix socket."""
+
+import io
+import os
+import socket
+import stat
+import threading
+
+import pytest
+
+from personalvibe import cli, daemon
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def running_daemon(tmp_path):
+    server = daemon.make_server(tmp_path / "pv.sock")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield tmp_path / "pv.sock"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _forward(argv, path):
+    out, err = io.StringIO(), io.StringIO()
+    rc = daemon.forward(argv, path, stdout=out, stderr=err)
+    return rc, out.getvalue(), err.getvalue()
+
+
+def test_socket_path_resolution(tmp_path, monkeypatch):
+    monkeypatch.setenv("PV_DAEMON_SOCKET", str(tmp_path / "x.sock"))
+    assert daemon.socket_path() == tmp_path / "x.sock"
+
+    monkeypatch.delenv("PV_DAEMON_SOCKET")
+    monkeypatch.setenv("PV_DATA_DIR", str(tmp_path))
+    assert daemon.socket_path() == tmp_path.resolve() / ".personalvibe" / "pv.sock"
+
+    deep = tmp_path / ("d" * 120)
+    monkeypatch.setenv("PV_DATA_DIR", str(deep))
+    assert daemon.socket_path().name.startswith("pv-")  # too long for sun_path → temp dir
+
+
+def test_context_round_trip_uses_client_cwd(running_daemon, tmp_path, monkeypatch):
+    proj = tmp_path / "proj"
+    proj.mkdir()
+    (proj / "a.py").write_text("print('hi')\n", encoding="utf-8")
+    (proj / "ctx.txt").write_text("a.py\n", encoding="utf-8")
+    monkeypatch.chdir(proj)
+
+    rc, out, err = _forward(["context", "ctx.txt"], running_daemon)
+
+    assert rc == 0, err
+    assert "#### Start of a.py" in out and "print('hi')" in out
+
+
+def test_exit_codes_and_stderr_are_relayed(running_daemon):
+    rc, _, err = _forward(["parse-stage"], running_daemon)  # missing --project_name
+    assert rc == 2
+    assert "--project_name" in err
+
+    rc, _, err = _forward(["warm-cache"], running_daemon)
+    assert rc == 2
+    assert "unsupported command" in err
+
+
+def test_second_daemon_refused_and_stale_socket_replaced(running_daemon, tmp_path):
+    with pytest.raises(RuntimeError, match="already listening"):
+        daemon.make_server(running_daemon)
+
+    stale = tmp_path / "stale.sock"
+    stale.write_text("")
+    server = daemon.make_server(stale)
+    server.server_close()
+
+
+def test_via_daemon_falls_back_in_process(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("PV_DAEMON_SOCKET", str(tmp_path / "none.sock"))
+    (tmp_path / "a.md").write_text("# notes\n", encoding="utf-8")
+    (tmp_path / "ctx.txt").write_text("a.md\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+
+    assert daemon.forward(["context", "ctx.txt"]) is None
+    cli.cli_main(["--via-daemon", "context", "ctx.txt"])
+
+    captured = capsys.readouterr()
+    assert "running in-process" in captured.err
+    assert "# notes" in captured.out
+
+
+def test_client_dotenv_reaches_the_handler(running_daemon, tmp_path, monkeypatch):
+    proj = tmp_path / "proj"
+    proj.mkdir()
+    (proj / ".env").write_text("PV_TEST_CLIENT_KEY=from-dotenv\nPV_TEST_SHADOWED=from-dotenv\n", encoding="utf-8")
+    (proj / "ctx.txt").write_text("", encoding="utf-8")
+    monkeypatch.chdir(proj)
+    monkeypatch.delenv("PV_TEST_CLIENT_KEY", raising=False)
+    monkeypatch.setenv("PV_TEST_SHADOWED", "from-shell")
+    seen = {}
+
+    def _fake_context(ns):
+        seen.update({k: os.environ.get(k) for k in ("PV_TEST_CLIENT_KEY", "PV_TEST_SHADOWED")})
+
+    monkeypatch.setattr(cli, "_cmd_context", _fake_context)
+    rc, _, err = _forward(["context", "ctx.txt"], running_daemon)
+
+    assert rc == 0, err
+    assert seen == {"PV_TEST_CLIENT_KEY": "from-dotenv", "PV_TEST_SHADOWED": "from-shell"}
+    assert "PV_TEST_CLIENT_KEY" not in os.environ  # the daemon's own env is restored
+
+
+def test_socket_is_private(running_daemon):
+    assert stat.S_IMODE(os.stat(running_daemon).st_mode) == 0o600
+
+
+def test_parse_stage_run_uses_a_child_process(monkeypatch):
+    monkeypatch.setattr(cli, "_cmd_parse_stage", lambda ns: pytest.fail("stage script ran inside the daemon"))
+    out, err = io.StringIO(), io.StringIO()
+
+    rc = daemon._dispatch(["parse-stage", "--project_name", "pv-no-such-project", "--run"], out, err)
+
+    assert rc != 0
+    assert "pv-no-such-project" in out.getvalue() + err.getvalue()
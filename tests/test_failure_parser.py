@@ -0,0 +1,87 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Structured failure extraction for compact bugfix prompts."""
+
+from types import SimpleNamespace
+
+from personalvibe import failure_parser, vibe_utils
+
+_PYTEST = """\
+============================= test session starts ==============================
+collected 3 items
+
+tests/test_x.py F.                                                       [100%]
+
+=================================== FAILURES ===================================
+__________________________________ test_add ___________________________________
+
+    def test_add():
+>       assert add(1, 1) == 3
+E       assert 2 == 3
+E        +  where 2 = add(1, 1)
+
+tests/test_x.py:7: AssertionError
+----------------------------- Captured stdout call -----------------------------
+noise that should not be kept
+=========================== short test summary info ============================
+FAILED tests/test_x.py::test_add - assert 2 == 3
+FAILED tests/test_y.py::TestK::test_z - KeyError: 'k'
+========================= 2 failed, 1 passed in 0.12s ==========================
+"""
+
+_LINT = """\
+src/pkg/mod.py:12: error: Incompatible return value type (got "int", expected "str")  [return-value]
+Found 1 error in 1 file (checked 3 source files)
+src/pkg/mod.py:3:1: F401 'os' imported but unused
+"""
+
+
+def test_parses_pytest_mypy_flake8():
+    failures = failure_parser.parse_failures(_PYTEST + _LINT)
+    assert [f.tool for f in failures] == ["pytest", "pytest", "mypy", "flake8"]
+
+    add = failures[0]
+    assert add.test_id == "tests/test_x.py::test_add"
+    assert add.location == "tests/test_x.py:7"
+    assert add.message.startswith("assert 2 == 3")
+    assert add.traceback[0].startswith(">       assert add(1, 1) == 3")
+    assert failures[1].test_id == "tests/test_y.py::TestK::test_z"
+    assert failures[1].message == "KeyError: 'k'"
+    assert failures[2].location == "src/pkg/mod.py:12" and failures[2].message.endswith("[return-value]")
+    assert failures[3].message == "F401 'os' imported but unused"
+
+
+def test_duplicates_are_counted_and_cap_applies():
+    failures = failure_parser.parse_failures(_PYTEST * 2)  # e.g. nox on two interpreters
+    assert len(failures) == 2 and failures[0].count == 2
+    assert "×2" in failures[0].render()
+
+    capped = failure_parser.format_failures(failures, token_cap=1)
+    assert "test_add" in capped and "1 more failure(s) omitted" in capped
+    assert "noise" not in capped
+
+
+def test_unparseable_text_falls_back_to_tail():
+    text = "\n".join(f"line {i}" for i in range(5000))
+    out = failure_parser.compact_error_text(text, token_cap=50)
+    assert out.startswith("… (truncated)") and out.endswith("line 4999")
+    assert len(out) < 300
+
+
+def test_bugfix_replacements_embed_failures(tmp_path, monkeypatch):
+    monkeypatch.setattr(vibe_utils, "get_base_path", lambda: tmp_path)
+    errors = tmp_path / "prompts" / "demo" / "errors"
+    errors.mkdir(parents=True)
+    (errors / "nox.log").write_text(_PYTEST * 3 + "x" * 100_000, encoding="utf-8")
+    cfg = SimpleNamespace(
+        project_name="demo",
+        version="1.0.1",
+        task="bugfix",
+        user_instructions="",
+        error_file_name="nox.log",
+        error_token_cap=4000,
+    )
+    rep = vibe_utils.get_replacements(cfg, "")
+    assert "<error_details>" in rep["task_instructions"]
+    assert "[pytest] tests/test_x.py::test_add (tests/test_x.py:7) ×3" in rep["task_instructions"]
+    assert "xxxx" not in rep["task_instructions"]
@@ -0,0 +1,35 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Startup budget: importing the CLI must not drag in the heavy stack."""
+
+import os
+import subprocess
+import sys
+
+HEAVY = ("litellm", "tiktoken", "jinja2", "pydantic", "pathspec", "dotenv", "_pytest")
+BUDGET_MS = float(os.getenv("PV_IMPORT_BUDGET_MS", "500"))
+
+_SNIPPET = f"import sys, personalvibe.cli; print([m for m in {HEAVY!r} if m in sys.modules])"
+
+
+def _cumulative_ms(importtime_stderr: str, module: str) -> float:
+    for line in importtime_stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise AssertionError(f"{module} missing from -X importtime output")
+
+
+def test_cli_import_is_light():
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SNIPPET], text=True, capture_output=True, check=True
+    )
+    assert res.stdout.strip() == "[]", f"heavy modules imported at startup: {res.stdout}"
+    took = _cumulative_ms(res.stderr, "personalvibe.cli")
+    assert took < BUDGET_MS, f"import personalvibe.cli took {took:.0f} ms (budget {BUDGET_MS:.0f} ms)"
+
+
+def test_help_works_without_heavy_imports():
+    res = subprocess.run([sys.executable, "-m", "personalvibe.cli", "--help"], text=True, capture_output=True)
+    assert res.returncode == 0
+    assert "prepare-sprint" in res.stdout
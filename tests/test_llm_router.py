@@ -2,6 +2,9 @@
 
 """Unit-tests for the LiteLLM shim."""
 
+import os
+import subprocess
+import sys
 from types import SimpleNamespace
 
 import pytest
@@ -46,3 +49,41 @@ def test_chat_completion_custom_model(monkeypatch):
 def test_chat_completion_invalid_model():
     with pytest.raises(ValueError):
         llm_router.chat_completion(model="badmodel", messages=[{"role": "user", "content": "hey"}])
+
+
+_LAZY_SNIPPET = """
+import sys
+from personalvibe import llm_router
+assert "litellm" not in sys.modules, "imported at module load"
+llm_router.MyCustomLLM.completion = lambda self, model, messages, **kw: {"ok": model}
+llm_router.chat_completion(model="sharp_boe/x", messages=[{"role": "user", "content": "hi"}])
+print("litellm" in sys.modules)
+"""
+
+
+def test_litellm_not_imported_for_custom_provider(monkeypatch):
+    monkeypatch.setenv("SHARP_USER_NAME", "n")
+    monkeypatch.setenv("SHARP_USER_SECRET", "s")
+    res = subprocess.run([sys.executable, "-c", _LAZY_SNIPPET], text=True, capture_output=True)
+    assert res.returncode == 0, res.stderr
+    assert res.stdout.strip() == "False"
+
+
+def test_get_litellm_forces_local_cost_map(monkeypatch):
+    monkeypatch.delenv("LITELLM_LOCAL_MODEL_COST_MAP", raising=False)
+    monkeypatch.setattr(llm_router, "_litellm", None)
+    mod = llm_router._get_litellm()
+    assert os.environ["LITELLM_LOCAL_MODEL_COST_MAP"] == "True"
+    assert mod is sys.modules["litellm"]
+    assert llm_router._get_litellm() is mod  # cached
+
+
+@pytest.mark.advanced
+def test_litellm_init_benchmark():
+    """Cold LiteLLM initialisation (fresh interpreter) stays within budget."""
+    budget_s = float(os.getenv("PV_LITELLM_INIT_BUDGET_S", "15"))
+    snippet = "from personalvibe import llm_router; llm_router._get_litellm(); print(llm_router._litellm_init_s)"
+    res = subprocess.run([sys.executable, "-c", snippet], text=True, capture_output=True, check=True)
+    took = float(res.stdout.strip().splitlines()[-1])
+    print(f"LiteLLM cold init: {took:.2f}s")
+    assert took < budget_s
@@ -0,0 +1,60 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Tail-seeking reads of the last BEGIN-STAMP session."""
+
+from personalvibe import cli, log_reader, logger
+
+
+def _session(path, body):
+    log_reader.write_begin_stamp(path)
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write(body)
+
+
+def test_configure_logging_indexes_stamps(tmp_path):
+    logger.reset_logging()
+    logger.configure_logging("none", color=False, run_id="1.0.0_base", log_dir=tmp_path)
+    logger.reset_logging()
+    log_path = tmp_path / "1.0.0_base.log"
+    offsets = log_reader.index_path(log_path).read_text().split()
+    assert offsets == [str(len("RUN_ID=1.0.0_base\n"))]
+    assert log_reader.read_last_session(log_path).startswith("BEGIN-STAMP ")
+
+
+def test_last_session_only(tmp_path):
+    log_path = tmp_path / "0.1.0_base.log"
+    log_path.write_text("RUN_ID=0.1.0_base\n", encoding="utf-8")
+    _session(log_path, "old failure\n" * 1000)
+    _session(log_path, "new failure\n")
+
+    text = log_reader.read_last_session(log_path)
+    assert text.startswith("BEGIN-STAMP ") and text.endswith("new failure\n")
+    assert "old failure" not in text
+
+
+def test_backward_scan_without_or_with_stale_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_reader, "_BLOCK", 7)  # force stamps to straddle blocks
+    log_path = tmp_path / "x_base.log"
+    _session(log_path, "first\n")
+    _session(log_path, "second\n")
+    log_reader.index_path(log_path).unlink()
+    assert log_reader.read_last_session(log_path).endswith("\nsecond\n")
+
+    log_reader.index_path(log_path).write_text("3\n")  # points into the middle of a line
+    assert log_reader.read_last_session(log_path).endswith("\nsecond\n")
+
+    plain = tmp_path / "plain.log"
+    plain.write_text("no stamps here\n", encoding="utf-8")
+    assert log_reader.read_last_session(plain) == "no stamps here\n"
+
+
+def test_cli_logs_last_session(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(cli.vibe_utils, "get_workspace_root", lambda: tmp_path)
+    (tmp_path / "logs").mkdir()
+    log_path = tmp_path / "logs" / "2.0.0_base.log"
+    _session(log_path, "before\n")
+    _session(log_path, "after\n")
+
+    cli.cli_main(["logs", "--last-session"])
+    out = capsys.readouterr().out
+    assert "after" in out and "before" not in out
@@ -0,0 +1,41 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""In-process tee: console + log file, child processes, backpressure."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+from personalvibe import log_tee
+
+_CHILD = "import sys; print('child out', flush=True); print('child err', file=sys.stderr)"
+
+
+def test_tee_output_captures_parent_and_child(tmp_path: Path, capfd):
+    log_file = tmp_path / "logs" / "1.2.3_base.log"
+    with log_tee.tee_output(log_file):
+        print("parent says hi")
+        subprocess.run([sys.executable, "-c", _CHILD], check=True)
+    with log_tee.tee_output(log_file):
+        print("second time")
+
+    content = log_file.read_text(encoding="utf-8")
+    assert content.index("parent says hi") < content.index("child out") < content.index("child err")
+    assert content.endswith("second time\n")  # appended, not truncated
+    assert "child err" in capfd.readouterr().out  # still echoed to the console
+
+
+def test_run_teed_returns_rc_and_streams(tmp_path: Path, capfd):
+    log_file = tmp_path / "run.log"
+    rc = log_tee.run_teed([sys.executable, "-c", _CHILD + "; sys.exit(3)"], log_file)
+    assert rc == 3
+    assert "child out" in log_file.read_text(encoding="utf-8")
+    assert "child err" in capfd.readouterr().out
+
+
+def test_run_teed_bounded_queue_handles_large_output(tmp_path: Path):
+    log_file = tmp_path / "big.log"
+    big = "import sys; sys.stdout.write('x' * 2_000_000)"
+    rc = log_tee.run_teed([sys.executable, "-c", big], log_file, console=False, max_chunks=1)
+    assert rc == 0
+    assert log_file.stat().st_size == 2_000_000
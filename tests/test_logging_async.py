@@ -0,0 +1,58 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Queue-based logging, gzip rotation and the non-mutating ColorFormatter."""
+
+import gzip
+import logging
+import logging.handlers
+
+from personalvibe import logger
+
+
+def test_color_formatter_leaves_record_untouched():
+    fmt = logger.ColorFormatter(fmt="%(levelname)s | %(message)s")
+    record = logging.LogRecord("x", logging.WARNING, __file__, 1, "hello", None, None)
+    assert fmt.format(record) == "\033[93mWARNING\033[0m | hello"
+    assert record.levelname == "WARNING"
+    assert logging.Formatter("%(levelname)s | %(message)s").format(record) == "WARNING | hello"
+
+
+def test_async_logging_flushes_on_stop(tmp_path):
+    logger.reset_logging()
+    logger.configure_logging("none", run_id="1.0.0_base", log_dir=tmp_path, async_logging=True)
+    assert isinstance(logging.root.handlers[0], logging.handlers.QueueHandler)
+    logging.getLogger("pv.test").warning("queued line")
+    logger.reset_logging()  # stops the listener → queue drained
+
+    text = (tmp_path / "1.0.0_base.log").read_text(encoding="utf-8")
+    assert "| WARNING | pv.test | queued line" in text
+    assert "\033[" not in text
+
+
+def test_atexit_hook_registered_once(tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr(logger.atexit, "register", registered.append)
+    monkeypatch.setattr(logger, "_atexit_registered", False)
+    try:
+        for i in range(3):
+            logger.reset_logging()
+            logger.configure_logging("none", run_id=f"1.0.{i}", log_dir=tmp_path, async_logging=True)
+    finally:
+        logger.reset_logging()
+    assert registered == [logger.stop_listener]
+
+
+def test_rotation_gzips_old_segments(tmp_path, monkeypatch):
+    monkeypatch.setenv("PV_LOG_MAX_BYTES", "300")
+    monkeypatch.setenv("PV_LOG_BACKUPS", "2")
+    logger.reset_logging()
+    logger.configure_logging("errors", color=False, run_id="2.0.0_base", log_dir=tmp_path)
+    for i in range(20):
+        logging.getLogger("pv.test").error("line %02d %s", i, "x" * 40)
+    logger.reset_logging()
+
+    segments = sorted(p.name for p in tmp_path.iterdir())
+    assert segments == ["2.0.0_base.log", "2.0.0_base.log.1.gz", "2.0.0_base.log.2.gz"]
+    assert (tmp_path / "2.0.0_base.log").stat().st_size <= 300
+    with gzip.open(tmp_path / "2.0.0_base.log.1.gz", "rt", encoding="utf-8") as fh:
+        assert "line" in fh.read()
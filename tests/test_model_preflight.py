@@ -0,0 +1,70 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Model registry overrides + get_vibed pre-flight (reject / trim / size)."""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from personalvibe import llm_router, model_registry, vibe_utils
+
+
+def _write_models(workspace: Path, body: str) -> None:
+    cfg = workspace / ".personalvibe" / "models.yaml"
+    cfg.parent.mkdir(parents=True, exist_ok=True)
+    cfg.write_text(body, encoding="utf-8")
+
+
+@pytest.fixture()
+def fake_llm(monkeypatch):
+    captured = SimpleNamespace(kwargs=None)
+
+    def _fake_chat_completion(**kw):
+        captured.kwargs = kw
+        return {"choices": [{"message": {"content": "ok"}}]}
+
+    monkeypatch.setattr(llm_router, "chat_completion", _fake_chat_completion)
+    monkeypatch.setattr(vibe_utils, "num_tokens", lambda text: len(text.split()))
+    return captured
+
+
+def test_local_override_merges_builtin(tmp_path):
+    _write_models(tmp_path, "tiny/model:\n  context_window: 100\n  max_output_tokens: 10\n")
+    reg = model_registry.load_registry(tmp_path)
+    assert reg["tiny/model"].context_window == 100
+    assert "openai/o3" in reg
+
+
+def test_size_max_tokens_clamps_and_rejects():
+    info = model_registry.ModelInfo(context_window=10_000, max_output_tokens=4_000)
+    assert model_registry.size_max_tokens(info, 1_000, 20_000) == 4_000
+    assert model_registry.size_max_tokens(info, 7_500, 20_000) == 2_500
+    with pytest.raises(model_registry.ContextWindowError):
+        model_registry.size_max_tokens(info, 9_500, 20_000)
+
+
+def test_get_vibed_rejects_before_sending(tmp_path, fake_llm):
+    _write_models(tmp_path, "tiny/model:\n  context_window: 5\n  max_output_tokens: 5\n")
+    with pytest.raises(model_registry.ContextWindowError):
+        vibe_utils.get_vibed("one two three four five six", project_name="demo", model="tiny/model", workspace=tmp_path)
+    assert fake_llm.kwargs is None
+
+
+def test_get_vibed_trims_history_and_sizes(tmp_path, fake_llm):
+    _write_models(tmp_path, "tiny/model:\n  context_window: 2000\n  max_output_tokens: 1500\n")
+    old = tmp_path / "data" / "prompt_outputs" / "old.md"
+    old.parent.mkdir(parents=True)
+    old.write_text("word " * 1500, encoding="utf-8")
+
+    vibe_utils.get_vibed(
+        "short prompt",
+        contexts=[old],
+        project_name="demo",
+        model="tiny/model",
+        max_completion_tokens=20_000,
+        workspace=tmp_path,
+    )
+
+    assert len(fake_llm.kwargs["messages"]) == 1
+    assert fake_llm.kwargs["max_tokens"] == 1500
@@ -0,0 +1,53 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Model routing: explicit wins, rules by size / latency, local overrides."""
+
+import logging
+
+from personalvibe import model_routing
+from personalvibe.model_routing import RouteRule
+from personalvibe.task_config import TaskManager
+
+_RULES = [
+    RouteRule(model="fast/mini", max_prompt_tokens=1000, expected_latency_s=5),
+    RouteRule(model="slow/big", expected_latency_s=60),
+]
+
+
+def test_explicit_model_always_wins():
+    assert model_routing.choose_model("naked", 10, explicit="x/y", task_rules=_RULES) == "x/y"
+
+
+def test_rules_by_prompt_size():
+    assert model_routing.choose_model("naked", 500, task_rules=_RULES) == "fast/mini"
+    assert model_routing.choose_model("naked", 5000, task_rules=_RULES) == "slow/big"
+
+
+def test_latency_target_filters_rules():
+    assert model_routing.choose_model("naked", 5000, latency_target_s=10, task_rules=_RULES) == "openai/o3"
+
+
+def test_local_routing_file_overrides_task_rules(tmp_path, caplog):
+    cfg = tmp_path / ".personalvibe" / "routing.yaml"
+    cfg.parent.mkdir()
+    cfg.write_text("sprint:\n  - model: local/model\n", encoding="utf-8")
+
+    with caplog.at_level(logging.INFO, logger="personalvibe.model_routing"):
+        chosen = model_routing.choose_model("sprint", 123, task_rules=_RULES, workspace=tmp_path)
+
+    assert chosen == "local/model"
+    assert "Routing decision" in caplog.text
+
+
+def test_local_default_only_applies_to_tasks_without_rules(tmp_path):
+    cfg = tmp_path / ".personalvibe" / "routing.yaml"
+    cfg.parent.mkdir()
+    cfg.write_text("default:\n  - model: local/model\n", encoding="utf-8")
+
+    assert model_routing.choose_model("sprint", 123, task_rules=_RULES, workspace=tmp_path) == "fast/mini"
+    assert model_routing.choose_model("sprint", 123, workspace=tmp_path) == "local/model"
+
+
+def test_bundled_naked_task_has_routing():
+    cfg = TaskManager().load_task_config("naked")
+    assert cfg.routing and cfg.routing[-1].model == "openai/o3"
@@ -0,0 +1,89 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""personalvibe.Pipeline – render / run / arun with shared warm state."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import personalvibe
+from personalvibe import vibe_utils
+from personalvibe.run_pipeline import ConfigModel
+
+
+def _config(**overrides):
+    data = dict(version="1.0.0", project_name="demo", task="naked", project_context_paths=[], user_instructions="hi")
+    data.update(overrides)
+    return ConfigModel(**data)
+
+
+def test_render_reuses_compiled_templates(tmp_path):
+    pipe = personalvibe.Pipeline(tmp_path)
+    first = pipe.render(_config(user_instructions="make it fast"))
+    master = pipe.master_template
+
+    assert "make it fast" in first
+    assert pipe.render(_config(user_instructions="make it fast")) == first
+    assert pipe.master_template is master
+
+
+def test_run_prompt_only_writes_into_workspace(tmp_path):
+    pipe = personalvibe.Pipeline(tmp_path)
+    path = pipe.run(_config(), prompt_only=True)
+
+    saved = list((tmp_path / "data" / "demo" / "prompt_inputs").glob("*.md"))
+    assert saved == [path]
+    assert path.read_text(encoding="utf-8") == pipe.render(_config()) + "\n### END PROMPT\n"
+
+
+def test_run_and_arun_call_the_llm(tmp_path, monkeypatch):
+    calls = []
+
+    def _fake_get_vibed(prompt, **kw):
+        calls.append(kw)
+        return "reply"
+
+    monkeypatch.setattr(vibe_utils, "get_vibed", _fake_get_vibed)
+    pipe = personalvibe.Pipeline(tmp_path)
+    cfg = _config(model="openai/gpt-4o-mini")
+
+    assert pipe.run(cfg, max_tokens=123) == "reply"
+    assert asyncio.run(pipe.arun(cfg)) == "reply"
+    assert calls[0]["model"] == "openai/gpt-4o-mini"
+    assert calls[0]["max_completion_tokens"] == 123
+    assert calls[0]["workspace"] == tmp_path.resolve()
+    assert calls[0]["saved"].path.exists() and calls[0]["saved"].tokens > 0
+
+
+def test_one_instance_serves_many_threads(tmp_path):
+    pipe = personalvibe.Pipeline(tmp_path)
+    configs = [_config(user_instructions=f"req-{i}") for i in range(64)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        prompts = list(pool.map(pipe.render, configs))
+
+    assert all(f"req-{i}" in p for i, p in enumerate(prompts))
+
+
+def test_variables_are_computed_only_when_referenced(tmp_path, monkeypatch):
+    reads = []
+    monkeypatch.setattr(vibe_utils, "_get_milestone_text", lambda cfg: reads.append(cfg.task) or "MILESTONE")
+    pipe = personalvibe.Pipeline(tmp_path)
+
+    assert "MILESTONE" not in pipe.render(_config(task="naked"))
+    assert reads == []  # naked.yaml never mentions milestone_text
+    assert "MILESTONE" in pipe.render(_config(task="sprint"))
+    assert reads == ["sprint"]
+
+
+def test_lazy_replacements_memoize_per_run(monkeypatch):
+    calls = []
+    monkeypatch.setattr(vibe_utils, "get_context", lambda paths: calls.append(paths) or "CTX")
+    lazy = vibe_utils.lazy_replacements(_config(task="naked"))
+
+    assert lazy.computed() == []
+    assert lazy["project_context"] == "CTX"
+    assert lazy.select(["project_context", "project_name", "unknown"]) == {
+        "project_context": "CTX",
+        "project_name": "demo",
+    }
+    assert calls == [[]]
@@ -0,0 +1,47 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""`--profile` wrapper: .prof next to the run log, hotspots, peak memory."""
+
+import io
+import pstats
+
+import pytest
+
+from personalvibe import cli, profiling
+
+
+def _work(n):
+    return sum(i * i for i in range(n))
+
+
+def test_run_profiled_writes_stats_and_report(tmp_path):
+    out = profiling.profile_path(tmp_path / "logs", "1.0.0_base")
+    buf = io.StringIO()
+    assert profiling.run_profiled(_work, 1000, out=out, top=5, memory=True, stream=buf) == _work(1000)
+
+    assert out.parent == tmp_path / "logs" and out.name.startswith("1.0.0_base.")
+    assert "_work" in str(pstats.Stats(str(out)).stats)
+    report = buf.getvalue()
+    assert "cumulative" in report and "Peak traced memory" in report and str(out) in report
+
+
+def test_profile_written_even_on_exit(tmp_path):
+    out = tmp_path / "x.prof"
+
+    def _fail():
+        raise SystemExit(2)
+
+    with pytest.raises(SystemExit):
+        profiling.run_profiled(_fail, out=out, stream=io.StringIO())
+    assert out.exists()
+
+
+def test_cli_profile_flag_on_subcommand(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(cli.vibe_utils, "get_workspace_root", lambda: tmp_path)
+    (tmp_path / "logs").mkdir()
+    (tmp_path / "logs" / "1.0.0_base.log").write_text("BEGIN-STAMP x\nhello\n", encoding="utf-8")
+
+    cli.cli_main(["logs", "--profile", "--profile-top", "3"])
+
+    assert "hello" in capsys.readouterr().out
+    assert len(list((tmp_path / "logs").glob("logs.*.prof"))) == 1
@@ -0,0 +1,153 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Change-aware quality-gate: import graph, test selection and check plan."""
+
+import subprocess
+import sys
+
+import pytest
+
+from personalvibe import cli, quality_gate
+
+
+def _git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture()
+def repo(tmp_path, monkeypatch):
+    monkeypatch.setenv("GIT_AUTHOR_NAME", "t")
+    monkeypatch.setenv("GIT_AUTHOR_EMAIL", "t@example.com")
+    monkeypatch.setenv("GIT_COMMITTER_NAME", "t")
+    monkeypatch.setenv("GIT_COMMITTER_EMAIL", "t@example.com")
+    files = {
+        "pyproject.toml": "[tool.poetry]\n",
+        "src/personalvibe/__init__.py": "",
+        "src/personalvibe/a.py": "X = 1\n",
+        "src/personalvibe/b.py": "from personalvibe import a\n",
+        "src/personalvibe/c.py": "from .b import *\n",
+        "src/personalvibe/d.py": "Y = 2\n",
+        "tests/test_a.py": "from personalvibe.a import X\n",
+        "tests/test_c.py": "import personalvibe.c\n",
+        "tests/test_d.py": "from personalvibe import d\n",
+    }
+    for rel, body in files.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(body)
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    return tmp_path
+
+
+def test_changed_module_selects_transitive_importers(repo):
+    (repo / "src/personalvibe/a.py").write_text("X = 2\n")
+    plan = quality_gate.plan_changed(repo)
+
+    assert plan.changed == ["src/personalvibe/a.py"]
+    assert plan.tests == ["tests/test_a.py", "tests/test_c.py"]
+    names = [c.name for c in plan.checks]
+    assert names == ["black", "flake8", "mypy", "pytest"]
+    assert plan.checks[0].cmd[-1] == "src/personalvibe/a.py"
+
+
+def test_packaging_change_adds_smoke_dist(repo):
+    (repo / "pyproject.toml").write_text("[tool.poetry]\nname = 'x'\n")
+    plan = quality_gate.plan_changed(repo)
+    assert [c.name for c in plan.checks] == ["smoke_dist"]
+
+
+def test_import_graph_cache_reused(repo, monkeypatch):
+    quality_gate.build_import_graph(repo)
+    assert (repo / ".personalvibe" / "cache" / "import_graph.json").exists()
+
+    parsed = []
+    real = quality_gate._imports_of
+    monkeypatch.setattr(quality_gate, "_imports_of", lambda p, m: parsed.append(p) or real(p, m))
+    (repo / "src/personalvibe/d.py").write_text("Y = 3  # edited\n")
+    graph = quality_gate.build_import_graph(repo)
+
+    assert [p.name for p in parsed] == ["d.py"]
+    assert "personalvibe.a" in graph["src/personalvibe/b.py"]
+
+
+def test_cli_validate_dry_run(repo, monkeypatch, capsys):
+    monkeypatch.chdir(repo)
+    (repo / "tests/test_d.py").write_text("from personalvibe import d  # touched\n")
+    cli.cli_main(["validate", "--changed", "--dry-run"])
+    out = capsys.readouterr().out
+    assert "pytest: " in out and "tests/test_d.py" in out
+    assert "mypy" not in out
+
+
+def test_parallel_runner_caches_passing_files(repo):
+    py = "import sys; sys.exit(1 if 'bad' in open(sys.argv[-1]).read() else 0)"
+    files = ["src/personalvibe/a.py", "src/personalvibe/d.py"]
+    checks = [quality_gate.Check("flake8", [sys.executable, "-c", py, f], files=[f]) for f in files[:1]]
+    plan = quality_gate.GatePlan(checks=checks + [quality_gate.Check("pytest", [sys.executable, "-c", "print('ok')"])])
+
+    first = quality_gate.run_parallel(plan, repo, jobs=2)
+    assert [r.passed for r in first] == [True, True]
+    assert first[1].output.strip() == "ok"
+
+    again = quality_gate.run_parallel(plan, repo, jobs=2)
+    assert again[0].skipped_files == 1 and again[0].duration_s == 0.0
+
+    (repo / files[0]).write_text("bad = 1\n")
+    third = quality_gate.run_parallel(plan, repo, jobs=2)
+    assert third[0].returncode == 1 and third[0].skipped_files == 0
+    report = quality_gate.format_report(third)
+    assert "rc=1" in report and "── flake8" in report
+
+
+def test_plan_all_mirrors_nox_sessions(repo):
+    plan = quality_gate.plan_all(repo)
+    assert [c.name for c in plan.checks] == ["black", "flake8", "mypy", "pytest"]
+    assert "tests/test_a.py" in plan.checks[0].files
+    assert plan.checks[2].cmd[-2:] == ["-p", "personalvibe"]
+
+
+def test_failed_lint_only_caches_files_proven_clean(repo):
+    files = ["src/personalvibe/a.py", "src/personalvibe/d.py"]
+    missing = quality_gate.Check("black", [sys.executable, "-m", "no_such_linter", *files], files=files)
+    plan = quality_gate.GatePlan(checks=[missing])
+
+    first = quality_gate.run_parallel(plan, repo, jobs=1)
+    assert first[0].returncode == 1 and "No module named" in first[0].output
+    again = quality_gate.run_parallel(plan, repo, jobs=1)
+    assert again[0].skipped_files == 0  # a missing tool is no proof of anything
+
+    flags_a = "print('src/personalvibe/a.py:1:1: E999 boom')"
+    flake8 = quality_gate.Check(
+        "flake8", [sys.executable, "-c", flags_a + "; raise SystemExit(1)", *files], files=files
+    )
+    quality_gate.run_parallel(quality_gate.GatePlan(checks=[flake8]), repo, jobs=1)
+    cache = quality_gate.LintCache(repo)
+    assert cache.stale("flake8", files) == ["src/personalvibe/a.py"]
+
+    crash = "print('src/personalvibe/a.py:1:1: E999 boom'); print('Traceback (most recent call last):')"
+    flake8 = quality_gate.Check("flake8", [sys.executable, "-c", crash + "; raise SystemExit(1)", *files], files=files)
+    (repo / files[1]).write_text("Y = 3\n")
+    quality_gate.run_parallel(quality_gate.GatePlan(checks=[flake8]), repo, jobs=1)
+    assert quality_gate.LintCache(repo).stale("flake8", files) == files
+
+
+def test_tools_come_from_the_project_venv(repo):
+    venv_python = repo / ".venv" / "bin" / "python"
+    venv_python.parent.mkdir(parents=True)
+    venv_python.symlink_to(sys.executable)
+
+    plan = quality_gate.plan_all(repo)
+    assert all(c.cmd[:3] == [str(venv_python), "-m", c.name] for c in plan.checks)
+
+    with pytest.raises(RuntimeError, match="no_such_tool.*project environment"):
+        quality_gate._tool_commands(repo, ["black", "no_such_tool"])
+
+
+def test_missing_tool_fails_clearly(repo, monkeypatch):
+    monkeypatch.setattr(
+        quality_gate.shutil, "which", lambda name: None if name in ("mypy", "poetry") else f"/bin/{name}"
+    )
+    with pytest.raises(RuntimeError, match="mypy not found in PATH"):
+        quality_gate.plan_all(repo)
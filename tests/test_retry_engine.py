@@ -5,11 +5,19 @@
 from __future__ import annotations
 
 import builtins
+import threading
 from types import SimpleNamespace
 
 import pytest
 
-from personalvibe.retry_engine import RetryError, run_with_retries
+from personalvibe import retry_engine
+from personalvibe.retry_engine import (
+    ExponentialBackoff,
+    FixedBackoff,
+    RetryAfterBackoff,
+    RetryError,
+    run_with_retries,
+)
 
 
 def test_success_first_try():
@@ -51,3 +59,128 @@ def test_permanent_failure_triggers_rollback(monkeypatch):
         run_with_retries(_always_false, max_retries=2, branch_name="vibed/0.0.1")
 
     assert recorded.called == "vibed/0.0.1"
+
+
+# ---------------------------------------------------------------- backoff & classes
+
+
+class _RateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__("429")
+        self.status_code = 429
+        self.response = SimpleNamespace(headers={"Retry-After": str(retry_after)})
+
+
+@pytest.fixture()
+def fake_time(monkeypatch):
+    clock = SimpleNamespace(now=0.0, slept=[])
+
+    def _sleep(seconds):
+        clock.slept.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(retry_engine, "_sleep", _sleep)
+    monkeypatch.setattr(retry_engine, "_clock", lambda: clock.now)
+    return clock
+
+
+def test_exponential_backoff_caps_without_jitter():
+    policy = ExponentialBackoff(base=1, factor=2, cap=5, jitter=False)
+    assert [policy.delay(n, None) for n in (1, 2, 3, 4)] == [1, 2, 4, 5]
+
+
+def test_retry_after_header_honoured(fake_time):
+    errors = iter([_RateLimited(7)])
+
+    def _flaky():
+        err = next(errors, None)
+        if err:
+            raise err
+        return True
+
+    records = []
+    assert run_with_retries(_flaky, backoff=RetryAfterBackoff(), on_attempt=records.append) is True
+    assert fake_time.slept == [7.0]
+    assert [r.outcome for r in records] == ["error", "ok"]
+
+
+def test_fatal_error_not_retried(fake_time):
+    calls = {"n": 0}
+
+    def _broken():
+        calls["n"] += 1
+        raise SyntaxError("generated code is invalid")
+
+    with pytest.raises(RetryError) as info:
+        run_with_retries(_broken, max_retries=5, backoff=FixedBackoff(1))
+    assert calls["n"] == 1
+    assert info.value.attempts[0].outcome == "fatal"
+
+
+def test_http_client_error_is_fatal():
+    err = Exception("unauthorised")
+    err.status_code = 401
+    assert retry_engine.is_retryable(err) is False
+    assert retry_engine.is_retryable(_RateLimited(1)) is True
+
+
+def test_deadline_stops_retries(fake_time):
+    with pytest.raises(RetryError, match="Deadline"):
+        run_with_retries(lambda: False, max_retries=10, backoff=FixedBackoff(4), deadline=10)
+    assert fake_time.slept == [4, 4]
+
+
+def test_attempt_timeout_abandons_slow_attempt():
+    release = threading.Event()
+    seq = iter([True, False])
+
+    def _slow_then_fast():
+        if next(seq):
+            release.wait(5)
+        return True
+
+    records = []
+    try:
+        assert run_with_retries(_slow_then_fast, attempt_timeout=0.05, on_attempt=records.append, side_effect_free=True)
+    finally:
+        release.set()
+    assert [r.outcome for r in records] == ["timeout", "ok"]
+
+
+def test_timed_out_attempt_cannot_write_after_retry_starts(tmp_path):
+    target = tmp_path / "state.txt"
+    seq = iter([1, 2])
+
+    def _write():
+        n = next(seq)
+        if n == 1:
+            while not retry_engine.attempt_cancelled():
+                threading.Event().wait(0.01)
+            threading.Event().wait(0.05)  # still busy after noticing
+            if retry_engine.attempt_cancelled():
+                return False
+        with target.open("a") as fh:
+            fh.write(f"attempt {n}\n")
+        return True
+
+    records = []
+    assert run_with_retries(_write, attempt_timeout=0.05, on_attempt=records.append)
+    assert target.read_text() == "attempt 2\n"
+    assert [r.outcome for r in records] == ["timeout", "ok"]
+
+
+def test_attempt_ignoring_cancellation_stops_retries():
+    release = threading.Event()
+    calls = []
+
+    def _stubborn():
+        calls.append(1)
+        release.wait(5)
+        return True
+
+    try:
+        with pytest.raises(RetryError, match="Fatal AttemptStuck"):
+            run_with_retries(_stubborn, attempt_timeout=0.05, cancel_grace=0.05)
+    finally:
+        release.set()
+    assert calls == [1]  # never a second attempt beside the stuck one
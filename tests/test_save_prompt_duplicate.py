@@ -3,6 +3,8 @@
 
 from pathlib import Path
 
+import pytest
+
 from personalvibe.vibe_utils import get_prompt_hash, save_prompt
 
 
@@ -20,3 +22,34 @@ def test_save_prompt_duplicate(tmp_path: Path):
     # Ensure END-marker present
     content = p1.read_text(encoding="utf-8").splitlines()
     assert content[-1] == "### END PROMPT"
+
+
+def test_save_prompt_stream_hashes_and_counts_incrementally(tmp_path: Path, monkeypatch):
+    from personalvibe import vibe_utils
+
+    monkeypatch.setattr(vibe_utils, "_STREAM_FLUSH_CHARS", 8)  # force several flushes
+    chunks = ["alpha ", "beta ", "gamma " * 5, "ünïcode"]
+    prompt = "".join(chunks)
+
+    saved = vibe_utils.save_prompt_stream(iter(chunks), tmp_path, count_tokens=True)
+
+    assert saved.sha256 == get_prompt_hash(prompt)
+    assert saved.path.name.endswith(f"_{saved.sha256[:10]}.md")
+    assert saved.read() == prompt
+    assert saved.chars == len(prompt) and saved.tokens > 0
+    assert [p.name for p in tmp_path.iterdir()] == [saved.path.name]  # no temp file left behind
+
+    again = vibe_utils.save_prompt_stream(iter(chunks), tmp_path)
+    assert again.duplicate and again.path == saved.path and again.tokens is None
+
+
+def test_save_prompt_stream_cleans_up_on_error(tmp_path: Path):
+    from personalvibe import vibe_utils
+
+    def _chunks():
+        yield "partial"
+        raise RuntimeError("render failed")
+
+    with pytest.raises(RuntimeError):
+        vibe_utils.save_prompt_stream(_chunks(), tmp_path)
+    assert list(tmp_path.iterdir()) == []
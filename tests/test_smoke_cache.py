@@ -0,0 +1,41 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Tests for the smoke_dist venv / wheel cache helpers in noxfile."""
+
+from pathlib import Path
+
+import noxfile  # type: ignore
+
+
+def test_venv_key_tracks_lockfile_and_python(tmp_path: Path):
+    lock = tmp_path / "poetry.lock"
+    lock.write_text("a", encoding="utf-8")
+    key = noxfile._smoke_venv_key("3.12", lock)
+    assert key == noxfile._smoke_venv_key("3.12", lock)
+    assert key != noxfile._smoke_venv_key("3.11", lock)
+    lock.write_text("b", encoding="utf-8")
+    assert key != noxfile._smoke_venv_key("3.12", lock)
+
+
+def test_file_digest_changes_with_content(tmp_path: Path):
+    f = tmp_path / "mod.py"
+    f.write_text("x = 1\n", encoding="utf-8")
+    before = noxfile._file_digest([f])
+    assert before == noxfile._file_digest([f])
+    f.write_text("x = 2\n", encoding="utf-8")
+    assert before != noxfile._file_digest([f])
+
+
+def test_gc_keeps_current_venv_only(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(noxfile.tempfile, "gettempdir", lambda: str(tmp_path / "tmp"))
+    legacy = tmp_path / "tmp" / "pv_smoke_abc"
+    legacy.mkdir(parents=True)
+    root = tmp_path / "pv_smoke"
+    (root / "keep").mkdir(parents=True)
+    (root / "old").mkdir()
+
+    removed = noxfile._gc_smoke_venvs(root, keep="keep")
+
+    assert sorted(p.name for p in removed) == ["old", "pv_smoke_abc"]
+    assert (root / "keep").is_dir()
+    assert not (root / "old").exists() and not legacy.exists()
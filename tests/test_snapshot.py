@@ -0,0 +1,72 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""FileSnapshot: only touched files are backed up and restored."""
+
+import os
+import shutil
+
+import pytest
+
+from personalvibe import parse_stage, vibe_utils
+from personalvibe.snapshot import FileSnapshot, format_report
+
+
+@pytest.fixture()
+def tree(tmp_path):
+    (tmp_path / "keep.txt").write_text("keep")
+    (tmp_path / "edit.txt").write_text("before")
+    (tmp_path / "gone.txt").write_text("doomed")
+    return tmp_path
+
+
+def _mutate(root):
+    (root / "edit.txt").write_text("after")
+    (root / "new" / "sub").mkdir(parents=True)
+    (root / "new" / "sub" / "file.py").write_text("x = 1")
+    os.remove(root / "gone.txt")
+
+
+def test_rollback_on_error_restores_only_touched_files(tree):
+    with pytest.raises(RuntimeError):
+        with FileSnapshot(root=tree) as snap:
+            _mutate(tree)
+            raise RuntimeError("stage script blew up")
+
+    assert snap.rolled_back
+    assert (tree / "edit.txt").read_text() == "before"
+    assert (tree / "gone.txt").read_text() == "doomed"
+    assert not (tree / "new").exists()
+    kinds = {c.path.name: c.kind for c in snap.changes}
+    assert kinds == {"edit.txt": "modified", "file.py": "created", "gone.txt": "deleted"}
+
+
+def test_success_keeps_changes_and_reports(tree):
+    with FileSnapshot(root=tree) as snap:
+        _mutate(tree)
+        (tree / "keep.txt").read_text()  # reads are not tracked
+
+    assert (tree / "edit.txt").read_text() == "after"
+    report = format_report(snap.changes, tree)
+    assert "modified  edit.txt" in report
+    assert "keep.txt" not in report
+
+
+def test_files_outside_root_ignored(tree, tmp_path_factory):
+    outside = tmp_path_factory.mktemp("outside") / "o.txt"
+    with pytest.raises(ValueError):
+        with FileSnapshot(root=tree):
+            outside.write_text("stays")
+            raise ValueError
+    assert outside.read_text() == "stays"
+
+
+def test_run_stage_script_rolls_back(tree, monkeypatch, capsys):
+    monkeypatch.setattr(vibe_utils, "get_base_path", lambda: tree)
+    script = tree / "stage.py"
+    script.write_text(f"open({str(tree / 'edit.txt')!r}, 'w').write('broken')\nraise SystemExit(3)\n")
+
+    with pytest.raises(SystemExit):
+        parse_stage.run_stage_script(script)
+
+    assert (tree / "edit.txt").read_text() == "before"
+    assert "Rolled back files" in capsys.readouterr().out
@@ -0,0 +1,104 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Speculative candidates run in throw-away worktrees; user checkout untouched."""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from personalvibe.retry_engine import RetryError
+from personalvibe.speculative import run_speculative
+
+
+def _git(repo, *args):
+    return subprocess.run(["git", *args], cwd=repo, check=True, text=True, capture_output=True).stdout.strip()
+
+
+@pytest.fixture()
+def repo(tmp_path, monkeypatch):
+    for key, val in {
+        "GIT_AUTHOR_NAME": "t",
+        "GIT_AUTHOR_EMAIL": "t@example.com",
+        "GIT_COMMITTER_NAME": "t",
+        "GIT_COMMITTER_EMAIL": "t@example.com",
+    }.items():
+        monkeypatch.setenv(key, val)
+    root = tmp_path / "repo"
+    root.mkdir()
+    _git(root, "init", "-q")
+    (root / "value.txt").write_text("start\n")
+    (root / "gate.py").write_text("import sys\nsys.exit(0 if open('value.txt').read() == 'good\\n' else 1)\n")
+    _git(root, "add", "-A")
+    _git(root, "commit", "-q", "-m", "init")
+    return root
+
+
+def _candidate(tmp_path, name, content):
+    script = tmp_path / name
+    script.write_text(f"open('value.txt', 'w').write({content!r})\n")
+    return script
+
+
+def test_first_passing_candidate_wins(repo, tmp_path):
+    head = _git(repo, "rev-parse", "HEAD")
+    scripts = [_candidate(tmp_path, "bad.py", "bad\n"), _candidate(tmp_path, "good.py", "good\n")]
+
+    winner = run_speculative(
+        scripts, branch_name="vibed/1.1.0", jobs=2, gate=[sys.executable, "gate.py"], repo=repo, log_dir=tmp_path
+    )
+
+    assert winner.script.name == "good.py"
+    assert _git(repo, "show", "vibed/1.1.0:value.txt") == "good"
+    # user's checkout untouched, no leftover worktrees
+    assert _git(repo, "rev-parse", "HEAD") == head
+    assert (repo / "value.txt").read_text() == "start\n"
+    assert len(_git(repo, "worktree", "list").splitlines()) == 1
+
+
+def test_all_candidates_fail(repo, tmp_path):
+    scripts = [_candidate(tmp_path, "bad.py", "bad\n")]
+    with pytest.raises(RetryError):
+        run_speculative(
+            scripts, branch_name="vibed/1.1.0", gate=[sys.executable, "gate.py"], repo=repo, log_dir=tmp_path
+        )
+    assert "vibed/1.1.0" not in _git(repo, "branch")
+
+
+def test_gate_artefacts_are_not_committed(repo, tmp_path):
+    (repo / "gate_logs.py").write_text(
+        "import os\nos.makedirs('logs', exist_ok=True)\nopen('logs/1.1.0_base.log', 'w')\n"
+    )
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "gate writes logs")
+    scripts = [_candidate(tmp_path, "good.py", "good\n")]
+
+    winner = run_speculative(
+        scripts, branch_name="vibed/1.1.0", gate=[sys.executable, "gate_logs.py"], repo=repo, log_dir=tmp_path
+    )
+
+    files = _git(repo, "ls-tree", "-r", "--name-only", winner.commit).splitlines()
+    assert "value.txt" in files and not any(f.startswith("logs/") for f in files)
+
+
+def test_checked_out_branch_is_refused(repo, tmp_path):
+    current = _git(repo, "symbolic-ref", "--short", "HEAD")
+    with pytest.raises(ValueError, match="checked out"):
+        run_speculative([_candidate(tmp_path, "good.py", "good\n")], branch_name=current, repo=repo, log_dir=tmp_path)
+
+
+def test_raising_gate_stops_the_other_candidates(repo, tmp_path):
+    slow = tmp_path / "slow.py"
+    slow.write_text("import time\ntime.sleep(60)\n")
+    scripts = [_candidate(tmp_path, "good.py", "good\n"), slow]
+    started = time.perf_counter()
+
+    with pytest.raises(FileNotFoundError):
+        run_speculative(
+            scripts, branch_name="vibed/1.1.0", jobs=2, gate=["pv-no-such-gate"], repo=repo, log_dir=tmp_path
+        )
+
+    assert time.perf_counter() - started < 30  # slow.py was killed, not waited for
+    assert len(_git(repo, "worktree", "list").splitlines()) == 1
@@ -0,0 +1,78 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Task registry – user task directories, bulk validation, mtime cache."""
+
+import os
+
+import pytest
+
+from personalvibe import cli
+from personalvibe.task_config import TaskConfigError, TaskManager
+
+_TASK = """task_name: {name}
+task_summary: {summary}
+semver: patch
+task_instructions: |
+  Do {{{{ project_name }}}} things.
+"""
+
+
+def _write_task(directory, name, summary="custom work"):
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.yaml"
+    path.write_text(_TASK.format(name=name, summary=summary), encoding="utf-8")
+    return path
+
+
+def test_project_and_env_dirs_extend_and_override(tmp_path, monkeypatch):
+    _write_task(tmp_path / "ws" / ".personalvibe" / "tasks", "review")
+    extra = tmp_path / "extra"
+    _write_task(extra, "naked", summary="overridden")
+    monkeypatch.setenv("PV_TASK_DIRS", str(extra))
+
+    tasks = TaskManager(tmp_path / "ws")
+    index = tasks.index()
+
+    assert {"bugfix", "sprint", "review", "naked"} <= set(index)
+    assert index["naked"] == extra / "naked.yaml"
+    assert tasks.load_task_config("naked").task_summary == "overridden"
+    assert tasks.load_task_config("review").task_summary == "custom work"
+    with pytest.raises(ValueError, match="Unknown task: nope"):
+        tasks.load_task_config("nope")
+
+
+def test_configs_are_cached_until_the_file_changes(tmp_path):
+    path = _write_task(tmp_path / ".personalvibe" / "tasks", "review")
+    tasks = TaskManager(tmp_path)
+    first = tasks.load_task_config("review")
+
+    assert tasks.load_task_config("review") is first
+
+    path.write_text(_TASK.format(name="review", summary="edited"), encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert tasks.load_task_config("review").task_summary == "edited"
+
+
+def test_preload_reports_every_malformed_file(tmp_path):
+    directory = tmp_path / ".personalvibe" / "tasks"
+    _write_task(directory, "good")
+    (directory / "broken.yaml").write_text("task_name: broken\n", encoding="utf-8")
+    (directory / "misnamed.yaml").write_text(_TASK.format(name="other", summary="x"), encoding="utf-8")
+
+    with pytest.raises(TaskConfigError) as info:
+        TaskManager(tmp_path).preload()
+
+    assert set(info.value.errors) == {directory / "broken.yaml", directory / "misnamed.yaml"}
+    assert "does not match the file name" in info.value.errors[directory / "misnamed.yaml"]
+
+
+def test_pv_tasks_list(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("PV_DATA_DIR", str(tmp_path))
+    _write_task(tmp_path / ".personalvibe" / "tasks", "review")
+
+    cli.cli_main(["tasks", "list"])
+
+    out = capsys.readouterr().out
+    assert "naked" in out and "[builtin]" in out
+    assert "review" in out and "review.yaml]" in out
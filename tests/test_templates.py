@@ -0,0 +1,64 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Shared Jinja environment: memoized templates, bytecode cache, precompiled modules."""
+
+import pytest
+
+from personalvibe import templates
+
+
+@pytest.fixture(autouse=True)
+def _fresh_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("PV_TEMPLATE_CACHE_DIR", str(tmp_path / "bcc"))
+    monkeypatch.setattr(templates, "COMPILED_DIR", tmp_path / "no-compiled")
+    templates.reset()
+    yield
+    templates.reset()
+
+
+def test_templates_are_memoized_by_content():
+    assert templates.get_template() is templates.get_template("master.md")
+
+    first = templates.task_template("demo", "Hello {{ name }}")
+    assert templates.task_template("demo", "Hello {{ name }}") is first
+    changed = templates.task_template("demo", "Bye {{ name }}")
+    assert changed is not first
+    assert changed.render(name="x") == "Bye x"
+
+
+def test_memoized_templates_are_bounded(monkeypatch):
+    monkeypatch.setattr(templates, "MAX_TEMPLATES", 3)
+    kept = templates.task_template("kept", "{{ a }}")
+    for i in range(5):
+        templates.task_template("demo", f"v{i} {{{{ b }}}}")
+        assert templates.task_template("kept", "{{ a }}") is kept  # recently used → survives
+
+    assert len(templates._compiled) == 3
+    assert len(templates._sources) == 3
+    assert templates.template_variables(kept) == {"a"}
+
+
+def test_bytecode_cache_is_written_and_reused(tmp_path, monkeypatch):
+    assert templates.warm() >= 2
+    cached = list((tmp_path / "bcc").glob("__jinja2_*.cache"))
+    assert len(cached) == templates.warm()
+
+    templates.reset()  # "new process": compile() must not run again
+    monkeypatch.setattr(templates.get_environment(), "compile", _no_compile)
+    assert "CTX" in templates.get_template().render(project_context="CTX")
+
+
+def test_precompiled_modules_are_loaded(tmp_path, monkeypatch):
+    expected = templates.get_template().render(project_name="demo", project_context="CTX")
+    written = templates.precompile(tmp_path / "compiled")
+    assert len(written) >= 2 and all(p.suffix == ".py" for p in written)
+
+    monkeypatch.setenv("PV_TEMPLATE_CACHE_DIR", str(tmp_path / "empty-bcc"))
+    monkeypatch.setattr(templates, "COMPILED_DIR", tmp_path / "compiled")
+    templates.reset()
+    monkeypatch.setattr(templates.get_environment(), "compile", _no_compile)
+    assert templates.get_template().render(project_name="demo", project_context="CTX") == expected
+
+
+def _no_compile(*args, **kwargs):
+    raise AssertionError("template was recompiled")
@@ -0,0 +1,117 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Offline tokenizer: cache dir config, bounded load and heuristic fallback."""
+
+import os
+import sys
+import threading
+import types
+
+import pytest
+
+from personalvibe import cli, tokenizer
+
+
+@pytest.fixture(autouse=True)
+def _fresh_tokenizer():
+    tokenizer.reset_cache()
+    yield
+    tokenizer.reset_cache()
+
+
+def test_fallback_when_encoder_fails(monkeypatch):
+    def _boom(model):
+        raise OSError("no network")
+
+    monkeypatch.setattr(tokenizer, "_load_encoder", _boom)
+    assert tokenizer.get_encoder() is None
+    assert tokenizer.num_tokens("x" * 40) == 14  # ~3 chars/token, rounded up
+
+
+def test_fallback_on_timeout_is_bounded(monkeypatch):
+    release = threading.Event()
+
+    def _hang(model):
+        release.wait(5)
+
+    monkeypatch.setattr(tokenizer, "_load_encoder", _hang)
+    monkeypatch.setenv("PV_TOKENIZER_TIMEOUT", "0.05")
+    try:
+        assert tokenizer.num_tokens("abcdefgh") == 3
+    finally:
+        release.set()
+
+
+def test_timeout_is_not_cached_and_warns_once(monkeypatch, caplog):
+    release = threading.Event()
+    fake = types.SimpleNamespace(encode=lambda text, **kw: text.split())
+    calls = []
+
+    def _slow(model):
+        calls.append(model)
+        release.wait(5)
+        return fake
+
+    monkeypatch.setattr(tokenizer, "_load_encoder", _slow)
+    monkeypatch.setenv("PV_TOKENIZER_TIMEOUT", "0.05")
+    with caplog.at_level("WARNING", logger="personalvibe.tokenizer"):
+        assert tokenizer.get_encoder() is None
+        assert tokenizer.get_encoder() is None  # still loading: no second download, no wait
+    release.set()
+    tokenizer._pending["o3"][0].join(5)
+
+    assert tokenizer.num_tokens("a b c") == 3  # the slow load finished and is now used
+    assert calls == ["o3"]
+    assert len([r for r in caplog.records if "heuristic" in r.getMessage()]) == 1
+
+
+def test_encoder_loaded_once(monkeypatch):
+    calls = []
+    fake = types.SimpleNamespace(encode=lambda text, **kw: text.split())
+
+    def _load(model):
+        calls.append(model)
+        return fake
+
+    monkeypatch.setattr(tokenizer, "_load_encoder", _load)
+    assert tokenizer.num_tokens("a b c") == 3
+    assert tokenizer.num_tokens("d e") == 2
+    assert calls == ["o3"]
+
+
+def test_cache_dir_env(monkeypatch, tmp_path):
+    monkeypatch.delenv("TIKTOKEN_CACHE_DIR", raising=False)
+    assert tokenizer.get_cache_dir() is None
+    monkeypatch.setenv("PV_TOKENIZER_CACHE_DIR", str(tmp_path))
+    assert tokenizer.get_cache_dir() == tmp_path.resolve()
+
+
+def test_cache_dir_applies_to_the_load_only(monkeypatch, tmp_path):
+    seen = []
+    fake_tiktoken = types.SimpleNamespace(
+        encoding_for_model=lambda model: seen.append(os.environ["TIKTOKEN_CACHE_DIR"])
+    )
+    monkeypatch.setitem(sys.modules, "tiktoken", fake_tiktoken)
+    monkeypatch.delenv("TIKTOKEN_CACHE_DIR", raising=False)
+    monkeypatch.setenv("PV_TOKENIZER_CACHE_DIR", str(tmp_path))
+
+    tokenizer._load_encoder("o3")
+
+    assert seen == [str(tmp_path.resolve())]
+    assert "TIKTOKEN_CACHE_DIR" not in os.environ
+
+
+def test_warm_cache_cli(monkeypatch, tmp_path, capsys):
+    fetched = []
+    fake_tiktoken = types.SimpleNamespace(
+        encoding_name_for_model=lambda model: "o200k_base",
+        get_encoding=lambda name: fetched.append(name),
+    )
+    monkeypatch.setitem(sys.modules, "tiktoken", fake_tiktoken)
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", "")
+
+    cli.cli_main(["warm-cache", "--cache-dir", str(tmp_path / "bpe")])
+
+    assert fetched == ["o200k_base"]
+    assert (tmp_path / "bpe").is_dir()
+    assert "Tokenizer cache ready" in capsys.readouterr().out
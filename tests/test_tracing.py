@@ -0,0 +1,55 @@
+# Copyright © 2025 by Nick Jenkins. All rights reserved
+
+"""Per-phase timing spans and the `--trace` Chrome trace export."""
+
+import json
+import sys
+
+from personalvibe import logger, run_pipeline, tracing
+
+
+def test_span_is_noop_when_disabled():
+    assert not tracing.enabled()
+    assert tracing.span("a") is tracing.span("b")  # shared no-op, nothing recorded
+    assert tracing.stop() == []
+
+
+def test_spans_recorded_and_summarised(tmp_path):
+    tracing.start()
+    with tracing.span("outer", task="x"):
+        for _ in range(3):
+            with tracing.span("inner"):
+                pass
+    try:
+        with tracing.span("boom"):
+            raise KeyError("k")
+    except KeyError:
+        pass
+    events = tracing.stop()
+
+    assert [e["name"] for e in events] == ["inner", "inner", "inner", "outer", "boom"]
+    assert events[3]["ph"] == "X" and events[3]["args"] == {"task": "x"}
+    assert events[4]["args"]["error"] == "KeyError"
+    table = tracing.summary_table(events)
+    assert table.splitlines()[0].startswith("span") and "inner" in table and "    3 " in table
+
+    out = tracing.write_chrome_trace(tmp_path / "t.json", events)
+    payload = json.loads(out.read_text())
+    assert payload["traceEvents"][0]["ph"] == "M" and len(payload["traceEvents"]) == 6
+
+
+def test_run_pipeline_trace_prompt_only(tmp_path, monkeypatch):
+    monkeypatch.setenv("PV_DATA_DIR", str(tmp_path))
+    cfg = tmp_path / "1.0.0.yaml"
+    cfg.write_text("project_name: demo\ntask: naked\nproject_context_paths: []\n", encoding="utf-8")
+    trace = tmp_path / "out.json"
+    monkeypatch.setattr(sys, "argv", ["pv", "--config", str(cfg), "--prompt_only", "--trace", str(trace)])
+    logger.reset_logging()
+    try:
+        run_pipeline.main()
+    finally:
+        logger.reset_logging()
+
+    names = {e["name"] for e in json.loads(trace.read_text())["traceEvents"]}
+    assert {"load_config", "get_context", "get_replacements", "render_template", "save_prompt"} <= names
+    assert not tracing.enabled()